@@ -27,6 +27,11 @@ class ModelSpec:
                     paths that still branch on the raw request ``model`` string
                     (e.g. image lite/pro) must be updated before aliasing those
                     models.
+    ``context_tokens`` upstream prompt window of chat models, in tokens;
+                    requests whose flattened prompt exceeds it are trimmed
+                    before submission (see ``app.products._context``).
+                    ``0`` (non-chat models) disables trimming unless
+                    ``context.max_prompt_tokens`` is set.
     """
 
     model_name: str
@@ -37,6 +42,7 @@ class ModelSpec:
     public_name: str
     prefer_best: bool = False
     aliases: tuple[str, ...] = ()
+    context_tokens: int = 0
 
     # --- convenience predicates ---
 
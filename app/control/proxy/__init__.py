@@ -18,6 +18,7 @@ from app.platform.runtime.ids import next_hex
 from .config import resolve_clearance_config
 from .models import (
     EgressMode,
+    PoolStrategy,
     ClearanceMode,
     EgressNode,
     ClearanceBundle,
@@ -32,6 +33,21 @@ from .providers.flaresolverr import FlareSolverrClearanceProvider
 
 _DEFAULT_CLEARANCE_ORIGIN = "https://grok.com"
 BundleKey = tuple[str, str]
+# Leases never released/fed back (caller crashed mid-request) stop counting
+# against their node's inflight after this long.
+_LEASE_REAP_AFTER_MS = 10 * 60 * 1000
+_LEASE_REAP_INTERVAL_MS = 60 * 1000
+_HEALTH_ALPHA = 0.2
+_LATENCY_ALPHA = 0.3
+# Feedback kinds that say something about the egress node itself.  401/403
+# without a challenge are account problems, 429/5xx and other 4xx are
+# account-, upstream- or request-side; none of them touch node health.
+_NODE_ERROR_KINDS = frozenset(
+    {
+        ProxyFeedbackKind.CHALLENGE,
+        ProxyFeedbackKind.TRANSPORT_ERROR,
+    }
+)
 
 
 def _clearance_host(clearance_origin: str | None) -> str:
@@ -39,6 +55,22 @@ def _clearance_host(clearance_origin: str | None) -> str:
     return (host or "grok.com").lower()
 
 
+def _invalidate_header_templates() -> None:
+    # Lazy import: the dataplane adapters import this package at module load.
+    from app.dataplane.proxy.adapters.headers import invalidate_header_templates
+
+    invalidate_header_templates()
+
+
+def _retire_warm_sessions(reason: str) -> None:
+    """Drop pooled upstream connections made with the old clearance."""
+    from app.dataplane.proxy.adapters.warm_pool import retire_warm_sessions
+    from app.dataplane.reverse.transport.imagine_pool import evict_imagine_sockets
+
+    retire_warm_sessions(reason)
+    evict_imagine_sockets(reason)
+
+
 class ProxyDirectory:
     """Owns egress nodes and clearance bundles.
 
@@ -58,9 +90,14 @@ class ProxyDirectory:
         self._egress_mode: EgressMode = EgressMode.DIRECT
         self._clearance_mode: ClearanceMode = ClearanceMode.NONE
         self._config_sig: tuple | None = None
-        # Pool cursor for PROXY_POOL mode: sticky routing with failure-driven rotate.
-        # Incremented on node failure; all callers see the same cursor under _lock.
+        # Pool cursor for PROXY_POOL ``cursor`` strategy: sticky routing with
+        # failure-driven rotate. All callers see the same cursor under _lock.
         self._pool_cursor: int = 0
+        self._pool_strategy: PoolStrategy = PoolStrategy.P2C
+        self._node_max_inflight: int = 0
+        # Outstanding leases → node, so release/feedback can decrement inflight.
+        self._leases: dict[str, tuple[EgressNode, int]] = {}
+        self._last_reap_ms: int = 0
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -83,6 +120,11 @@ class ProxyDirectory:
             _subscription_pool_mtime() if egress_mode == EgressMode.SUBSCRIPTION else 0
         )
         clearance = resolve_clearance_config(cfg)
+        # Selection knobs apply live — they don't require rebuilding nodes.
+        self._pool_strategy = PoolStrategy.parse(
+            cfg.get_str("proxy.egress.pool_strategy", "p2c")
+        )
+        self._node_max_inflight = max(0, cfg.get_int("proxy.egress.node_max_inflight", 0))
         config_sig = (
             egress_mode.value,
             clearance_mode.value,
@@ -179,25 +221,35 @@ class ProxyDirectory:
         For DIRECT mode, returns a lease with no proxy or clearance. In
         SUBSCRIPTION mode ``account_id`` enables sticky per-account IP routing.
         """
-        proxy_url = await self._pick_proxy_url(resource=resource, account_id=account_id)
-        # Fail closed: subscription mode must never silently fall back to direct
-        # egress — leaking the origin IP defeats the mode and gets accounts
-        # rate-limited. Better to reject until a healthy node pool exists.
-        if self._egress_mode == EgressMode.SUBSCRIPTION and not proxy_url:
-            from app.platform.errors import UpstreamError
-
-            raise UpstreamError("No healthy subscription egress available", status=503)
-        affinity = proxy_url or "direct"
-        clearance_host = _clearance_host(clearance_origin)
-
-        bundle = await self._get_or_build_bundle(
-            affinity_key=affinity,
-            proxy_url=proxy_url or "",
-            clearance_origin=clearance_origin or _DEFAULT_CLEARANCE_ORIGIN,
+        lease_id = next_hex()
+        node = await self._pick_node(
+            lease_id, resource=resource, account_id=account_id
         )
+        proxy_url = node.proxy_url if node else None
+        try:
+            # Fail closed: subscription mode must never silently fall back to direct
+            # egress — leaking the origin IP defeats the mode and gets accounts
+            # rate-limited. Better to reject until a healthy node pool exists.
+            if self._egress_mode == EgressMode.SUBSCRIPTION and not proxy_url:
+                from app.platform.errors import UpstreamError
+
+                raise UpstreamError(
+                    "No healthy subscription egress available", status=503
+                )
+            affinity = proxy_url or "direct"
+            clearance_host = _clearance_host(clearance_origin)
+
+            bundle = await self._get_or_build_bundle(
+                affinity_key=affinity,
+                proxy_url=proxy_url or "",
+                clearance_origin=clearance_origin or _DEFAULT_CLEARANCE_ORIGIN,
+            )
+        except BaseException:
+            await self._release_lease(lease_id)
+            raise
 
         return ProxyLease(
-            lease_id=next_hex(),
+            lease_id=lease_id,
             proxy_url=proxy_url,
             cf_cookies=bundle.cf_cookies if bundle else "",
             user_agent=bundle.user_agent if bundle else "",
@@ -207,8 +259,48 @@ class ProxyDirectory:
             acquired_at=now_ms(),
         )
 
+    async def release(self, lease: ProxyLease) -> None:
+        """Return *lease*'s inflight slot to its node (idempotent).
+
+        Callers that report :meth:`feedback` need not call this — feedback is
+        the terminal report for a lease and releases it too.
+        """
+        await self._release_lease(lease.lease_id)
+
+    async def _release_lease(self, lease_id: str) -> EgressNode | None:
+        async with self._lock:
+            entry = self._leases.pop(lease_id, None)
+            if entry is None:
+                return None
+            node = entry[0]
+            node.inflight = max(0, node.inflight - 1)
+            return node
+
     async def feedback(self, lease: ProxyLease, result: ProxyFeedback) -> None:
-        """Apply upstream feedback to the appropriate egress node."""
+        """Apply upstream feedback to the appropriate egress node.
+
+        Also releases the lease's inflight slot and folds the outcome into the
+        node's live health / latency used by pool selection.
+        """
+        node = await self._release_lease(lease.lease_id)
+        if node is not None:
+            if result.kind == ProxyFeedbackKind.SUCCESS:
+                node.health += _HEALTH_ALPHA * (1.0 - node.health)
+                # Streamed and WebSocket leases last as long as the body or
+                # session, so only their reported latency says anything about
+                # the node; a one-shot HTTP lease spans a single round trip.
+                rtt = result.latency_ms
+                if rtt is None and lease.kind == RequestKind.HTTP and lease.acquired_at:
+                    rtt = max(0, now_ms() - lease.acquired_at)
+                if rtt is not None:
+                    node.ewma_ms = (
+                        float(rtt)
+                        if node.ewma_ms is None
+                        else _LATENCY_ALPHA * rtt + (1 - _LATENCY_ALPHA) * node.ewma_ms
+                    )
+            elif result.kind in _NODE_ERROR_KINDS:
+                node.health -= _HEALTH_ALPHA * node.health
+
         if result.kind in (
             ProxyFeedbackKind.CHALLENGE,
             ProxyFeedbackKind.UNAUTHORIZED,
@@ -224,19 +316,13 @@ class ProxyDirectory:
                         update={"state": ClearanceBundleState.INVALID}
                     )
 
-        # In pooled modes, rotate to the next node on any failure so the
+        # In pooled modes, rotate to the next node on a node failure so the
         # next acquire() prefers a different egress rather than hammering the
         # same broken node.
         if (
             self._egress_mode in (EgressMode.PROXY_POOL, EgressMode.SUBSCRIPTION)
             and lease.proxy_url
-            and result.kind
-            in (
-                ProxyFeedbackKind.CHALLENGE,
-                ProxyFeedbackKind.UNAUTHORIZED,
-                ProxyFeedbackKind.FORBIDDEN,
-                ProxyFeedbackKind.TRANSPORT_ERROR,
-            )
+            and result.kind in _NODE_ERROR_KINDS
         ):
             async with self._lock:
                 self._pool_cursor += 1
@@ -251,12 +337,20 @@ class ProxyDirectory:
     # Internal
     # ------------------------------------------------------------------
 
-    async def _pick_proxy_url(
-        self, resource: bool = False, account_id: str | None = None
-    ) -> str | None:
+    async def _pick_node(
+        self,
+        lease_id: str,
+        *,
+        resource: bool = False,
+        account_id: str | None = None,
+    ) -> EgressNode | None:
+        """Pick a node and charge one inflight slot to it under *lease_id*."""
         if self._egress_mode == EgressMode.DIRECT:
             return None
+        from app.dataplane.proxy.selector import select_pool_node
+
         async with self._lock:
+            self._reap_leases()
             # Prefer resource-specific nodes when available; fall back to base nodes.
             nodes = (
                 self._resource_nodes
@@ -266,16 +360,44 @@ class ProxyDirectory:
             if not nodes:
                 return None
             if self._egress_mode == EgressMode.SINGLE_PROXY:
-                return nodes[0].proxy_url
-            if self._egress_mode == EgressMode.SUBSCRIPTION:
-                return self._pick_subscription_node(nodes, account_id)
-            # PROXY_POOL: sticky routing — use current cursor, rotate on failure.
-            idx = self._pool_cursor % len(nodes)
-            return nodes[idx].proxy_url
+                node = nodes[0]
+            elif self._egress_mode == EgressMode.SUBSCRIPTION:
+                node = self._pick_subscription_node(nodes, account_id)
+            else:
+                node = select_pool_node(
+                    nodes,
+                    strategy=self._pool_strategy,
+                    cursor=self._pool_cursor,
+                    account_id=account_id,
+                    max_inflight=self._node_max_inflight,
+                )
+            if node is None:
+                return None
+            node.inflight += 1
+            node.last_used = now_ms()
+            self._leases[lease_id] = (node, node.last_used)
+            return node
+
+    def _reap_leases(self) -> None:
+        """Drop leases whose holder never released them (caller holds _lock)."""
+        now = now_ms()
+        if now - self._last_reap_ms < _LEASE_REAP_INTERVAL_MS:
+            return
+        self._last_reap_ms = now
+        stale = [
+            lid
+            for lid, (_, at) in self._leases.items()
+            if now - at > _LEASE_REAP_AFTER_MS
+        ]
+        for lid in stale:
+            node = self._leases.pop(lid)[0]
+            node.inflight = max(0, node.inflight - 1)
+        if stale:
+            logger.debug("proxy leases reaped: count={}", len(stale))
 
     def _pick_subscription_node(
         self, nodes: list[EgressNode], account_id: str | None
-    ) -> str | None:
+    ) -> EgressNode | None:
         """Per-account-sticky selection over the *full* node set, probing past
         unhealthy nodes locally.
 
@@ -299,7 +421,7 @@ class ProxyDirectory:
             for k in range(n):
                 node = pool[(start + k) % n]
                 if node.healthy:
-                    return node.proxy_url
+                    return node
             return None  # no healthy node → caller fails closed (503)
         # No identity → rotate over the healthy subset so the cursor actually
         # lands on a different node each step (a forward-scan over the full pool
@@ -307,7 +429,7 @@ class ProxyDirectory:
         healthy = [node for node in pool if node.healthy]
         if not healthy:
             return None
-        return healthy[self._pool_cursor % len(healthy)].proxy_url
+        return healthy[self._pool_cursor % len(healthy)]
 
     async def _get_or_build_bundle(
         self,
@@ -375,6 +497,8 @@ class ProxyDirectory:
                 k: b.model_copy(update={"state": ClearanceBundleState.INVALID})
                 for k, b in self._bundles.items()
             }
+        _invalidate_header_templates()
+        _retire_warm_sessions("clearance_invalidated")
         logger.debug("clearance bundles invalidated: count={}", len(self._bundles))
 
     async def warm_up(self) -> None:
@@ -444,7 +568,14 @@ class ProxyDirectory:
                 )
             if new_bundle:
                 async with self._lock:
+                    old = self._bundles.get(key)
                     self._bundles[key] = new_bundle
+                _invalidate_header_templates()
+                if old is not None and (old.cf_cookies, old.user_agent) != (
+                    new_bundle.cf_cookies,
+                    new_bundle.user_agent,
+                ):
+                    _retire_warm_sessions("clearance_refreshed")
                 logger.debug("clearance bundle refreshed: bundle={}", key)
             else:
                 logger.warning(
@@ -14,6 +14,8 @@ def classify_status_code(status_code: int) -> ProxyFeedbackKind:
         return ProxyFeedbackKind.RATE_LIMITED
     if status_code >= 500:
         return ProxyFeedbackKind.UPSTREAM_5XX
+    if status_code >= 400:
+        return ProxyFeedbackKind.CLIENT_ERROR
     return ProxyFeedbackKind.FORBIDDEN
 
 
@@ -24,6 +24,22 @@ class EgressMode(StrEnum):
     SUBSCRIPTION = "subscription"  # pool sourced from Clash subscription via mihomo sidecar
 
 
+class PoolStrategy(StrEnum):
+    P2C            = "p2c"             # power-of-two-choices on live load/latency/errors
+    LEAST_INFLIGHT = "least_inflight"  # fewest in-flight leases
+    ACCOUNT        = "account"         # per-account sticky hash
+    CURSOR         = "cursor"          # legacy: one node at a time, rotate on failure
+
+    @classmethod
+    def parse(cls, value: str | Self) -> Self:
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(str(value or "").strip().lower())
+        except ValueError:
+            return cls.P2C
+
+
 class ClearanceMode(StrEnum):
     NONE         = "none"         # no CF clearance required
     MANUAL       = "manual"       # operator-supplied cf_cookies
@@ -59,6 +75,7 @@ class ProxyFeedbackKind(StrEnum):
     RATE_LIMITED    = "rate_limited" # 429
     UPSTREAM_5XX    = "upstream_5xx"
     TRANSPORT_ERROR = "transport_error"
+    CLIENT_ERROR    = "client_error" # other 4xx — request-side, no node fault
 
 
 class EgressNode(BaseModel):
@@ -72,6 +89,7 @@ class EgressNode(BaseModel):
     name:       str              = ""    # upstream node label (subscription mode)
     latency_ms: int | None       = None  # measured delay; None = untested/unreachable
     healthy:    bool             = True  # last-test health (subscription mode); routing skips False
+    ewma_ms:    float | None     = None  # connect / time-to-headers EWMA from SUCCESS feedback
 
 
 class ClearanceBundle(BaseModel):
@@ -104,10 +122,11 @@ class ProxyFeedback(BaseModel):
     status_code:    int | None = None
     reason:         str        = ""
     retry_after_ms: int | None = None
+    latency_ms:     int | None = None  # connect / time-to-headers, not lease lifetime
 
 
 __all__ = [
-    "ProxyScope", "RequestKind", "EgressMode", "ClearanceMode",
+    "ProxyScope", "RequestKind", "EgressMode", "PoolStrategy", "ClearanceMode",
     "EgressNodeState", "ClearanceBundleState", "ProxyFeedbackKind",
     "EgressNode", "ClearanceBundle", "ProxyLease", "ProxyFeedback",
 ]
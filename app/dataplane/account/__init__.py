@@ -15,7 +15,7 @@ from app.control.account.repository import AccountRepository
 from app.control.account.enums import FeedbackKind
 from .table import AccountRuntimeTable
 from .lease import AccountLease, new_lease
-from .selector import current_strategy, select, select_any
+from .selector import can_select, current_strategy, select, select_any
 from .sync import bootstrap as _bootstrap, apply_changes
 from . import feedback as fb
 from ..shared.enums import POOL_ID_TO_STR, StatusId
@@ -151,6 +151,49 @@ class AccountDirectory:
             selected_at=ts,
         )
 
+    async def reserve_token(
+        self,
+        token: str,
+        pool_candidates: tuple[int, ...] | int,
+        mode_id: int,
+        *,
+        now_s_override: int | None = None,
+    ) -> AccountLease | None:
+        """Reserve one specific account if it is currently selectable.
+
+        Used to keep a multi-turn conversation on the account that owns the
+        upstream conversation.  Returns None when the account is unknown,
+        outside ``pool_candidates`` or would not pass normal selection.
+        """
+        table = self._table
+        if table is None:
+            return None
+        idx = table.idx_by_token.get(token)
+        if idx is None:
+            return None
+
+        pools: tuple[int, ...] = (
+            (pool_candidates,) if isinstance(pool_candidates, int) else pool_candidates
+        )
+        ts = now_s_override if now_s_override is not None else now_s()
+
+        async with self._lock:
+            if not any(
+                can_select(table, idx, pool_id, mode_id, now_s=ts) for pool_id in pools
+            ):
+                return None
+            fb.increment_inflight(table, idx)
+            fb.update_last_use(table, idx, ts)
+            actual_pool = table.get_pool_id(idx)
+
+        return new_lease(
+            idx=idx,
+            token=token,
+            pool_id=actual_pool,
+            mode_id=mode_id,
+            selected_at=ts,
+        )
+
     def sample_active_tokens(self, limit: int = 8, *, offset: int = 0) -> list[str]:
         """Best-effort read of up to *limit* active account tokens.
 
@@ -317,6 +360,11 @@ class AccountDirectory:
                 reset_s = int(reset_at_ms // 1000)
                 fb.apply_quota_update(table, idx, mode_id, remaining, reset_s)
 
+        if kind in _EVICT_SOCKET_KINDS:
+            # The account is cooling or lost its auth — its pooled imagine
+            # sockets would only be handed to requests that cannot use them.
+            _evict_imagine_sockets(token, kind)
+
     # ------------------------------------------------------------------
     # Diagnostics
     # ------------------------------------------------------------------
@@ -335,6 +383,17 @@ class AccountDirectory:
 # ---------------------------------------------------------------------------
 
 
+_EVICT_SOCKET_KINDS = frozenset(
+    {FeedbackKind.RATE_LIMITED, FeedbackKind.UNAUTHORIZED, FeedbackKind.FORBIDDEN}
+)
+
+
+def _evict_imagine_sockets(token: str, kind: FeedbackKind) -> None:
+    from app.dataplane.reverse.transport.imagine_pool import evict_imagine_sockets
+
+    evict_imagine_sockets(f"account_{kind.value}", token=token)
+
+
 _POOL_INTERVAL_CONFIG: dict[str, tuple[str, int]] = {
     "basic": ("account.refresh.basic_interval_sec", 86_400),
     "super": ("account.refresh.super_interval_sec", 7_200),
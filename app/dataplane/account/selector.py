@@ -114,6 +114,39 @@ def select_any(
     )
 
 
+def can_select(
+    table: AccountRuntimeTable,
+    idx: int,
+    pool_id: int,
+    mode_id: int,
+    *,
+    now_s: int,
+) -> bool:
+    """Whether slot ``idx`` is an eligible pick for ``(pool_id, mode_id)``.
+
+    Applies the same filters as :func:`select` to a single slot, for callers
+    that must stay on one account (upstream conversation affinity).
+    """
+    if _STRATEGY_NAME == "random":
+        max_inflight = int(get_config("account.selection.max_inflight", 8))
+        return (
+            _in_pool(table, idx, pool_id)
+            and int(table.cooling_until_s_by_idx[idx]) <= now_s
+            and int(table.inflight_by_idx[idx]) < max_inflight
+        )
+    candidates = table.mode_available.get((pool_id, mode_id))
+    if not candidates or idx not in candidates:
+        return False
+    quota_col = table._quota_col(mode_id)
+    _maybe_reset_windows(
+        table, {idx}, mode_id,
+        table._reset_col(mode_id), quota_col,
+        table._total_col(mode_id), table._window_col(mode_id),
+        pool_id, now_s,
+    )
+    return int(quota_col[idx]) > 0
+
+
 # ---------------------------------------------------------------------------
 # Strategy: quota — score-based selection (unchanged behaviour)
 # ---------------------------------------------------------------------------
@@ -336,4 +369,11 @@ def _pool_union(table: AccountRuntimeTable, pool_id: int) -> set[int]:
     return out
 
 
-__all__ = ["select", "select_any", "set_strategy", "current_strategy"]
+def _in_pool(table: AccountRuntimeTable, idx: int, pool_id: int) -> bool:
+    return any(
+        pid == pool_id and idx in accounts
+        for (pid, _mid), accounts in table.mode_available.items()
+    )
+
+
+__all__ = ["can_select", "select", "select_any", "set_strategy", "current_strategy"]
@@ -37,6 +37,9 @@ class ProxyRuntime:
     async def feedback(self, lease: ProxyLease, result: ProxyFeedback) -> None:
         await self._dir.feedback(lease, result)
 
+    async def release(self, lease: ProxyLease) -> None:
+        await self._dir.release(lease)
+
     @property
     def has_proxy(self) -> bool:
         from app.control.proxy.models import EgressMode
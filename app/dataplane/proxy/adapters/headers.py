@@ -5,13 +5,12 @@ All values are sanitized to ASCII-safe Latin-1 before use.
 
 import asyncio
 import base64
-import json
 import random
 import re
 import string
 import time
-import urllib.request
 import uuid
+from collections import OrderedDict
 from typing import Optional
 from urllib.parse import urlparse
 
@@ -20,6 +19,8 @@ from app.platform.logging.logger import logger
 from app.platform.config.snapshot import get_config
 from app.control.proxy.models import ProxyLease
 from app.dataplane.proxy.adapters.profile import ProxyProfile, resolve_proxy_profile
+from app.dataplane.proxy.adapters.sigcache import SignatureStats, get_signature_store
+from app.dataplane.proxy.adapters.signer import get_signer_pool, signer_endpoints_health
 
 # ---------------------------------------------------------------------------
 # Unicode → ASCII normalisation map
@@ -69,10 +70,13 @@ def _sanitize(value: Optional[str], *, field: str, strip_spaces: bool = False) -
 
 
 # Client-side signature cache: {"METHOD|path": (signature, expiry_ts)}.
-# Safe without locking — _statsig_id is synchronous and the asyncio event loop
-# is single-threaded, so concurrent coroutines never interleave inside it.
+# Safe without locking — reads/writes never await, and the asyncio event loop
+# is single-threaded, so concurrent coroutines never interleave inside them.
 _SIG_CACHE: dict[str, tuple[str, float]] = {}
 _SIG_CACHE_MAX = 512
+_STALE_GRACE_MAX = 60.0  # eviction keeps entries this long past expiry
+# In-flight background re-signs (refresh-ahead / stale-while-revalidate).
+_SIG_REFRESHING: dict[str, asyncio.Task] = {}
 # Negative cache: after a signer failure, skip remote calls until this monotonic
 # deadline so a dead/slow signer can't block the event loop on every request.
 _SIGNER_FAIL_UNTIL: float = 0.0
@@ -83,11 +87,13 @@ _SIGNER_LAST_OK_MS: float = 0.0  # wall-clock ms of the last successful sign
 _SIGNER_LAST_ERR: str = ""  # last failure reason
 _SIGNER_ALERTED: bool = False  # ERROR already emitted for the current outage
 _SIGNER_ALERT_AFTER = 3  # consecutive fails before alerting
+# Local/shared hit ratio and signer QPS for this process.
+_SIG_STATS = SignatureStats()
 
 
 def _cache_put(key: str, sig: str, exp: float) -> None:
     if len(_SIG_CACHE) >= _SIG_CACHE_MAX:
-        now = time.monotonic()
+        now = time.monotonic() - _STALE_GRACE_MAX
         for k in [k for k, (_, e) in _SIG_CACHE.items() if e <= now]:
             _SIG_CACHE.pop(k, None)
         if len(_SIG_CACHE) >= _SIG_CACHE_MAX:
@@ -95,34 +101,31 @@ def _cache_put(key: str, sig: str, exp: float) -> None:
     _SIG_CACHE[key] = (sig, exp)
 
 
-def _fetch_remote_statsig(
-    signer_url: str, path: str, method: str, timeout: float
+async def _fetch_remote_statsig(
+    cfg, signer_urls: list[str], path: str, method: str, timeout: float
 ) -> Optional[str]:
-    """Request a real x-statsig-id from the signer service.
+    """Request a real x-statsig-id from the signer pool.
 
-    Synchronous (briefly blocks the event loop). Returns the signature on
-    success, ``None`` on any failure so the caller can fall back to the fake
-    value without aborting the request.
+    Goes through the keep-alive, load-balanced :class:`SignerPool`. Returns the
+    signature on success, ``None`` once every attempted endpoint failed so the
+    caller can fall back to the fake value without aborting the request.
     """
     global _SIGNER_LAST_ERR
-    body = json.dumps({"path": path, "method": method}).encode()
-    req = urllib.request.Request(
-        signer_url,
-        data=body,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    pool = get_signer_pool(signer_urls)
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-        sig = data.get("statsig")
-        if isinstance(sig, str) and sig:
-            return sig
-        _SIGNER_LAST_ERR = "signer returned no/empty statsig field"
-        return None
+        return await pool.sign(
+            path,
+            method,
+            timeout,
+            hedge=cfg.get_bool("statsig.hedge", True),
+            threshold=max(1, cfg.get_int("statsig.breaker_fails", 3)),
+            cooldown=cfg.get_float("statsig.breaker_cooldown", 30.0),
+        )
     except Exception as exc:
-        _SIGNER_LAST_ERR = str(exc)
-        logger.warning("statsig signer request failed: url={} err={}", signer_url, exc)
+        _SIGNER_LAST_ERR = str(exc) or type(exc).__name__
+        logger.warning(
+            "statsig signer request failed: endpoints={} err={}", len(signer_urls), exc
+        )
         return None
 
 
@@ -157,6 +160,8 @@ def signer_health() -> dict:
         "consecutive_fails": _SIGNER_FAILS,
         "last_ok_ms": int(_SIGNER_LAST_OK_MS),
         "last_error": _SIGNER_LAST_ERR,
+        "cache": _SIG_STATS.snapshot(),
+        "endpoints": signer_endpoints_health(),
     }
 
 
@@ -187,28 +192,12 @@ _SIG_LOCKS: dict[str, asyncio.Lock] = {}
 _SIG_LOCKS_MAX = 512
 
 
-async def resolve_statsig_id(path: str = "", method: str = "POST") -> str:
-    """Async counterpart of :func:`_statsig_id`.
+def _signer_urls(cfg) -> list[str]:
+    """``statsig.signer_url`` as a list — one URL, a list, or comma/newline-separated."""
+    return [u for u in (str(x).strip() for x in cfg.get_list("statsig.signer_url", [])) if u]
 
-    Same cache/cooldown semantics, but the (CPU-bound, possibly slow) signer
-    request runs in a thread so it never blocks the event loop, and a per-path
-    single-flight lock ensures the signer is hit at most once per TTL regardless
-    of concurrency.
-    """
-    global _SIGNER_FAIL_UNTIL
-    cfg = get_config()
-    signer_url = cfg.get_str("statsig.signer_url", "").strip()
-    if not (signer_url and path):
-        return _fake_statsig_id(cfg)
-
-    ttl = cfg.get_float("statsig.cache_ttl", 20.0)
-    key = f"{method}|{path}"
-    now = time.monotonic()
-    if ttl > 0:
-        cached = _SIG_CACHE.get(key)
-        if cached and cached[1] > now:
-            return cached[0]
 
+def _get_sig_lock(key: str) -> asyncio.Lock:
     lock = _SIG_LOCKS.get(key)
     if lock is None:
         if len(_SIG_LOCKS) >= _SIG_LOCKS_MAX:
@@ -216,29 +205,136 @@ async def resolve_statsig_id(path: str = "", method: str = "POST") -> str:
                 _SIG_LOCKS.pop(k, None)
         lock = asyncio.Lock()
         _SIG_LOCKS[key] = lock
+    return lock
 
-    async with lock:
+
+async def _sign_locked(
+    cfg, signer_urls: list[str], path: str, method: str, *, ttl: float, min_ttl: float
+) -> str | None:
+    """Cache-checked, single-flight sign for one ``METHOD|path`` key.
+
+    A cached (local or shared) signature is accepted only if it stays valid for
+    more than *min_ttl* seconds — refresh-ahead passes its window here so it
+    does not "refresh" to the very entry it was asked to replace. Returns
+    ``None`` when no real signature is available (cooldown / signer failure).
+    """
+    global _SIGNER_FAIL_UNTIL
+    key = f"{method}|{path}"
+    async with _get_sig_lock(key):
         # Re-check: a prior holder of the lock may have just populated the cache.
         now = time.monotonic()
         if ttl > 0:
             cached = _SIG_CACHE.get(key)
-            if cached and cached[1] > now:
+            if cached and cached[1] - now > min_ttl:
+                _SIG_STATS.local_hits += 1
                 return cached[0]
-        if now >= _SIGNER_FAIL_UNTIL:
-            timeout = cfg.get_float("statsig.timeout", 5.0)
-            loop = asyncio.get_running_loop()
-            sig = await loop.run_in_executor(
-                None, _fetch_remote_statsig, signer_url, path, method, timeout
+        store = (
+            get_signature_store(cfg.get_str("statsig.shared_cache", "auto"))
+            if ttl > 0
+            else None
+        )
+        if store is not None:
+            shared = await store.get(key)
+            if shared and shared[1] > min_ttl:
+                _SIG_STATS.shared_hits += 1
+                _cache_put(key, shared[0], now + shared[1])
+                return shared[0]
+        _SIG_STATS.misses += 1
+        if now < _SIGNER_FAIL_UNTIL:
+            return None
+        timeout = cfg.get_float("statsig.timeout", 5.0)
+        token: str | None = ""
+        if store is not None:
+            # Lease outlives one signer round-trip so waiters never race
+            # the owner; a crashed owner frees the key after it lapses.
+            token = await store.acquire(key, timeout + 1.0)
+            if token is None:
+                shared = await store.wait(key, timeout + 1.0, min_ttl=min_ttl)
+                if shared:
+                    _cache_put(key, shared[0], time.monotonic() + shared[1])
+                    return shared[0]
+                # The owner's sign failed — share its cooldown rather than
+                # piling onto a signer that just timed out.
+                _SIGNER_FAIL_UNTIL = time.monotonic() + cfg.get_float(
+                    "statsig.fail_cooldown", 5.0
+                )
+                return None
+        try:
+            _SIG_STATS.record_sign()
+            sig = await _fetch_remote_statsig(cfg, signer_urls, path, method, timeout)
+            if sig and store is not None:
+                await store.put(key, sig, ttl)
+        finally:
+            if store is not None:
+                await store.release(key, token)
+        if sig:
+            _SIGNER_FAIL_UNTIL = 0.0
+            _note_signer_ok()
+            if ttl > 0:
+                _cache_put(key, sig, time.monotonic() + ttl)
+            return sig
+        _SIGNER_FAIL_UNTIL = time.monotonic() + cfg.get_float(
+            "statsig.fail_cooldown", 5.0
+        )
+        _note_signer_fail()
+        return None
+
+
+def _schedule_refresh(
+    cfg, signer_urls: list[str], path: str, method: str, *, ttl: float, min_ttl: float
+) -> None:
+    """Re-sign *path* in the background while the current entry keeps serving."""
+    key = f"{method}|{path}"
+    if key in _SIG_REFRESHING or time.monotonic() < _SIGNER_FAIL_UNTIL:
+        return
+
+    async def _run() -> None:
+        # Signer and store failures are absorbed inside _sign_locked.
+        try:
+            await _sign_locked(
+                cfg, signer_urls, path, method, ttl=ttl, min_ttl=min_ttl
             )
-            if sig:
-                _SIGNER_FAIL_UNTIL = 0.0
-                _note_signer_ok()
-                if ttl > 0:
-                    _cache_put(key, sig, now + ttl)
-                return sig
-            _SIGNER_FAIL_UNTIL = now + cfg.get_float("statsig.fail_cooldown", 5.0)
-            _note_signer_fail()
-    return _fake_statsig_id(cfg)
+        finally:
+            _SIG_REFRESHING.pop(key, None)
+
+    _SIG_REFRESHING[key] = asyncio.create_task(_run(), name=f"statsig-refresh:{key}")
+
+
+async def resolve_statsig_id(path: str = "", method: str = "POST") -> str:
+    """Return an ``x-statsig-id`` for *method* *path*.
+
+    Lookups go local cache → shared cache (see :mod:`.sigcache`) → signer, with
+    a per-path single-flight lock so the signer is hit at most once per TTL
+    regardless of concurrency.
+
+    In steady state callers never wait on the signer: an entry inside the
+    ``statsig.refresh_ahead`` window before expiry is served while a background
+    task re-signs it, and an entry up to ``statsig.stale_grace`` seconds past
+    expiry is served stale on the same terms. Only a cold or long-expired path
+    blocks on a sign.
+    """
+    cfg = get_config()
+    signer_urls = _signer_urls(cfg)
+    if not (signer_urls and path):
+        return _fake_statsig_id(cfg)
+
+    ttl = cfg.get_float("statsig.cache_ttl", 20.0)
+    if ttl > 0:
+        refresh_ahead = min(cfg.get_float("statsig.refresh_ahead", 5.0), ttl / 2)
+        stale_grace = min(cfg.get_float("statsig.stale_grace", 10.0), _STALE_GRACE_MAX)
+        cached = _SIG_CACHE.get(f"{method}|{path}")
+        if cached:
+            remaining = cached[1] - time.monotonic()
+            if remaining > -stale_grace:
+                _SIG_STATS.local_hits += 1
+                if remaining <= refresh_ahead:
+                    _schedule_refresh(
+                        cfg, signer_urls, path, method, ttl=ttl, min_ttl=refresh_ahead
+                    )
+                return cached[0]
+
+    sig = await _sign_locked(cfg, signer_urls, path, method, ttl=ttl, min_ttl=0.0)
+    return sig or _fake_statsig_id(cfg)
 
 
 # ---------------------------------------------------------------------------
@@ -346,11 +442,25 @@ def build_sso_cookie(
     empty string when not passed explicitly, causing Cookies without a CF
     clearance token and immediate 403 from Cloudflare on every grok.com call.
     """
+    return _sso_cookie(
+        sso_token,
+        _resolve_profile(lease),
+        cf_cookies=cf_cookies,
+        cf_clearance=cf_clearance,
+    )
+
+
+def _sso_cookie(
+    sso_token: str,
+    profile: ProxyProfile,
+    *,
+    cf_cookies: str | None = None,
+    cf_clearance: str | None = None,
+) -> str:
     tok = sso_token[4:] if sso_token.startswith("sso=") else sso_token
     tok = _sanitize(tok, field="sso_token", strip_spaces=True)
 
     cookie = f"sso={tok}; sso-rw={tok}"
-    profile = _resolve_profile(lease)
     eff_cookies = _sanitize(
         cf_cookies if cf_cookies is not None else profile.cf_cookies, field="cf_cookies"
     )
@@ -378,23 +488,33 @@ def build_sso_cookie(
     return cookie
 
 
-async def build_http_headers(
+# Header templates: everything except x-statsig-id / x-xai-request-id depends
+# only on (token, profile, origin, referer, content type), so the sanitising,
+# UA parsing, urlparse and cookie assembly run once per combination. The
+# resolved profile carries the clearance cookies/UA, so a new clearance bundle
+# yields a new key; ``invalidate_header_templates`` drops the old ones eagerly.
+_HEADER_TEMPLATES: OrderedDict[tuple, dict[str, str]] = OrderedDict()
+_HEADER_TEMPLATES_MAX = 1024
+
+
+def invalidate_header_templates() -> None:
+    """Drop all cached header templates (clearance bundles changed)."""
+    _HEADER_TEMPLATES.clear()
+
+
+def _http_header_template(
     cookie_token: str,
-    *,
-    content_type: Optional[str] = None,
-    origin: Optional[str] = None,
-    referer: Optional[str] = None,
-    lease: ProxyLease | None = None,
-    url: Optional[str] = None,
-    method: str = "POST",
+    profile: ProxyProfile,
+    content_type: str | None,
+    origin: str | None,
+    referer: str | None,
 ) -> dict[str, str]:
-    """Build headers for a standard HTTP reverse-proxy request.
+    key = (cookie_token, profile, content_type, origin, referer)
+    cached = _HEADER_TEMPLATES.get(key)
+    if cached is not None:
+        _HEADER_TEMPLATES.move_to_end(key)
+        return cached
 
-    Pass *url* (and *method*) for grok.com API endpoints so a real
-    ``x-statsig-id`` can be signed for that request path; omit them for
-    non-grok requests (the fake fallback value is used instead).
-    """
-    profile = _resolve_profile(lease)
     raw_ua = profile.user_agent
     ua = _sanitize(raw_ua, field="user_agent")
     browser = profile.browser
@@ -436,13 +556,42 @@ async def build_http_headers(
         "Sec-Fetch-Mode": "cors",
         "Sec-Fetch-Site": site,
         "User-Agent": ua,
-        "x-statsig-id": await resolve_statsig_id(
-            urlparse(url).path if url else "", method
-        ),
-        "x-xai-request-id": str(uuid.uuid4()),
+        # Per-request slots — filled by build_http_headers (keeps header order).
+        "x-statsig-id": "",
+        "x-xai-request-id": "",
     }
     headers.update(_client_hints(browser, raw_ua))
-    headers["Cookie"] = build_sso_cookie(cookie_token, lease=lease)
+    headers["Cookie"] = _sso_cookie(cookie_token, profile)
+
+    if len(_HEADER_TEMPLATES) >= _HEADER_TEMPLATES_MAX:
+        _HEADER_TEMPLATES.popitem(last=False)
+    _HEADER_TEMPLATES[key] = headers
+    return headers
+
+
+async def build_http_headers(
+    cookie_token: str,
+    *,
+    content_type: Optional[str] = None,
+    origin: Optional[str] = None,
+    referer: Optional[str] = None,
+    lease: ProxyLease | None = None,
+    url: Optional[str] = None,
+    method: str = "POST",
+) -> dict[str, str]:
+    """Build headers for a standard HTTP reverse-proxy request.
+
+    Pass *url* (and *method*) for grok.com API endpoints so a real
+    ``x-statsig-id`` can be signed for that request path; omit them for
+    non-grok requests (the fake fallback value is used instead).
+    """
+    template = _http_header_template(
+        cookie_token, _resolve_profile(lease), content_type, origin, referer
+    )
+    statsig_id = await resolve_statsig_id(urlparse(url).path if url else "", method)
+    headers = template.copy()
+    headers["x-statsig-id"] = statsig_id
+    headers["x-xai-request-id"] = str(uuid.uuid4())
 
     logger.debug("http headers built: header_count={}", len(headers))
     return headers
@@ -477,4 +626,9 @@ def build_ws_headers(
     return headers
 
 
-__all__ = ["build_http_headers", "build_sso_cookie", "build_ws_headers"]
+__all__ = [
+    "build_http_headers",
+    "build_sso_cookie",
+    "build_ws_headers",
+    "invalidate_header_templates",
+]
@@ -47,6 +47,7 @@ def _supported_browser(candidate: str) -> str:
     return ""
 
 
+@lru_cache(maxsize=64)
 def browser_from_user_agent(user_agent: str) -> str:
     ua = user_agent or ""
     lower = ua.lower()
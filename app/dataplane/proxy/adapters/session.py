@@ -5,11 +5,13 @@ from typing import Any
 from urllib.parse import urlparse
 
 from curl_cffi.const import CurlOpt
+from curl_cffi.requests import Cookies
 
 from app.platform.config.snapshot import get_config
 from app.platform.errors import UpstreamError
 from app.control.proxy.models import ProxyLease
 from app.dataplane.proxy.adapters.profile import resolve_proxy_profile
+from app.dataplane.proxy.adapters.warm_pool import WarmEntry, get_warm_pool
 
 
 def _skip_proxy_ssl(proxy_url: str) -> bool:
@@ -84,6 +86,10 @@ class ResettableSession:
 
     Designed for long-lived hot-path use; session is recreated transparently
     when a reset-triggering status code is received.
+
+    When the egress warm pool is enabled the underlying ``AsyncSession`` is a
+    shared, pre-handshaken one borrowed from the pool; a reset retires it from
+    the pool instead of closing it under other borrowers.
     """
 
     def __init__(
@@ -105,13 +111,35 @@ class ResettableSession:
         self._reset_on = reset_on_status
         self._reset_pending = False
         self._lock = asyncio.Lock()
+        self._warm: WarmEntry | None = None
+        self._cookies: Cookies | None = None
         self._session = self._create()
 
     def _create(self):
+        entry = get_warm_pool().borrow(self._kwargs)
+        if entry is not None:
+            self._warm = entry
+            if self._cookies is None:
+                self._cookies = Cookies()
+            return entry.session
+
         from curl_cffi.requests import AsyncSession
 
         return AsyncSession(**self._kwargs)
 
+    async def _drop(self, session, *, retire: str = "") -> None:
+        entry, self._warm = self._warm, None
+        if entry is not None:
+            pool = get_warm_pool()
+            if retire:
+                pool.retire(entry, retire)
+            await pool.give_back(entry)
+            return
+        try:
+            await session.close()
+        except Exception:
+            pass
+
     async def _maybe_reset(self) -> None:
         if not self._reset_pending:
             return
@@ -119,19 +147,24 @@ class ResettableSession:
             if not self._reset_pending:
                 return
             self._reset_pending = False
-            old, self._session = self._session, self._create()
-            try:
-                await old.close()
-            except Exception:
-                pass
+            await self._drop(self._session, retire="reset")
+            self._session = self._create()
 
     async def _request(self, method: str, *args: Any, **kwargs: Any):
         await self._maybe_reset()
+        if self._cookies is not None:
+            # Pooled sessions discard cookies; keep this wrapper's own jar.
+            cookies = Cookies(self._cookies)
+            if kwargs.get("cookies"):
+                cookies.update(kwargs["cookies"])
+            kwargs["cookies"] = cookies
         try:
             response = await getattr(self._session, method)(*args, **kwargs)
         except Exception as exc:
             self._reset_pending = True
             raise _wrap_transport_error(exc) from exc
+        if self._cookies is not None:
+            self._cookies.update(response.cookies)
         if self._reset_on and response.status_code in self._reset_on:
             self._reset_pending = True
         return response
@@ -148,7 +181,7 @@ class ResettableSession:
     async def close(self) -> None:
         if self._session is not None:
             try:
-                await self._session.close()
+                await self._drop(self._session)
             finally:
                 self._session = None  # type: ignore[assignment]
 
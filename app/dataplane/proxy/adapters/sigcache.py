@@ -0,0 +1,347 @@
+"""Shared second-level statsig signature cache.
+
+The in-process ``_SIG_CACHE`` in :mod:`.headers` only collapses signer calls
+inside one worker.  This module adds a store shared by every worker on the
+host (``file``) or by every replica (``redis``), plus a short per-key lock so
+that across processes exactly one caller signs a given path per TTL while the
+others wait on the lock and read the result.
+
+Backend selection (``statsig.shared_cache``):
+  ``auto``  — ``redis`` when ``ACCOUNT_STORAGE=redis``, otherwise ``file``
+  ``file``  — one JSON file per key under ``${DATA_DIR}/statsig``
+  ``redis`` — ``statsig:sig:*`` / ``statsig:lock:*`` keys on ``ACCOUNT_REDIS_URL``
+  ``none``  — disabled (per-process cache only)
+
+Every store method swallows its own I/O errors: a broken shared cache must
+degrade to per-process behaviour, never fail the request.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+
+from redis.exceptions import RedisError
+
+from app.platform.logging.logger import logger
+from app.platform.paths import data_path
+
+_SUPPORTED_BACKENDS = {"auto", "file", "redis", "none"}
+_WAIT_POLL_S = 0.05  # poll interval while another process holds the key lock
+
+
+class SignatureStore(ABC):
+    """Cross-process signature cache with a per-key signing lock.
+
+    Expiry is wall-clock based (``time.time()``) because entries are shared
+    between processes — and for ``redis`` between hosts.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    async def get(self, key: str) -> tuple[str, float] | None:
+        """Return ``(signature, remaining_ttl_s)`` or ``None`` on miss."""
+
+    @abstractmethod
+    async def put(self, key: str, sig: str, ttl: float) -> None:
+        """Store *sig* for *ttl* seconds."""
+
+    @abstractmethod
+    async def acquire(self, key: str, ttl: float) -> str | None:
+        """Try to become the signer for *key*.
+
+        Returns an owner token on success, ``None`` when another process
+        already holds the lock.  The lock self-expires after *ttl* seconds so
+        a crashed owner can't wedge the key.
+        """
+
+    @abstractmethod
+    async def release(self, key: str, token: str) -> None:
+        """Release the lock taken by :meth:`acquire` (no-op if not owned)."""
+
+    async def wait(
+        self, key: str, timeout: float, *, min_ttl: float = 0.0
+    ) -> tuple[str, float] | None:
+        """Poll for a value published by the current lock owner.
+
+        Entries with *min_ttl* seconds or less left are ignored, so a waiter
+        behind a refresh-ahead owner holds out for the new signature.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_WAIT_POLL_S)
+            hit = await self.get(key)
+            if hit and hit[1] > min_ttl:
+                return hit
+        return None
+
+    async def close(self) -> None:
+        """Release any resources held by the store (optional)."""
+
+
+# ---------------------------------------------------------------------------
+# Single-host store — atomic JSON files + O_EXCL lock files
+# ---------------------------------------------------------------------------
+
+
+class FileSignatureStore(SignatureStore):
+    """Shares signatures between granian workers on one host.
+
+    Writes go through ``os.replace`` so readers never see a half-written file;
+    the lock is an ``O_CREAT | O_EXCL`` file whose mtime doubles as its lease.
+    """
+
+    name = "file"
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self._root / f"{digest}.{suffix}"
+
+    async def get(self, key: str) -> tuple[str, float] | None:
+        return await asyncio.to_thread(self._read, key)
+
+    async def put(self, key: str, sig: str, ttl: float) -> None:
+        await asyncio.to_thread(self._write, key, sig, ttl)
+
+    async def acquire(self, key: str, ttl: float) -> str | None:
+        return await asyncio.to_thread(self._try_lock, key, ttl)
+
+    async def release(self, key: str, token: str) -> None:
+        if token:
+            await asyncio.to_thread(self._unlock, key, token)
+
+    # Blocking halves, run on the default executor.
+
+    def _read(self, key: str) -> tuple[str, float] | None:
+        try:
+            with open(self._path(key, "json"), encoding="utf-8") as f:
+                payload = json.load(f)
+            sig, exp = payload["sig"], float(payload["exp"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        remaining = exp - time.time()
+        if not (isinstance(sig, str) and sig) or remaining <= 0:
+            return None
+        return sig, remaining
+
+    def _write(self, key: str, sig: str, ttl: float) -> None:
+        path = self._path(key, "json")
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "sig": sig, "exp": time.time() + ttl}, f)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.debug("statsig shared cache write failed: key={} error={}", key, exc)
+
+    def _try_lock(self, key: str, ttl: float) -> str | None:
+        path = self._path(key, "lock")
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    stale = time.time() - path.stat().st_mtime > ttl
+                except OSError:
+                    continue  # released between open() and stat() — retry
+                if not stale:
+                    return None
+                path.unlink(missing_ok=True)
+                continue
+            except OSError:
+                return ""  # unusable lock dir — behave as the owner
+            token = uuid.uuid4().hex
+            try:
+                os.write(fd, token.encode())
+            finally:
+                os.close(fd)
+            return token
+        return None
+
+    def _unlock(self, key: str, token: str) -> None:
+        path = self._path(key, "lock")
+        try:
+            if path.read_text() == token:
+                path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Multi-node store — Redis SET NX PX
+# ---------------------------------------------------------------------------
+
+# Delete the lock only if we still own it (it may have expired and been
+# re-taken by another process while we were signing).
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+  return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisSignatureStore(SignatureStore):
+    """Shares signatures between all replicas through Redis."""
+
+    name = "redis"
+
+    def __init__(self, redis, prefix: str = "statsig") -> None:
+        self._r = redis
+        self._prefix = prefix
+
+    def _key(self, kind: str, key: str) -> str:
+        return f"{self._prefix}:{kind}:{key}"
+
+    async def get(self, key: str) -> tuple[str, float] | None:
+        try:
+            async with self._r.pipeline(transaction=False) as pipe:
+                pipe.get(self._key("sig", key))
+                pipe.pttl(self._key("sig", key))
+                raw, pttl = await pipe.execute()
+        except (RedisError, OSError) as exc:
+            logger.debug("statsig shared cache read failed: key={} error={}", key, exc)
+            return None
+        if not raw or not pttl or pttl <= 0:
+            return None
+        return raw.decode() if isinstance(raw, bytes) else str(raw), pttl / 1000
+
+    async def put(self, key: str, sig: str, ttl: float) -> None:
+        try:
+            await self._r.set(self._key("sig", key), sig, px=max(1, int(ttl * 1000)))
+        except (RedisError, OSError) as exc:
+            logger.debug("statsig shared cache write failed: key={} error={}", key, exc)
+
+    async def acquire(self, key: str, ttl: float) -> str | None:
+        token = uuid.uuid4().hex
+        try:
+            ok = await self._r.set(
+                self._key("lock", key), token, nx=True, px=max(1, int(ttl * 1000))
+            )
+        except (RedisError, OSError) as exc:
+            logger.debug("statsig shared lock failed: key={} error={}", key, exc)
+            return ""  # Redis unreachable — behave as the owner
+        return token if ok else None
+
+    async def release(self, key: str, token: str) -> None:
+        if not token:
+            return
+        try:
+            await self._r.eval(_RELEASE_SCRIPT, 1, self._key("lock", key), token)
+        except (RedisError, OSError) as exc:
+            logger.debug("statsig shared unlock failed: key={} error={}", key, exc)
+
+    async def close(self) -> None:
+        await self._r.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Hit-ratio / signer-QPS accounting
+# ---------------------------------------------------------------------------
+
+
+class SignatureStats:
+    """Per-process counters for the admin signer status surface."""
+
+    _QPS_WINDOW_S = 60.0
+
+    def __init__(self) -> None:
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.sign_calls = 0
+        self._sign_ts: deque[float] = deque(maxlen=4096)
+
+    def record_sign(self) -> None:
+        self.sign_calls += 1
+        self._sign_ts.append(time.monotonic())
+
+    def signer_qps(self) -> float:
+        cutoff = time.monotonic() - self._QPS_WINDOW_S
+        while self._sign_ts and self._sign_ts[0] < cutoff:
+            self._sign_ts.popleft()
+        return len(self._sign_ts) / self._QPS_WINDOW_S
+
+    def snapshot(self) -> dict:
+        lookups = self.local_hits + self.shared_hits + self.misses
+        hits = self.local_hits + self.shared_hits
+        return {
+            "lookups": lookups,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "sign_calls": self.sign_calls,
+            "signer_qps": round(self.signer_qps(), 3),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+_store: SignatureStore | None = None
+_store_backend: str | None = None
+
+
+def _resolve_backend(name: str) -> str:
+    name = (name or "auto").strip().lower()
+    if name not in _SUPPORTED_BACKENDS:
+        logger.warning("unknown statsig.shared_cache={!r}; using auto", name)
+        name = "auto"
+    if name == "auto":
+        storage = os.getenv("ACCOUNT_STORAGE", "local").strip().lower()
+        return "redis" if storage == "redis" else "file"
+    return name
+
+
+def _make_store(backend: str) -> SignatureStore | None:
+    if backend == "file":
+        return FileSignatureStore(data_path("statsig"))
+    if backend == "redis":
+        url = os.getenv("ACCOUNT_REDIS_URL", "").strip()
+        if not url:
+            logger.warning("statsig shared cache: redis requires ACCOUNT_REDIS_URL")
+            return None
+        from redis.asyncio import Redis
+
+        return RedisSignatureStore(Redis.from_url(url, decode_responses=False))
+    return None
+
+
+def get_signature_store(name: str) -> SignatureStore | None:
+    """Return the shared store for the configured backend (``None`` = disabled).
+
+    Rebuilt only when the resolved backend changes (config hot-reload).
+    """
+    global _store, _store_backend
+    backend = _resolve_backend(name)
+    if backend != _store_backend:
+        try:
+            _store = _make_store(backend)
+        except (OSError, ValueError) as exc:
+            logger.warning("statsig shared cache unavailable: backend={} error={}", backend, exc)
+            _store = None
+        _store_backend = backend
+        if _store is not None:
+            logger.info("statsig shared cache enabled: backend={}", _store.name)
+    return _store
+
+
+__all__ = [
+    "FileSignatureStore",
+    "RedisSignatureStore",
+    "SignatureStats",
+    "SignatureStore",
+    "get_signature_store",
+]
@@ -0,0 +1,350 @@
+"""Async keep-alive client and endpoint pool for the statsig signer service.
+
+One ``aiohttp`` session per process keeps TCP connections to the signer open
+between calls, so a sign costs one request round-trip instead of a fresh
+connect + request on a thread-pool thread.
+
+``statsig.signer_url`` may list several signer instances; :class:`SignerPool`
+spreads signs across them by EWMA latency × in-flight count, keeps a circuit
+breaker per endpoint, and hedges a sign to a second endpoint once the first
+has been running longer than its own p95 latency.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import aiohttp
+import orjson
+
+from app.platform.logging.logger import logger
+
+# The signer is a Node ``http`` server whose default keepAliveTimeout is 5 s;
+# expire idle sockets on our side first so we never write to one it just closed.
+_KEEPALIVE_S = 4.0
+_POOL_LIMIT = 32
+
+
+class SignerError(Exception):
+    """Signer call failed (transport error, non-2xx or malformed reply)."""
+
+
+class SignerClient:
+    """Pooled HTTP client for ``POST /sign``.
+
+    The session is created lazily inside the running loop and recreated if a
+    previous one was closed (config reload / shutdown).
+    """
+
+    def __init__(self) -> None:
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=_POOL_LIMIT,
+                keepalive_timeout=_KEEPALIVE_S,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def sign(self, url: str, path: str, method: str, timeout: float) -> str:
+        """Return a real ``x-statsig-id`` for *method* *path* or raise SignerError."""
+        session = self._get_session()
+        body = orjson.dumps({"path": path, "method": method})
+        try:
+            async with session.post(
+                url,
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as resp:
+                raw = await resp.read()
+                if resp.status >= 400:
+                    raise SignerError(f"signer status={resp.status}")
+        except (aiohttp.ClientError, TimeoutError) as exc:
+            raise SignerError(str(exc) or type(exc).__name__) from exc
+        try:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError as exc:
+            raise SignerError("signer returned invalid JSON") from exc
+        sig = data.get("statsig") if isinstance(data, dict) else None
+        if not (isinstance(sig, str) and sig):
+            raise SignerError("signer returned no/empty statsig field")
+        return sig
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# ---------------------------------------------------------------------------
+# Endpoint pool
+# ---------------------------------------------------------------------------
+
+_EWMA_ALPHA = 0.3
+_P95_SAMPLES = 128
+_P95_MIN_SAMPLES = 10  # below this, hedge after half the timeout instead
+_HEDGE_FLOOR_S = 0.05
+_MAX_ATTEMPTS = 2  # primary + one hedge/failover — bounds worst-case latency
+
+
+@dataclass
+class SignerEndpoint:
+    """Live health of one signer instance.
+
+    Breaker states: closed (``open_until == 0``), open (``now < open_until``)
+    and half-open (window lapsed — exactly one trial sign is let through).
+    """
+
+    url: str
+    ewma_ms: float | None = None
+    inflight: int = 0
+    fails: int = 0  # consecutive failures
+    open_until: float = 0.0
+    trial: bool = False  # half-open trial in flight
+    ok_count: int = 0
+    fail_count: int = 0
+    hedged_count: int = 0
+    last_error: str = ""
+    _samples: deque[float] = field(default_factory=lambda: deque(maxlen=_P95_SAMPLES))
+
+    def available(self, now: float) -> bool:
+        if self.open_until == 0.0:
+            return True
+        return now >= self.open_until and not self.trial
+
+    def score(self) -> float:
+        # Unmeasured endpoints score as fast so they get sampled early.
+        return (self.ewma_ms or 1.0) * (1 + self.inflight)
+
+    def p95_s(self) -> float | None:
+        if len(self._samples) < _P95_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def record_ok(self, latency_s: float) -> None:
+        ms = latency_s * 1000
+        self.ewma_ms = ms if self.ewma_ms is None else (
+            _EWMA_ALPHA * ms + (1 - _EWMA_ALPHA) * self.ewma_ms
+        )
+        self._samples.append(latency_s)
+        self.ok_count += 1
+        if self.open_until:
+            logger.info("statsig signer endpoint recovered: url={}", self.url)
+        self.fails = 0
+        self.open_until = 0.0
+        self.trial = False
+
+    def record_fail(self, error: str, *, threshold: int, cooldown: float) -> None:
+        self.fail_count += 1
+        self.fails += 1
+        self.last_error = error
+        if self.trial or self.fails >= threshold:
+            if not self.open_until or self.trial:
+                logger.warning(
+                    "statsig signer endpoint circuit open: url={} fails={} cooldown_s={} error={}",
+                    self.url,
+                    self.fails,
+                    cooldown,
+                    error,
+                )
+            self.open_until = time.monotonic() + cooldown
+        self.trial = False
+
+    def snapshot(self, now: float) -> dict:
+        if self.open_until == 0.0:
+            state = "closed"
+        elif now < self.open_until:
+            state = "open"
+        else:
+            state = "half_open"
+        p95 = self.p95_s()
+        return {
+            "url": self.url,
+            "state": state,
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "inflight": self.inflight,
+            "consecutive_fails": self.fails,
+            "ok": self.ok_count,
+            "fail": self.fail_count,
+            "hedged": self.hedged_count,
+            "last_error": self.last_error,
+        }
+
+
+class SignerPool:
+    """Load-balanced, hedged signing across the configured signer endpoints."""
+
+    def __init__(self, client: SignerClient) -> None:
+        self._client = client
+        self._endpoints: dict[str, SignerEndpoint] = {}
+
+    def configure(self, urls: list[str]) -> None:
+        """Sync the endpoint set with config, keeping stats for unchanged URLs."""
+        if list(self._endpoints) == urls:
+            return
+        self._endpoints = {
+            url: self._endpoints.get(url) or SignerEndpoint(url) for url in urls
+        }
+
+    def _pick(self, exclude: set[str]) -> SignerEndpoint | None:
+        now = time.monotonic()
+        candidates = [
+            ep
+            for ep in self._endpoints.values()
+            if ep.url not in exclude and ep.available(now)
+        ]
+        if not candidates:
+            return None
+        best = min(ep.score() for ep in candidates)
+        ep = random.choice([ep for ep in candidates if ep.score() == best])
+        if ep.open_until:
+            ep.trial = True
+        return ep
+
+    async def _call(
+        self,
+        ep: SignerEndpoint,
+        path: str,
+        method: str,
+        timeout: float,
+        *,
+        threshold: int,
+        cooldown: float,
+    ) -> str:
+        ep.inflight += 1
+        started = time.monotonic()
+        try:
+            sig = await self._client.sign(ep.url, path, method, timeout)
+        except Exception as exc:
+            ep.record_fail(str(exc) or type(exc).__name__, threshold=threshold, cooldown=cooldown)
+            raise
+        else:
+            ep.record_ok(time.monotonic() - started)
+            return sig
+        finally:
+            ep.inflight -= 1
+
+    async def sign(
+        self,
+        path: str,
+        method: str,
+        timeout: float,
+        *,
+        hedge: bool = True,
+        threshold: int = 3,
+        cooldown: float = 30.0,
+    ) -> str:
+        """Sign via the best endpoint; hedge or fail over to one more.
+
+        Raises :class:`SignerError` when no endpoint is available or every
+        attempt failed.
+        """
+        tried: set[str] = set()
+        tasks: dict[asyncio.Task, SignerEndpoint] = {}
+        last_exc: BaseException | None = None
+
+        def launch() -> SignerEndpoint | None:
+            ep = self._pick(tried)
+            if ep is None:
+                return None
+            tried.add(ep.url)
+            task = asyncio.create_task(
+                self._call(
+                    ep, path, method, timeout, threshold=threshold, cooldown=cooldown
+                )
+            )
+            tasks[task] = ep
+            return ep
+
+        primary = launch()
+        if primary is None:
+            raise SignerError("no signer endpoint available (all circuits open)")
+        hedge_after: float | None = None
+        if hedge and len(self._endpoints) > 1:
+            p95 = primary.p95_s()
+            hedge_after = max(p95, _HEDGE_FLOOR_S) if p95 is not None else timeout / 2
+
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    set(tasks), timeout=hedge_after, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Primary is past its p95 — race a second endpoint.
+                    hedge_after = None
+                    if len(tried) < _MAX_ATTEMPTS and launch() is not None:
+                        primary.hedged_count += 1
+                    continue
+                for task in done:
+                    tasks.pop(task, None)
+                    if task.exception() is None:
+                        return task.result()
+                    last_exc = task.exception()
+                if not tasks and len(tried) < _MAX_ATTEMPTS:
+                    hedge_after = None
+                    launch()  # fail over; loop exits if nothing was launched
+        finally:
+            for task, ep in tasks.items():
+                task.cancel()
+                ep.trial = False  # hedge loser — not a verdict on the endpoint
+
+        if isinstance(last_exc, SignerError):
+            raise last_exc
+        raise SignerError(str(last_exc) or "signer request failed") from last_exc
+
+    def health(self) -> list[dict]:
+        now = time.monotonic()
+        return [ep.snapshot(now) for ep in self._endpoints.values()]
+
+
+_client: SignerClient | None = None
+_pool: SignerPool | None = None
+
+
+def get_signer_client() -> SignerClient:
+    global _client
+    if _client is None:
+        _client = SignerClient()
+    return _client
+
+
+def get_signer_pool(urls: list[str]) -> SignerPool:
+    """Return the process-wide pool, synced to the configured *urls*."""
+    global _pool
+    if _pool is None:
+        _pool = SignerPool(get_signer_client())
+    _pool.configure(urls)
+    return _pool
+
+
+def signer_endpoints_health() -> list[dict]:
+    return _pool.health() if _pool is not None else []
+
+
+async def close_signer_client() -> None:
+    """Close the pooled signer connections (application shutdown)."""
+    if _client is not None:
+        try:
+            await _client.close()
+        except (aiohttp.ClientError, OSError) as exc:
+            logger.debug("signer client close failed: error={}", exc)
+
+
+__all__ = [
+    "SignerClient",
+    "SignerEndpoint",
+    "SignerError",
+    "SignerPool",
+    "close_signer_client",
+    "get_signer_client",
+    "get_signer_pool",
+    "signer_endpoints_health",
+]
@@ -0,0 +1,337 @@
+"""Egress warm pool — pre-handshaken curl_cffi sessions per egress node.
+
+Without it every :class:`~.session.ResettableSession` opens its own
+``AsyncSession`` and pays a cold TCP + proxy CONNECT/SOCKS + TLS handshake
+before the first upstream byte.  The pool keeps one long-lived
+``AsyncSession`` per (egress node, impersonation profile, curl options);
+libcurl's per-multi connection cache then holds the handshaken connections,
+and a background loop fed by :class:`ProxyDirectory`'s node list opens
+``proxy.warm_pool.connections`` of them to each ``proxy.warm_pool.hosts``
+entry and re-touches them before curl's idle max-age closes them.
+
+Retirement: a ``ResettableSession`` reset (transport error / reset status)
+retires the pooled session it was using, and a clearance change retires all
+of them.  A retired session is closed once its last borrower returns it, so
+in-flight streams are never cut.
+
+Pooled sessions are shared between accounts, so they run with
+``discard_cookies=True``; per-request cookie state lives on the borrowing
+``ResettableSession`` instead.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from curl_cffi import CurlError
+
+from app.platform.config.snapshot import get_config
+from app.platform.logging.logger import logger
+
+# Only sessions built from these kwargs are interchangeable between callers.
+_POOLABLE_KWARGS = frozenset({"impersonate", "proxy", "proxies", "curl_options"})
+# Concurrent transfers per pooled session (curl_cffi default is 10).
+_MAX_CLIENTS = 64
+_WARM_TIMEOUT_S = 15.0
+
+WarmKey = tuple[str, str, tuple]
+
+
+@dataclass
+class WarmEntry:
+    """One pooled session and its borrow/warm bookkeeping."""
+
+    key: WarmKey
+    session: Any
+    users: int = 0
+    retired: bool = False
+    warmed_at: float = 0.0
+    warm_ok: int = 0
+    warm_fail: int = 0
+    warm_ms: float | None = None
+    hosts: set[str] = field(default_factory=set)
+
+    def snapshot(self) -> dict:
+        return {
+            "proxy": self.key[0] or "direct",
+            "impersonate": self.key[1],
+            "hosts": sorted(self.hosts),
+            "users": self.users,
+            "warm_ok": self.warm_ok,
+            "warm_fail": self.warm_fail,
+            "last_warm_ms": round(self.warm_ms, 1) if self.warm_ms is not None else None,
+            "warmed_age_s": round(time.monotonic() - self.warmed_at, 1)
+            if self.warmed_at
+            else None,
+        }
+
+
+def warm_key(kwargs: dict[str, Any]) -> WarmKey | None:
+    """Pool key for ``AsyncSession`` *kwargs*, or ``None`` if not shareable."""
+    if not kwargs.keys() <= _POOLABLE_KWARGS:
+        return None
+    proxies = kwargs.get("proxies") or {}
+    proxy = kwargs.get("proxy") or proxies.get("https") or proxies.get("http") or ""
+    opts = kwargs.get("curl_options") or {}
+    return (
+        proxy,
+        str(kwargs.get("impersonate") or ""),
+        tuple(sorted((int(k), v) for k, v in opts.items())),
+    )
+
+
+class EgressWarmPool:
+    """Process-wide pool of pre-warmed egress sessions."""
+
+    def __init__(self) -> None:
+        self._entries: dict[WarmKey, WarmEntry] = {}
+        self._task: asyncio.Task | None = None
+        self._running = False
+        self.borrow_hits = 0
+        self.borrow_misses = 0
+        self.retired = 0
+
+    # ------------------------------------------------------------------
+    # Config
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def connections() -> int:
+        return max(0, get_config().get_int("proxy.warm_pool.connections", 0))
+
+    @property
+    def enabled(self) -> bool:
+        return self.connections() > 0
+
+    # ------------------------------------------------------------------
+    # Borrow / return (called by ResettableSession)
+    # ------------------------------------------------------------------
+
+    def _new_entry(self, key: WarmKey, kwargs: dict[str, Any]) -> WarmEntry:
+        from curl_cffi.requests import AsyncSession
+
+        session = AsyncSession(
+            max_clients=_MAX_CLIENTS, discard_cookies=True, **kwargs
+        )
+        entry = WarmEntry(key=key, session=session)
+        self._entries[key] = entry
+        return entry
+
+    def borrow(self, kwargs: dict[str, Any]) -> WarmEntry | None:
+        """Share the pooled session matching *kwargs* (``None`` = use a private one)."""
+        if not self.enabled:
+            return None
+        key = warm_key(kwargs)
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.borrow_misses += 1
+            entry = self._new_entry(key, kwargs)
+        elif entry.warmed_at:
+            self.borrow_hits += 1
+        else:
+            self.borrow_misses += 1
+        entry.users += 1
+        return entry
+
+    async def give_back(self, entry: WarmEntry) -> None:
+        entry.users = max(0, entry.users - 1)
+        if entry.retired and entry.users == 0:
+            await self._close(entry)
+
+    def retire(self, entry: WarmEntry, reason: str) -> None:
+        """Stop handing *entry* out; it closes once its last borrower leaves."""
+        if entry.retired:
+            return
+        entry.retired = True
+        self.retired += 1
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+        logger.debug(
+            "egress warm session retired: proxy={} reason={} users={}",
+            entry.key[0] or "direct",
+            reason,
+            entry.users,
+        )
+        if entry.users == 0:
+            asyncio.get_running_loop().create_task(self._close(entry))
+
+    def retire_all(self, reason: str) -> None:
+        for entry in list(self._entries.values()):
+            self.retire(entry, reason)
+
+    async def _close(self, entry: WarmEntry) -> None:
+        try:
+            await entry.session.close()
+        except (CurlError, OSError) as exc:
+            logger.debug("egress warm session close failed: error={}", exc)
+
+    # ------------------------------------------------------------------
+    # Warming
+    # ------------------------------------------------------------------
+
+    async def warm(self, entry: WarmEntry, hosts: list[str], count: int) -> None:
+        """Open (or keep alive) *count* connections from *entry* to each host.
+
+        Any HTTP status counts — the point is the handshake, not the reply.
+        """
+        started = time.monotonic()
+
+        async def _touch(host: str) -> bool:
+            try:
+                await entry.session.head(
+                    f"https://{host}/",
+                    timeout=_WARM_TIMEOUT_S,
+                    allow_redirects=False,
+                )
+                return True
+            except (CurlError, OSError) as exc:
+                logger.debug(
+                    "egress warm request failed: proxy={} host={} error={}",
+                    entry.key[0] or "direct",
+                    host,
+                    exc,
+                )
+                return False
+
+        entry.users += 1  # keep a concurrent retire from closing it mid-warm
+        try:
+            results = await asyncio.gather(
+                *(_touch(host) for host in hosts for _ in range(count))
+            )
+        finally:
+            await self.give_back(entry)
+        ok = sum(results)
+        entry.warm_ok += ok
+        entry.warm_fail += len(results) - ok
+        if ok:
+            entry.warmed_at = time.monotonic()
+            entry.warm_ms = (entry.warmed_at - started) * 1000
+            entry.hosts.update(hosts)
+
+    async def warm_nodes(self) -> int:
+        """Warm one session per current egress node; retire sessions for gone nodes."""
+        from app.control.proxy import get_proxy_directory
+        from app.control.proxy.models import EgressMode, ProxyLease
+
+        from .session import build_session_kwargs
+
+        cfg = get_config()
+        count = self.connections()
+        hosts = cfg.get_list("proxy.warm_pool.hosts", ["grok.com"])
+        if count <= 0 or not hosts:
+            self.retire_all("disabled")
+            return 0
+
+        directory = await get_proxy_directory()
+        if directory.egress_mode == EgressMode.DIRECT:
+            proxy_urls: list[str | None] = [None]
+        else:
+            proxy_urls = [n.proxy_url for n in directory.nodes if n.healthy]
+        bundles = directory.bundles
+
+        live: set[WarmKey] = set()
+        jobs = []
+        for proxy_url in proxy_urls:
+            # Match the lease real requests get, so they land on this session.
+            bundle = bundles.get((proxy_url or "direct", "grok.com"))
+            lease = ProxyLease(
+                lease_id="warm",
+                proxy_url=proxy_url,
+                user_agent=bundle.user_agent if bundle else "",
+            )
+            kwargs = build_session_kwargs(lease=lease)
+            key = warm_key(kwargs)
+            if key is None:
+                continue
+            live.add(key)
+            entry = self._entries.get(key) or self._new_entry(key, kwargs)
+            jobs.append(self.warm(entry, hosts, count))
+
+        for key, entry in list(self._entries.items()):
+            if key not in live and entry.users == 0:
+                self.retire(entry, "node_removed")
+
+        await asyncio.gather(*jobs)
+        return len(jobs)
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info("egress warm pool started")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for entry in list(self._entries.values()):
+            entry.retired = True
+            await self._close(entry)
+        self._entries.clear()
+        logger.info("egress warm pool stopped")
+
+    async def _loop(self) -> None:
+        while self._running:
+            try:
+                if self.enabled:
+                    warmed = await self.warm_nodes()
+                    logger.debug("egress warm pool refreshed: sessions={}", warmed)
+                # Stay under libcurl's 118 s idle max-age so warm connections
+                # are re-touched before curl drops them.
+                interval = get_config().get_int("proxy.warm_pool.interval_sec", 60)
+                await asyncio.sleep(max(5, interval))
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:  # noqa: BLE001 — the loop must outlive any one pass
+                logger.warning(
+                    "egress warm pool loop failed: error_type={} error={}",
+                    type(exc).__name__,
+                    exc,
+                )
+                await asyncio.sleep(30)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "borrow_hits": self.borrow_hits,
+            "borrow_misses": self.borrow_misses,
+            "retired": self.retired,
+            "sessions": [e.snapshot() for e in self._entries.values()],
+        }
+
+
+_pool: EgressWarmPool | None = None
+
+
+def get_warm_pool() -> EgressWarmPool:
+    global _pool
+    if _pool is None:
+        _pool = EgressWarmPool()
+    return _pool
+
+
+def retire_warm_sessions(reason: str) -> None:
+    """Retire every pooled session (clearance change)."""
+    if _pool is not None:
+        _pool.retire_all(reason)
+
+
+__all__ = [
+    "EgressWarmPool",
+    "WarmEntry",
+    "get_warm_pool",
+    "retire_warm_sessions",
+    "warm_key",
+]
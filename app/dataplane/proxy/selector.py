@@ -3,12 +3,71 @@
 Extracted from ProxyDirectory.acquire() to formalize the dataplane separation.
 """
 
+import hashlib
+import random
+
 from app.control.proxy.models import (
-    EgressMode, EgressNode, EgressNodeState,
+    EgressMode, EgressNode, EgressNodeState, PoolStrategy,
     ProxyScope, RequestKind,
 )
 from .table import ProxyRuntimeTable
 
+# Latency assumed for a node with no live or probed measurement yet.
+_DEFAULT_LATENCY_MS = 500.0
+# How hard the error rate (1 - health) inflates a node's score.
+_ERROR_WEIGHT = 4.0
+
+
+def node_score(node: EgressNode) -> float:
+    """Expected cost of sending one more request to *node* (lower is better)."""
+    latency = node.ewma_ms or node.latency_ms or _DEFAULT_LATENCY_MS
+    error_rate = max(0.0, 1.0 - node.health)
+    return (node.inflight + 1) * latency * (1.0 + _ERROR_WEIGHT * error_rate)
+
+
+def select_pool_node(
+    nodes: list[EgressNode],
+    *,
+    strategy: PoolStrategy = PoolStrategy.P2C,
+    cursor: int = 0,
+    account_id: str | None = None,
+    max_inflight: int = 0,
+) -> EgressNode | None:
+    """Pick one node from a static proxy pool.
+
+    Nodes at *max_inflight* (``0`` = unlimited) are skipped while any node has
+    headroom; once every node is saturated the cap is ignored rather than
+    failing the request. ``ACCOUNT`` without an *account_id* behaves as ``P2C``.
+    """
+    if not nodes:
+        return None
+    candidates = [
+        n for n in nodes if n.state == EgressNodeState.HEALTHY and n.healthy
+    ] or list(nodes)
+    if max_inflight > 0:
+        candidates = [n for n in candidates if n.inflight < max_inflight] or candidates
+
+    if strategy == PoolStrategy.CURSOR:
+        return candidates[cursor % len(candidates)]
+
+    if strategy == PoolStrategy.ACCOUNT and account_id:
+        # Hash over the full pool so the mapping only moves when the pool does;
+        # scan forward past saturated/unhealthy nodes.
+        allowed = {id(n) for n in candidates}
+        start = int(hashlib.md5(account_id.encode()).hexdigest(), 16) % len(nodes)
+        for k in range(len(nodes)):
+            node = nodes[(start + k) % len(nodes)]
+            if id(node) in allowed:
+                return node
+
+    if strategy == PoolStrategy.LEAST_INFLIGHT:
+        return min(candidates, key=lambda n: (n.inflight, node_score(n)))
+
+    if len(candidates) == 1:
+        return candidates[0]
+    a, b = random.sample(candidates, 2)
+    return a if node_score(a) <= node_score(b) else b
+
 
 def select_proxy(
     table: ProxyRuntimeTable,
@@ -27,13 +86,13 @@ def select_proxy(
             return table.nodes[0].proxy_url
         return None
 
-    # PROXY_POOL: pick the node with lowest inflight count.
+    # PROXY_POOL: power-of-two-choices over the healthy nodes.
     healthy = table.healthy_nodes()
     if not healthy:
         return None
 
-    best = min(healthy, key=lambda n: n.inflight)
-    return best.proxy_url
+    best = select_pool_node(healthy)
+    return best.proxy_url if best else None
 
 
-__all__ = ["select_proxy"]
+__all__ = ["node_score", "select_pool_node", "select_proxy"]
@@ -7,6 +7,10 @@ Tries multiple formats in priority order:
   4. Alternative XML tags (<function_call>, <invoke>)
 
 Returns a list of ParsedToolCall dataclasses.
+
+:class:`StreamingToolCallParser` handles the canonical XML format
+incrementally, turning a ``<tool_calls>`` block into per-call start /
+argument-delta / end events while it is still being generated.
 """
 
 from __future__ import annotations
@@ -29,9 +33,13 @@ class ParsedToolCall:
     name: str
     arguments: str          # always a JSON string
 
+    @staticmethod
+    def new_call_id() -> str:
+        return f"call_{int(time.time() * 1000)}{os.urandom(3).hex()}"
+
     @staticmethod
     def make(name: str, arguments: Any) -> "ParsedToolCall":
-        call_id = f"call_{int(time.time() * 1000)}{os.urandom(3).hex()}"
+        call_id = ParsedToolCall.new_call_id()
         if isinstance(arguments, str):
             args_str = arguments
         else:
@@ -42,6 +50,25 @@ class ParsedToolCall:
         return ParsedToolCall(call_id=call_id, name=name, arguments=args_str)
 
 
+@dataclass(slots=True)
+class ToolCallDelta:
+    """One incremental tool-call event from :class:`StreamingToolCallParser`.
+
+    kind:
+    - ``start`` — a call was recognised (``name`` set, no arguments yet)
+    - ``args``  — ``arguments`` is the next piece of the argument JSON
+    - ``end``   — call complete; ``name`` and the full, valid ``arguments``
+    - ``drop``  — a started call was abandoned (block truncated or argument
+      JSON invalid); it is not part of the parsed calls
+    """
+
+    kind: str
+    index: int
+    call_id: str
+    name: str = ""
+    arguments: str = ""
+
+
 @dataclass
 class ParseResult:
     calls: list[ParsedToolCall] = field(default_factory=list)
@@ -72,13 +99,15 @@ def parse_tool_calls(
         return result
     result.saw_tool_syntax = True
 
-    # Try parsers in priority order
-    calls = (
-        _parse_xml_tool_calls(text)
-        or _parse_json_envelope(text)
-        or _parse_json_array(text)
-        or _parse_alt_xml(text)
-    )
+    # Try parsers in priority order.  A canonical block with calls in it is
+    # final even when none of them survive, as in the streaming path.
+    calls = _parse_xml_tool_calls(text)
+    if calls is None:
+        calls = (
+            _parse_json_envelope(text)
+            or _parse_json_array(text)
+            or _parse_alt_xml(text)
+        )
 
     if calls and available_tools:
         calls = [c for c in calls if c.name in available_tools]
@@ -105,30 +134,21 @@ def _has_tool_syntax(text: str) -> bool:
 # Parser 1: <tool_calls> XML (canonical)
 # ---------------------------------------------------------------------------
 
-_XML_ROOT_RE    = re.compile(r"<tool_calls\s*>(.*?)</tool_calls\s*>", re.DOTALL | re.IGNORECASE)
-_XML_CALL_RE    = re.compile(r"<tool_call\s*>(.*?)</tool_call\s*>",   re.DOTALL | re.IGNORECASE)
-_XML_NAME_RE    = re.compile(r"<tool_name\s*>(.*?)</tool_name\s*>",   re.DOTALL | re.IGNORECASE)
-_XML_PARAMS_RE  = re.compile(r"<parameters\s*>(.*?)</parameters\s*>", re.DOTALL | re.IGNORECASE)
+def _parse_xml_tool_calls(text: str) -> list[ParsedToolCall] | None:
+    """Calls of the first ``<tool_calls>`` block; ``None`` if it has no ``<tool_call>``.
 
-
-def _parse_xml_tool_calls(text: str) -> list[ParsedToolCall]:
-    root_m = _XML_ROOT_RE.search(text)
-    if not root_m:
-        return []
-    calls: list[ParsedToolCall] = []
-    for call_m in _XML_CALL_RE.finditer(root_m.group(1)):
-        inner = call_m.group(1)
-        name_m   = _XML_NAME_RE.search(inner)
-        params_m = _XML_PARAMS_RE.search(inner)
-        if not name_m:
-            continue
-        name   = name_m.group(1).strip()
-        params = params_m.group(1).strip() if params_m else "{}"
-        parsed_args = _parse_json_tolerant(params)
-        if parsed_args is None:
-            continue
-        calls.append(ParsedToolCall.make(name, parsed_args))
-    return calls
+    Runs :class:`StreamingToolCallParser` over the whole text so the batch
+    and streaming paths always agree on which calls a block holds.
+    """
+    parser = StreamingToolCallParser()
+    parser.feed(text)
+    parser.finish()
+    if not parser.saw_call:
+        return None
+    return [
+        ParsedToolCall(call_id=c.call_id, name=c.name, arguments=_compact_json(c.arguments))
+        for c in parser.calls
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -262,3 +282,284 @@ def _try_repair_json(s: str) -> Any:
         return json.loads(fixed)
     except (json.JSONDecodeError, ValueError):
         return None
+
+
+# ---------------------------------------------------------------------------
+# Streaming parser for the canonical <tool_calls> XML format
+# ---------------------------------------------------------------------------
+
+_STREAM_TAG_RE = re.compile(
+    r"<(/?)(tool_calls|tool_call|tool_name|parameters)\s*>", re.IGNORECASE
+)
+# Possible start of a tag still being generated at the end of the buffer.
+_STREAM_TAG_PREFIX_RE = re.compile(r"</?[a-z_]*\s*\Z", re.IGNORECASE)
+# Characters that change JSON string state or are invalid inside a string.
+_JSON_STRING_SIGNIFICANT_RE = re.compile(r'["\\\x00-\x1f]')
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+
+class _JsonControlEscaper:
+    """Escapes raw control characters inside the JSON strings of a text.
+
+    The text may arrive in pieces; string and backslash state carry over.
+    """
+
+    __slots__ = ("_esc", "_in_str")
+
+    def __init__(self) -> None:
+        self._in_str = False   # inside a JSON string
+        self._esc = False      # ... right after a backslash
+
+    def escape(self, piece: str) -> str:
+        in_str, skip = self._in_str, 0 if self._esc else -1
+        self._esc = False
+        out: list[str] = []
+        last = 0
+        for m in _JSON_STRING_SIGNIFICANT_RE.finditer(piece):
+            i = m.start()
+            if i == skip:
+                continue
+            c = piece[i]
+            if c == '"':
+                in_str = not in_str
+            elif not in_str:
+                continue
+            elif c == "\\":
+                if i + 1 < len(piece):
+                    skip = i + 1
+                else:
+                    self._esc = True
+            else:
+                out.append(piece[last:i])
+                out.append(_CONTROL_ESCAPES.get(c) or f"\\u{ord(c):04x}")
+                last = i + 1
+        self._in_str = in_str
+        if not out:
+            return piece
+        out.append(piece[last:])
+        return "".join(out)
+
+
+def _compact_json(text: str) -> str:
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":"))
+
+
+def _valid_arguments(arguments: str) -> str | None:
+    """*arguments* if it is a JSON document, else its repaired form or ``None``."""
+    try:
+        json.loads(arguments)
+        return arguments
+    except (json.JSONDecodeError, ValueError):
+        pass
+    repaired = _try_repair_json(arguments)
+    if repaired is None:
+        return None
+    return json.dumps(repaired, ensure_ascii=False, separators=(",", ":"))
+
+
+class StreamingToolCallParser:
+    """Incremental parser for ``<tool_call><tool_name/><parameters/></tool_call>``.
+
+    Feed it the captured ``<tool_calls>`` block in arbitrary pieces; drain
+    :class:`ToolCallDelta` events with :meth:`drain`.  A call whose name comes
+    before ``<parameters>`` streams its argument text as it arrives (stripped
+    like the batch parser strips it); otherwise it is emitted whole at
+    ``</tool_call>``.
+
+    Arguments are the model's JSON text with raw control characters inside
+    strings escaped as they stream — the repair :func:`parse_tool_calls`
+    applies to the whole text.  A call is completed only at its
+    ``</tool_call>`` and only with arguments that parse (after the batch
+    repair); otherwise it is dropped, with a ``drop`` event when it had
+    already started streaming.  Only the first ``<tool_calls>`` block is
+    read.  :func:`parse_tool_calls` uses this parser for the canonical
+    format, so both paths find the same calls.
+    """
+
+    __slots__ = (
+        "_args",
+        "_args_seen",
+        "_buf",
+        "_call_id",
+        "_closed",
+        "_escaper",
+        "_events",
+        "_index",
+        "_name",
+        "_name_done",
+        "_name_parts",
+        "_opened",
+        "_params_done",
+        "_started",
+        "_state",
+        "_tool_names",
+        "_ws_hold",
+        "calls",
+        "saw_call",
+    )
+
+    def __init__(self, tool_names: list[str] | None = None) -> None:
+        self._tool_names = tool_names
+        self._buf = ""
+        self._state = "outside"   # outside | call | name | params
+        self._name_parts: list[str] = []
+        self._name = ""
+        self._args: list[str] = []
+        self._call_id = ""
+        self._started = False     # start event sent for the current call
+        self._ws_hold = ""        # trailing whitespace not yet known to be inner
+        self._args_seen = False   # non-whitespace argument text seen
+        self._escaper = _JsonControlEscaper()
+        self._name_done = False   # the call's <tool_name> was opened
+        self._params_done = False # ... its <parameters>
+        self._opened = False      # <tool_calls> seen
+        self._closed = False      # </tool_calls> seen; the rest is ignored
+        self._index = 0           # index of the next call (dropped ones included)
+        self._events: list[ToolCallDelta] = []
+        self.calls: list[ParsedToolCall] = []
+        self.saw_call = False     # any <tool_call> element opened
+
+    def feed(self, text: str) -> None:
+        buf = self._buf + text if self._buf else text
+        pos = 0
+        while not self._closed:
+            m = _STREAM_TAG_RE.search(buf, pos)
+            if m is None:
+                lt = buf.rfind("<", pos)
+                cut = lt if lt != -1 and _STREAM_TAG_PREFIX_RE.match(buf, lt) else len(buf)
+                self._on_text(buf[pos:cut])
+                self._buf = buf[cut:]
+                return
+            self._on_text(buf[pos : m.start()])
+            if not self._on_tag(bool(m.group(1)), m.group(2).lower()):
+                self._on_text(m.group(0))
+            pos = m.end()
+        self._buf = ""
+
+    def finish(self) -> None:
+        """End of input: drop a call left open by a truncated stream."""
+        if self._buf:
+            self._on_text(self._buf)
+            self._buf = ""
+        if self._state != "outside":
+            self._end_call(closed=False)
+
+    def drain(self) -> list[ToolCallDelta]:
+        events, self._events = self._events, []
+        return events
+
+    def emit_whole(self, call: ParsedToolCall) -> None:
+        """Emit an already-parsed call (fallback formats) as start/args/end."""
+        index = self._index
+        self._index += 1
+        self.calls.append(call)
+        self._events.append(ToolCallDelta("start", index, call.call_id, call.name))
+        self._events.append(ToolCallDelta("args", index, call.call_id, arguments=call.arguments))
+        self._events.append(ToolCallDelta("end", index, call.call_id, call.name, call.arguments))
+
+    # ------------------------------------------------------------------
+
+    def _allowed(self, name: str) -> bool:
+        return bool(name) and (not self._tool_names or name in self._tool_names)
+
+    def _on_text(self, text: str) -> None:
+        if not text:
+            return
+        if self._state == "name":
+            self._name_parts.append(text)
+        elif self._state == "params":
+            if not self._args_seen:
+                text = text.lstrip()
+                if not text:
+                    return
+                self._args_seen = True
+            body = text.rstrip()
+            if not body:
+                self._ws_hold += text
+                return
+            piece = self._escaper.escape(self._ws_hold + body)
+            self._ws_hold = text[len(body):]
+            self._args.append(piece)
+            if self._started:
+                self._events.append(
+                    ToolCallDelta("args", self._index, self._call_id, arguments=piece)
+                )
+
+    def _end_call(self, *, closed: bool) -> None:
+        self._state = "outside"
+        if not self._allowed(self._name):
+            return
+        index = self._index
+        # <parameters> missing or empty — same default as parse_tool_calls.
+        arguments = _valid_arguments("".join(self._args) or "{}") if closed else None
+        if arguments is None:
+            if self._started:
+                self._index += 1
+                self._events.append(ToolCallDelta("drop", index, self._call_id))
+            return
+        self._index += 1
+        if not self._started:
+            self._events.append(ToolCallDelta("start", index, self._call_id, self._name))
+            self._events.append(ToolCallDelta("args", index, self._call_id, arguments=arguments))
+        elif not self._args:
+            self._events.append(ToolCallDelta("args", index, self._call_id, arguments=arguments))
+        self.calls.append(ParsedToolCall(call_id=self._call_id, name=self._name, arguments=arguments))
+        self._events.append(ToolCallDelta("end", index, self._call_id, self._name, arguments))
+
+    def _on_tag(self, closing: bool, tag: str) -> bool:
+        """Apply a tag; ``False`` when it is plain text in the current element.
+
+        ``<tool_call>``, ``</tool_call>`` and ``</tool_calls>`` always count;
+        inside a name or arguments only the matching close tag does, and a
+        call keeps its first name and parameters.
+        """
+        if tag == "tool_calls":
+            if not closing:
+                if self._state in ("name", "params"):
+                    return False
+                self._opened = True
+            elif self._opened:
+                if self._state != "outside":
+                    self._end_call(closed=False)
+                self._closed = True
+            return True
+        if not self._opened:
+            return True
+        if tag == "tool_call":
+            if not closing:
+                if self._state != "outside":
+                    self._end_call(closed=False)
+                self.saw_call = True
+                self._state = "call"
+                self._name_parts, self._name, self._args = [], "", []
+                self._call_id = ParsedToolCall.new_call_id()
+                self._started = self._args_seen = False
+                self._name_done = self._params_done = False
+                self._escaper = _JsonControlEscaper()
+                self._ws_hold = ""
+            elif self._state != "outside":
+                self._end_call(closed=True)
+            return True
+
+        if self._state == "name":
+            if tag != "tool_name" or not closing:
+                return False
+            self._name = "".join(self._name_parts).strip()
+            self._state = "call"
+        elif self._state == "params":
+            if tag != "parameters" or not closing:
+                return False
+            self._state = "call"
+        elif self._state == "call" and not closing:
+            if tag == "tool_name" and not self._name_done:
+                self._name_done = True
+                self._state = "name"
+            elif tag == "parameters" and not self._params_done:
+                self._params_done = True
+                self._state = "params"
+                if not self._started and self._allowed(self._name):
+                    self._started = True
+                    self._events.append(
+                        ToolCallDelta("start", self._index, self._call_id, self._name)
+                    )
+        return True
@@ -8,6 +8,10 @@ from __future__ import annotations
 import json
 from typing import Any
 
+import orjson
+
+from app.platform.runtime.memo import ByteLRU
+
 # ---------------------------------------------------------------------------
 # Instruction template
 # ---------------------------------------------------------------------------
@@ -48,6 +52,11 @@ _CHOICE_REQUIRED = "WHEN TO CALL: You MUST output a <tool_calls> XML block. Do N
 _CHOICE_FORCED   = "WHEN TO CALL: You MUST output a <tool_calls> XML block calling the tool named \"{name}\". Do NOT write any plain-text reply under any circumstances."
 
 
+# Rendered prompts keyed by the serialised (tools, tool_choice) — agent loops
+# send the same tool list on every turn.
+_PROMPT_CACHE = ByteLRU(4 * 1024 * 1024)
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -63,12 +72,23 @@ def build_tool_system_prompt(
         tool_choice: OpenAI tool_choice value — "auto" | "none" | "required" |
                      {"type": "function", "function": {"name": "..."}}
     """
+    try:
+        key: bytes | None = orjson.dumps([tools, tool_choice])
+    except TypeError:
+        key = None
+    if key is not None:
+        cached = _PROMPT_CACHE.get(key)
+        if cached is not None:
+            return cached
     tool_defs = _format_tool_definitions(tools)
     choice_instruction = _build_choice_instruction(tools, tool_choice)
-    return _TOOL_SYSTEM_HEADER.format(
+    prompt = _TOOL_SYSTEM_HEADER.format(
         tool_definitions=tool_defs,
         tool_choice_instruction=choice_instruction,
     )
+    if key is not None:
+        _PROMPT_CACHE.put(key, prompt, len(key) + len(prompt))
+    return prompt
 
 
 def extract_tool_names(tools: list[dict[str, Any]]) -> list[str]:
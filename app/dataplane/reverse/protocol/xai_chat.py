@@ -21,8 +21,13 @@ def build_chat_payload(
     tool_overrides:        dict[str, Any]   | None = None,
     model_config_override: dict[str, Any]   | None = None,
     request_overrides:     dict[str, Any]   | None = None,
+    parent_response_id:    str              | None = None,
 ) -> dict[str, Any]:
-    """Build the JSON payload for POST /rest/app-chat/conversations/new."""
+    """Build the JSON payload for POST /rest/app-chat/conversations/new.
+
+    With ``parent_response_id`` the payload continues an existing
+    conversation (POST /rest/app-chat/conversations/{id}/responses).
+    """
     cfg = get_config()
 
     payload: dict[str, Any] = {
@@ -66,6 +71,9 @@ def build_chat_payload(
         },
     }
 
+    if parent_response_id:
+        payload["parentResponseId"] = parent_response_id
+
     custom = cfg.get_str("features.custom_instruction", "").strip()
     if custom:
         payload["customPersonality"] = custom
@@ -232,6 +240,8 @@ class StreamAdapter:
         "thinking_buf",
         "text_buf",
         "image_urls",
+        "conversation_id",
+        "response_id",
     )
 
     def __init__(self) -> None:
@@ -253,6 +263,8 @@ class StreamAdapter:
         self.thinking_buf: list[str] = []
         self.text_buf: list[str] = []
         self.image_urls: list[tuple[str, str]] = []   # [(url, imageUuid), ...]
+        self.conversation_id: str = ""                # 上游会话 ID（新建会话时下发）
+        self.response_id: str = ""                    # 本轮 modelResponse.responseId
 
     # 搜索信源追加：当配置启用且有 webSearchResults 时，格式化为 ## Sources 段落
     # 标记行 [grok2api-sources]: # 是 markdown link reference definition，渲染器不显示，
@@ -294,21 +306,60 @@ class StreamAdapter:
     # Public API
     # ------------------------------------------------------------------
 
-    def feed(self, data: str) -> list[FrameEvent]:
-        """Parse one JSON ``data:`` payload; return 0-N events."""
+    def feed(self, data: str | bytes) -> list[FrameEvent]:
+        """Parse one JSON ``data:`` payload; return 0-N events.
+
+        Plain answer-token frames (the overwhelming majority) take a short
+        path; anything carrying cards, search results, tool usage, thinking,
+        errors or end signals goes through :meth:`_feed_full`.
+        """
         try:
             obj = orjson.loads(data)
         except (orjson.JSONDecodeError, ValueError, TypeError):
             return []
+        # Fast path: a ``final`` answer token with none of the keys that make
+        # _feed_full do more than _clean_token + append.  Output is identical.
+        if type(obj) is dict and "error" not in obj:
+            result = obj.get("result")
+            resp = result.get("response", result) if type(result) is dict else None
+            if (
+                type(resp) is dict
+                and resp.get("messageTag") == "final"
+                and resp.get("isThinking") is not True
+                and "cardAttachment" not in resp
+                and "webSearchResults" not in resp
+                and "xSearchResults" not in resp
+                and "toolUsageCardId" not in resp
+            ):
+                token = resp.get("token")
+                if type(token) is str and "<grok:render" not in token:
+                    self._content_started = True
+                    if not token:
+                        return []
+                    self.text_buf.append(token)
+                    self._text_offset += len(token)
+                    return [FrameEvent("text", token)]
+        return self._feed_full(obj)
+
+    def _feed_full(self, obj: Any) -> list[FrameEvent]:
         raise_for_stream_error(obj)
 
         result = obj.get("result")
         if not result:
             return []
-        resp = result.get("response")
+        conversation = result.get("conversation")
+        if type(conversation) is dict and conversation.get("conversationId"):
+            self.conversation_id = conversation["conversationId"]
+            return []
+        # 续接会话（/conversations/{id}/responses）的帧不带 response 外层
+        resp = result.get("response", result)
         if not resp:
             return []
 
+        model_response = resp.get("modelResponse")
+        if type(model_response) is dict and model_response.get("responseId"):
+            self.response_id = model_response["responseId"]
+
         events: list[FrameEvent] = []
 
         # ── cache every cardAttachment first ──────────────────────
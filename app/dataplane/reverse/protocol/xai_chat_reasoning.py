@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 
@@ -43,6 +44,122 @@ _TRACK_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
     ("impacts_applications", ("影响", "应用", "发电", "航运", "生活", "生态")),
 )
 
+_BROWSE_TRACK_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("ui_modes", ("expert", "vision", "mode", "界面", "ui")),
+    ("release_status", ("release", "released", "launch", "发布", "上线", "status")),
+    ("specs_architecture", ("spec", "parameter", "architecture", "context", "engram", "moe", "规格", "参数", "架构", "上下文")),
+    ("v4_lite", ("v4 lite", "sealion", "sealion-lite", "海狮")),
+    ("official_confirmation", ("official", "官网", "current models", "offering")),
+)
+
+_VERIFICATION_HINTS = ("确认", "核对", "浏览", "整合", "比对", "check", "verify", "browse", "integrat")
+
+_UNCONFIRMED_HINTS = (
+    "x平台", "x posts", "社区", "community", "widely believed", "believed",
+    "传闻", "rumor", "曝光", "泄露",
+)
+
+# Hint tables matched against the lowered line, keyed by the label
+# :func:`_text_labels` reports for them.
+_HINT_TABLES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("progress", _PROGRESSIVE_HINTS),
+    ("finding", _FINDING_HINTS),
+    ("verification", _VERIFICATION_HINTS),
+    ("unconfirmed", _UNCONFIRMED_HINTS),
+    ("image_diagram", ("diagram", "示意图", "bulge")),
+    ("image_photo", ("photo", "照片", "real", "high tide", "low tide", "高潮", "低潮")),
+    ("dated", ("月", "日", "年", "小时", "分钟")),
+    ("domain", ("重要", "航运", "渔业", "发电", "生态", "模式", "视觉")),
+    ("hedged", ("可能", "rumor", "传闻", "widely believed", "believed")),
+    ("advice", ("可以", "suggest", "建议", "should", "friendly", "reply")),
+    ("source_official", ("官网", "official", "chat ui", "界面更新", "页面")),
+    ("source_social", ("x平台", "x posts", "社区", "widely believed", "传闻", "rumor")),
+)
+
+# Track tables matched against the cleaned-up query (see :func:`_query_labels`).
+_QUERY_TABLES: tuple[tuple[str, tuple[str, ...]], ...] = (
+    *((f"track:{track}", keywords) for track, keywords in _TRACK_RULES),
+    *((f"browse:{track}", keywords) for track, keywords in _BROWSE_TRACK_RULES),
+)
+
+
+_NO_LABELS: frozenset[str] = frozenset()
+
+
+class _KeywordMatcher:
+    """Several keyword tables compiled into one keyword → labels index.
+
+    Keywords are bucketed by first character, so one pass over the buckets
+    whose character occurs in the text classifies it against every table at
+    once.  At reasoning-line lengths a combined regex alternation (or a
+    pure-Python Aho–Corasick) is slower than CPython's substring search, so
+    the probes stay plain ``in`` checks.
+    """
+
+    __slots__ = ("_buckets", "_heads")
+
+    def __init__(self, tables: tuple[tuple[str, tuple[str, ...]], ...]) -> None:
+        owners: dict[str, set[str]] = {}
+        for label, keywords in tables:
+            for keyword in keywords:
+                owners.setdefault(keyword, set()).add(label)
+        buckets: dict[str, list[tuple[str, frozenset[str]]]] = {}
+        for keyword, labels in owners.items():
+            buckets.setdefault(keyword[0], []).append((keyword, frozenset(labels)))
+        self._buckets = {head: tuple(entries) for head, entries in buckets.items()}
+        self._heads = frozenset(buckets)
+
+    def labels(self, lowered: str) -> frozenset[str]:
+        buckets = self._buckets
+        hits = [
+            labels
+            for head in self._heads.intersection(lowered)
+            for keyword, labels in buckets[head]
+            if keyword in lowered
+        ]
+        return frozenset().union(*hits) if hits else _NO_LABELS
+
+
+_HINT_MATCHER = _KeywordMatcher(_HINT_TABLES)
+_QUERY_MATCHER = _KeywordMatcher(_QUERY_TABLES)
+
+
+@lru_cache(maxsize=4096)
+def _text_labels(text: str) -> frozenset[str]:
+    """Hint labels found in *text* (case-insensitive)."""
+    return _HINT_MATCHER.labels(text.lower())
+
+
+@lru_cache(maxsize=4096)
+def _query_labels(text: str) -> frozenset[str]:
+    """Hint labels of *text* after search-operator cleanup (track inference)."""
+    return _QUERY_MATCHER.labels(_compact_query(text).lower())
+
+
+_QUERY_OPERATOR_RE = re.compile(r"\b(?:or|and|site:[^\s]+|since:\S+|from:\S+|date:\S+)\b", re.IGNORECASE)
+_QUERY_QUOTE_RE = re.compile(r"[()\"']")
+_WS_RUN_RE = re.compile(r"\s+")
+_URL_RE = re.compile(r"https?://\S+")
+_NON_WORD_RE = re.compile(r"[^\w\u4e00-\u9fff]+")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+_LATIN_RE = re.compile(r"[A-Za-z]")
+
+
+def _compact_query(text: str) -> str:
+    cleaned = _QUERY_OPERATOR_RE.sub(" ", text)
+    cleaned = _QUERY_QUOTE_RE.sub(" ", cleaned)
+    cleaned = _WS_RUN_RE.sub(" ", cleaned).strip()
+    return cleaned
+
+
+@lru_cache(maxsize=4096)
+def _normalize_key(text: str) -> str:
+    lowered = text.lower()
+    lowered = _URL_RE.sub("", lowered)
+    lowered = _NON_WORD_RE.sub("", lowered)
+    return lowered
+
+
 _ZH_LABELS = {
     "understanding": "理解问题",
     "scope": "检索范围",
@@ -286,9 +403,9 @@ class ReasoningAggregator:
             clause = self._clean_report_clause(raw_part)
             if not clause:
                 continue
-            if self._language == "zh" and not re.search(r"[\u4e00-\u9fff]", clause):
+            if self._language == "zh" and not _CJK_RE.search(clause):
                 continue
-            if self._language == "en" and re.search(r"[\u4e00-\u9fff]", clause):
+            if self._language == "en" and _CJK_RE.search(clause):
                 continue
             score = self._score_report_clause(clause)
             if score <= 0:
@@ -401,8 +518,8 @@ class ReasoningAggregator:
     def _observe_language(self, text: str) -> None:
         if not text:
             return
-        cjk_count = len(re.findall(r"[\u4e00-\u9fff]", text))
-        en_count = len(re.findall(r"[A-Za-z]", text))
+        cjk_count = len(_CJK_RE.findall(text))
+        en_count = len(_LATIN_RE.findall(text))
         if cjk_count >= 4 or cjk_count > max(2, en_count // 2):
             self._zh_votes += 1
             if self._language is None:
@@ -479,11 +596,9 @@ class ReasoningAggregator:
         return labels.get(track, track)
 
     def _infer_track(self, text: str) -> str:
-        lowered = self._compact_query(text).lower()
-        if not lowered:
-            return ""
-        for track, keywords in _TRACK_RULES:
-            if any(keyword in lowered for keyword in keywords):
+        labels = _query_labels(text)
+        for track, _ in _TRACK_RULES:
+            if f"track:{track}" in labels:
                 return track
         return ""
 
@@ -500,40 +615,29 @@ class ReasoningAggregator:
         return "", track
 
     def _pick_browse_track(self, text: str) -> str:
-        lowered = self._compact_query(text).lower()
-        priority = (
-            ("ui_modes", ("expert", "vision", "mode", "界面", "ui")),
-            ("release_status", ("release", "released", "launch", "发布", "上线", "status")),
-            ("specs_architecture", ("spec", "parameter", "architecture", "context", "engram", "moe", "规格", "参数", "架构", "上下文")),
-            ("v4_lite", ("v4 lite", "sealion", "sealion-lite", "海狮")),
-            ("official_confirmation", ("official", "官网", "current models", "offering")),
-        )
-        for track, keywords in priority:
-            if any(keyword in lowered for keyword in keywords):
+        labels = _query_labels(text)
+        for track, _ in _BROWSE_TRACK_RULES:
+            if f"browse:{track}" in labels:
                 return track
         return self._infer_track(text)
 
     def _classify_image_topic(self, text: str) -> str:
-        lowered = text.lower()
-        if any(token in lowered for token in ("diagram", "示意图", "bulge")):
+        labels = _text_labels(text)
+        if "image_diagram" in labels:
             return "diagram"
-        if any(token in lowered for token in ("photo", "照片", "real", "high tide", "low tide", "高潮", "低潮")):
+        if "image_photo" in labels:
             return "photo"
         return "generic"
 
     def _looks_like_progress(self, text: str) -> bool:
-        lowered = text.lower()
-        return any(hint in lowered for hint in _PROGRESSIVE_HINTS)
+        return "progress" in _text_labels(text)
 
     def _looks_like_verification(self, text: str) -> bool:
-        lowered = text.lower()
-        return any(token in lowered for token in ("确认", "核对", "浏览", "整合", "比对", "check", "verify", "browse", "integrat"))
+        return "verification" in _text_labels(text)
 
     def _looks_like_finding(self, text: str) -> bool:
-        lowered = text.lower()
-        if self._looks_like_progress(text):
-            return False
-        return any(hint in lowered for hint in _FINDING_HINTS)
+        labels = _text_labels(text)
+        return "finding" in labels and "progress" not in labels
 
     def _clean_report_clause(self, raw_part: str) -> str:
         clause = re.sub(r"\s+", " ", raw_part).strip(" -•\t")
@@ -558,41 +662,36 @@ class ReasoningAggregator:
         return self._compact_text(clause, limit=120)
 
     def _score_report_clause(self, clause: str) -> int:
-        lowered = clause.lower()
+        # "dated" / "domain" hints are CJK-only, so matching them on the
+        # lowered clause is the same as matching the clause itself.
+        labels = _text_labels(clause)
         score = 0
-        if any(hint in lowered for hint in _FINDING_HINTS):
+        if "finding" in labels:
             score += 3
         if re.search(r"\b\d+(?:\.\d+)?\b", clause):
             score += 2
-        if any(token in clause for token in ("月", "日", "年", "小时", "分钟")):
+        if "dated" in labels:
             score += 1
-        if any(token in clause for token in ("重要", "航运", "渔业", "发电", "生态", "模式", "视觉")):
+        if "domain" in labels:
             score += 1
-        if any(token in lowered for token in ("可能", "rumor", "传闻", "widely believed", "believed")):
+        if "hedged" in labels:
             score -= 1
-        if any(token in lowered for token in ("可以", "suggest", "建议", "should", "friendly", "reply")):
+        if "advice" in labels:
             score -= 2
         if len(clause) > 150:
             score -= 1
         return score
 
     def _infer_evidence_level(self, clause: str, *, default: int) -> int:
-        lowered = clause.lower()
-        if any(token in lowered for token in ("官网", "official", "chat ui", "界面更新", "页面")):
+        labels = _text_labels(clause)
+        if "source_official" in labels:
             return 4
-        if any(token in lowered for token in ("x平台", "x posts", "社区", "widely believed", "传闻", "rumor")):
+        if "source_social" in labels:
             return max(2, default - 1)
         return default
 
     def _is_unconfirmed_signal(self, clause: str) -> bool:
-        lowered = clause.lower()
-        return any(
-            token in lowered
-            for token in (
-                "x平台", "x posts", "社区", "community", "widely believed", "believed",
-                "传闻", "rumor", "曝光", "泄露",
-            )
-        )
+        return "unconfirmed" in _text_labels(clause)
 
     def _to_bullet_text(self, text: str) -> str:
         stripped = text.strip()
@@ -607,27 +706,18 @@ class ReasoningAggregator:
             return ""
         if stripped.endswith(("。", "！", "？", ".", "!", "?")):
             return stripped
-        if re.search(r"[\u4e00-\u9fff]", stripped):
+        if _CJK_RE.search(stripped):
             return stripped + "。"
         return stripped + "."
 
-    def _compact_query(self, text: str) -> str:
-        cleaned = re.sub(r"\b(?:or|and|site:[^\s]+|since:\S+|from:\S+|date:\S+)\b", " ", text, flags=re.IGNORECASE)
-        cleaned = re.sub(r"[()\"']", " ", cleaned)
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
-        return cleaned
-
     def _compact_text(self, text: str, *, limit: int) -> str:
-        compact = re.sub(r"\s+", " ", text).strip()
+        compact = _WS_RUN_RE.sub(" ", text).strip()
         if len(compact) <= limit:
             return compact
         return compact[: limit - 3].rstrip() + "..."
 
     def _normalize_key(self, text: str) -> str:
-        lowered = text.lower()
-        lowered = re.sub(r"https?://\S+", "", lowered)
-        lowered = re.sub(r"[^\w\u4e00-\u9fff]+", "", lowered)
-        return lowered
+        return _normalize_key(text)
 
 
 __all__ = ["ReasoningAggregator", "ReasoningEvent"]
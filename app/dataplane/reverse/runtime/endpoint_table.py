@@ -13,6 +13,7 @@ ASSETS_CDN = "https://assets.grok.com"
 
 # ── App-chat (SSE streaming, new conversation) ──────────────────────────
 CHAT              = f"{BASE}/rest/app-chat/conversations/new"
+CHAT_CONTINUE     = f"{BASE}/rest/app-chat/conversations/{{conversation_id}}/responses"  # POST
 
 # ── Asset management ─────────────────────────────────────────────────────
 ASSETS_UPLOAD     = f"{BASE}/rest/app-chat/upload-file"        # POST (base64 upload)
@@ -45,7 +46,7 @@ LIVEKIT_TOKENS    = f"{BASE}/rest/livekit/tokens"              # POST
 
 __all__ = [
     "BASE", "ASSETS_CDN",
-    "CHAT",
+    "CHAT", "CHAT_CONTINUE",
     "ASSETS_UPLOAD", "ASSETS_LIST", "ASSETS_DELETE", "ASSETS_DOWNLOAD",
     "RATE_LIMITS",
     "ACCEPT_TOS", "NSFW_MGMT", "SET_BIRTH",
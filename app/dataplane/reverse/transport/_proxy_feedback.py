@@ -8,10 +8,16 @@ Rules
 401  → UNAUTHORIZED  (invalidates clearance bundle)
 403  → CHALLENGE     (invalidates clearance bundle — treat all 403s as potential CF)
 429  → RATE_LIMITED
+other 4xx → CLIENT_ERROR (request-side; no node fault)
 ≥500 → UPSTREAM_5XX
 else → TRANSPORT_ERROR
+
+Streamed responses report :func:`response_feedback` instead, timed to the
+response headers so the pool's latency EWMA is not skewed by long bodies.
 """
 
+import time
+
 from app.platform.errors import UpstreamError
 from app.control.proxy.models import ProxyFeedback, ProxyFeedbackKind
 
@@ -25,6 +31,8 @@ def upstream_feedback(exc: UpstreamError) -> ProxyFeedback:
         kind = ProxyFeedbackKind.CHALLENGE
     elif status == 429:
         kind = ProxyFeedbackKind.RATE_LIMITED
+    elif 400 <= status < 500:
+        kind = ProxyFeedbackKind.CLIENT_ERROR
     elif status >= 500:
         kind = ProxyFeedbackKind.UPSTREAM_5XX
     else:
@@ -32,4 +40,19 @@ def upstream_feedback(exc: UpstreamError) -> ProxyFeedback:
     return ProxyFeedback(kind=kind, status_code=status or None)
 
 
-__all__ = ["upstream_feedback"]
+def response_feedback(status: int, started: float) -> ProxyFeedback:
+    """Return feedback for response headers received since *started*.
+
+    *started* is the ``time.monotonic()`` reading taken just before the
+    request was sent; a 200 carries the elapsed time as ``latency_ms``.
+    """
+    if status != 200:
+        return upstream_feedback(UpstreamError(f"Upstream returned {status}", status=status))
+    return ProxyFeedback(
+        kind=ProxyFeedbackKind.SUCCESS,
+        status_code=200,
+        latency_ms=int((time.monotonic() - started) * 1000),
+    )
+
+
+__all__ = ["upstream_feedback", "response_feedback"]
@@ -11,6 +11,7 @@ from app.platform.errors import UpstreamError
 from app.control.proxy.models import ProxyLease
 from app.dataplane.proxy.adapters.headers import build_http_headers
 from app.dataplane.proxy.adapters.session import ResettableSession, build_session_kwargs
+from .sse import iter_frames
 
 
 async def post_stream(
@@ -23,8 +24,10 @@ async def post_stream(
     content_type: str = "application/json",
     origin: str = "https://grok.com",
     referer: str = "https://grok.com/",
-) -> AsyncGenerator[str, None]:
-    """POST *url* and yield SSE lines from the streaming response.
+) -> AsyncGenerator[bytes, None]:
+    """POST *url* and yield JSON frame payloads from the streaming response.
+
+    Frames are split by :func:`~.sse.iter_frames`; iteration ends at ``[DONE]``.
 
     Raises ``UpstreamError`` on non-200 status.
     """
@@ -73,17 +76,17 @@ async def post_stream(
             pass
         raise
 
-    async def _lines() -> AsyncGenerator[str, None]:
+    async def _frames() -> AsyncGenerator[bytes, None]:
         try:
-            async for line in response.aiter_lines():
-                yield line
+            async for frame in iter_frames(response.aiter_content()):
+                yield frame
         finally:
             try:
                 await session.close()
             except Exception:
                 pass
 
-    return _lines()
+    return _frames()
 
 
 async def post_json(
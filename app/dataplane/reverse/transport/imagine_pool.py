@@ -0,0 +1,239 @@
+"""Pooled imagine WebSockets — idle sockets per (account, egress node).
+
+Opening an imagine WS costs a TCP + proxy + TLS handshake plus the HTTP
+upgrade.  :func:`~.imagine_ws.stream_images` already reuses one socket across
+the rounds of a single call; this pool keeps it open afterwards so the next
+generation for the same account through the same egress node starts on an
+authenticated, open socket.
+
+Only sockets a call left clean — every slot of the last round completed, no
+CLOSE seen — are checked back in; a socket with slots still in flight would
+leak their frames into the next request.  Idle sockets are kept alive by the
+aiohttp heartbeat (``heartbeat`` ws kwarg) and swept by a background loop
+that drops sockets idle longer than ``image.ws_pool_idle_sec`` and probes the
+rest with ``_probe_ws_closed``.
+
+Eviction: cooling / auth feedback for an account drops its sockets; a
+clearance change drops all of them (they were upgraded with the old cookies).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from app.platform.config.snapshot import get_config
+from app.platform.logging.logger import logger
+from .websocket import WebSocketConnection
+
+SocketKey = tuple[str, str]  # (account token, proxy url or "")
+
+_SWEEP_INTERVAL_S = 15.0
+_PROBE_WAIT_S = 0.05
+
+
+@dataclass
+class PooledSocket:
+    """One imagine WS and its pool bookkeeping."""
+
+    key: SocketKey
+    conn: WebSocketConnection
+    created_at: float
+    idle_since: float = 0.0
+    uses: int = 1
+
+    @property
+    def ws(self):
+        return self.conn.ws
+
+
+class ImagineSocketPool:
+    """Process-wide pool of idle imagine WebSockets."""
+
+    def __init__(self) -> None:
+        self._idle: dict[SocketKey, list[PooledSocket]] = {}
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    # ------------------------------------------------------------------
+    # Config
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def size() -> int:
+        return max(0, get_config().get_int("image.ws_pool_size", 2))
+
+    @staticmethod
+    def idle_sec() -> float:
+        return max(1.0, get_config().get_float("image.ws_pool_idle_sec", 90.0))
+
+    # ------------------------------------------------------------------
+    # Lease / return
+    # ------------------------------------------------------------------
+
+    def wrap(self, token: str, proxy_url: str | None, conn: WebSocketConnection) -> PooledSocket:
+        """Track a freshly opened socket so it can be checked in later."""
+        return PooledSocket(key=(token, proxy_url or ""), conn=conn, created_at=time.monotonic())
+
+    def checkout(self, token: str, proxy_url: str | None) -> PooledSocket | None:
+        """Take an open idle socket for *token* via *proxy_url*, if any."""
+        stack = self._idle.get((token, proxy_url or ""))
+        now = time.monotonic()
+        idle_sec = self.idle_sec()
+        while stack:
+            sock = stack.pop()  # LIFO — the most recently used socket is the warmest
+            if not sock.ws.closed and now - sock.idle_since < idle_sec:
+                sock.uses += 1
+                self.hits += 1
+                return sock
+            self._discard(sock, "stale")
+        self.misses += 1
+        return None
+
+    async def checkin(self, sock: PooledSocket) -> None:
+        """Return a clean socket to the pool (closes it if the pool is full/off)."""
+        if sock.ws.closed:
+            await sock.conn.close()
+            return
+        stack = self._idle.setdefault(sock.key, [])
+        if len(stack) >= self.size():
+            await sock.conn.close()
+            return
+        sock.idle_since = time.monotonic()
+        stack.append(sock)
+        self._ensure_sweeper()
+
+    async def discard(self, sock: PooledSocket) -> None:
+        """Close a socket that must not be reused."""
+        await sock.conn.close()
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def evict_account(self, token: str, reason: str) -> None:
+        for key in [k for k in self._idle if k[0] == token]:
+            for sock in self._idle.pop(key):
+                self._discard(sock, reason)
+
+    def evict_all(self, reason: str) -> None:
+        idle, self._idle = self._idle, {}
+        for stack in idle.values():
+            for sock in stack:
+                self._discard(sock, reason)
+
+    def _discard(self, sock: PooledSocket, reason: str) -> None:
+        self.evicted += 1
+        logger.debug(
+            "imagine socket evicted: token={}... proxy={} reason={} uses={}",
+            sock.key[0][:8],
+            sock.key[1] or "direct",
+            reason,
+            sock.uses,
+        )
+        try:
+            asyncio.get_running_loop().create_task(self._close(sock))
+        except RuntimeError:
+            pass
+
+    @staticmethod
+    async def _close(sock: PooledSocket) -> None:
+        try:
+            await sock.conn.close()
+        except Exception as exc:
+            logger.debug("imagine socket close failed: error={}", exc)
+
+    # ------------------------------------------------------------------
+    # Background sweep
+    # ------------------------------------------------------------------
+
+    def _ensure_sweeper(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        while self._idle:
+            await asyncio.sleep(_SWEEP_INTERVAL_S)
+            try:
+                await self.sweep()
+            except Exception as exc:
+                logger.warning("imagine socket sweep failed: error={}", exc)
+
+    async def sweep(self) -> None:
+        """Drop idle-expired sockets and probe the rest for a pending CLOSE."""
+        from .imagine_ws import _probe_ws_closed
+
+        now = time.monotonic()
+        idle_sec = self.idle_sec()
+        size = self.size()
+        for key in list(self._idle):
+            # Take the stack out while probing so checkout never hands out a
+            # socket that is mid-probe.
+            stack = self._idle.pop(key, [])
+            keep: list[PooledSocket] = []
+            for sock in stack:
+                if len(keep) >= size or now - sock.idle_since >= idle_sec:
+                    self._discard(sock, "idle")
+                elif sock.ws.closed or await _probe_ws_closed(sock.ws, _PROBE_WAIT_S):
+                    self._discard(sock, "closed")
+                else:
+                    keep.append(sock)
+            if keep:
+                self._idle.setdefault(key, [])[:0] = keep
+
+    async def close(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        idle, self._idle = self._idle, {}
+        for stack in idle.values():
+            for sock in stack:
+                await self._close(sock)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "idle": sum(len(s) for s in self._idle.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+
+_pool: ImagineSocketPool | None = None
+
+
+def get_imagine_pool() -> ImagineSocketPool:
+    global _pool
+    if _pool is None:
+        _pool = ImagineSocketPool()
+    return _pool
+
+
+def evict_imagine_sockets(reason: str, token: str | None = None) -> None:
+    """Drop pooled sockets — for one account, or all of them (clearance change)."""
+    if _pool is None:
+        return
+    if token is None:
+        _pool.evict_all(reason)
+    else:
+        _pool.evict_account(token, reason)
+
+
+async def close_imagine_pool() -> None:
+    """Close every pooled socket (application shutdown)."""
+    if _pool is not None:
+        await _pool.close()
+
+
+__all__ = [
+    "ImagineSocketPool",
+    "PooledSocket",
+    "close_imagine_pool",
+    "evict_imagine_sockets",
+    "get_imagine_pool",
+]
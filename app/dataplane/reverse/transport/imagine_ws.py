@@ -9,6 +9,8 @@ Protocol (per round):
 One WS connection is reused across rounds until the server closes it or n
 images have been collected. This avoids a TLS handshake per round when
 requesting more images than a single round produces (speed=6, quality=4).
+A connection left clean at the end of a call goes back to the per-account
+pool in :mod:`.imagine_pool` for the next call.
 """
 
 import asyncio
@@ -33,10 +35,14 @@ from app.dataplane.reverse.protocol.xai_image import (
     parse_image_url,
     parse_json_frame,
 )
+from .imagine_pool import get_imagine_pool
 from .websocket import WebSocketClient
 
 _client = WebSocketClient()
 _INTER_ROUND_WAIT_S = 2.0
+# Error codes that mean the socket itself is unusable rather than that the
+# server rejected the request; a pooled socket failing this way is retried.
+_SOCKET_ERROR_CODES = frozenset({"send_failed"})
 
 
 # ---------------------------------------------------------------------------
@@ -110,8 +116,9 @@ async def _stream_round(
     """Drive one round of image generation on an already-open WS.
 
     Sends reset + prompt, then processes frames until all slots are completed
-    or the WS closes.  Always yields a ``{type: "_meta", ws_closed: bool}``
-    sentinel as the very last item so the caller knows whether to reconnect.
+    or the WS closes.  Always yields a ``{type: "_meta", ws_closed: bool,
+    clean: bool}`` sentinel as the very last item so the caller knows whether
+    to reconnect; ``clean`` means every slot completed and the socket is idle.
     """
     request_id = str(uuid.uuid4())
     try:
@@ -121,7 +128,7 @@ async def _stream_round(
         ))
     except Exception as exc:
         yield {"type": "error", "error_code": "send_failed", "error": str(exc)}
-        yield {"type": "_meta", "ws_closed": True}
+        yield {"type": "_meta", "ws_closed": True, "clean": False}
         return
 
     slots:           dict[str, _Slot] = {}
@@ -142,7 +149,7 @@ async def _stream_round(
                             "error_code": "slot_incomplete",
                             "error":      f"slot {slot.image_id[:8]} timed out",
                         }
-            yield {"type": "_meta", "ws_closed": False}
+            yield {"type": "_meta", "ws_closed": False, "clean": False}
             return
 
         recv_timeout = min(stream_timeout_s, round_timeout_s - elapsed)
@@ -152,7 +159,7 @@ async def _stream_round(
             # No frame arrived — check if all known slots are already done.
             if slots and all(s.done for s in slots.values()):
                 ws_closed = await _probe_ws_closed(ws, inter_round_wait_s)
-                yield {"type": "_meta", "ws_closed": ws_closed}
+                yield {"type": "_meta", "ws_closed": ws_closed, "clean": not ws_closed}
                 return
             continue
 
@@ -209,12 +216,12 @@ async def _stream_round(
                     all_done = slots and all(s.done for s in slots.values())
                     if all_done:
                         ws_closed = await _probe_ws_closed(ws, inter_round_wait_s)
-                        yield {"type": "_meta", "ws_closed": ws_closed}
+                        yield {"type": "_meta", "ws_closed": ws_closed, "clean": not ws_closed}
                         return
 
                     if round_completed >= needed:
                         # Have enough this round; leave remaining slots in flight.
-                        yield {"type": "_meta", "ws_closed": False}
+                        yield {"type": "_meta", "ws_closed": False, "clean": False}
                         return
 
             # Image blob frames (intermediate previews)
@@ -247,7 +254,7 @@ async def _stream_round(
                 err_msg  = msg.get("err_msg")  or str(msg)
                 logger.warning("imagine websocket server error: code={} message={}", err_code, err_msg)
                 yield {"type": "error", "error_code": err_code, "error": err_msg}
-                yield {"type": "_meta", "ws_closed": True}
+                yield {"type": "_meta", "ws_closed": True, "clean": False}
                 return
 
         # ── WS closed / error ────────────────────────────────────────────────
@@ -267,7 +274,7 @@ async def _stream_round(
                             "imagine websocket closed before image data arrived: image_id={}",
                             slot.image_id[:8],
                         )
-            yield {"type": "_meta", "ws_closed": True}
+            yield {"type": "_meta", "ws_closed": True, "clean": False}
             return
 
 
@@ -287,7 +294,9 @@ async def stream_images(
     """Stream image events, collecting *n* final images.
 
     Reuses a single WS connection across multiple rounds when the server keeps
-    the connection open.  Reconnects transparently if the server closes it.
+    the connection open, and starts on a pooled connection for this account
+    and egress node when one is idle.  Reconnects transparently if the server
+    closes it.
 
     Yields:
         ``{type: "image",      is_final: True,  ...}``  — final image per slot
@@ -298,83 +307,124 @@ async def stream_images(
     timeout_s          = cfg.get_float("image.timeout",            120.0)
     stream_timeout_s   = cfg.get_float("image.stream_timeout",      10.0)
     inter_round_wait_s = _INTER_ROUND_WAIT_S
+    pool               = get_imagine_pool()
 
     collected = 0
 
     while collected < n:
         needed = n - collected
 
-        # ── Establish connection ──────────────────────────────────────────────
+        # ── Establish connection (pooled socket first) ────────────────────────
         proxy   = await get_proxy_runtime()
         lease   = await proxy.acquire(scope=ProxyScope.APP, kind=RequestKind.WEBSOCKET)
-        headers = build_ws_headers(token=token, lease=lease)
+        sock    = pool.checkout(token, lease.proxy_url)
+        reused  = sock is not None
+        connect_ms: int | None = None
 
-        try:
-            conn = await _client.connect(
-                WS_IMAGINE_URL,
-                headers   = headers,
-                timeout   = timeout_s,
-                ws_kwargs = {"heartbeat": 20, "receive_timeout": stream_timeout_s},
-                lease     = lease,
-            )
-        except Exception as exc:
-            status = getattr(exc, "status", None)
-            logger.error("imagine websocket connect failed: error={}", exc)
-            from app.platform.errors import UpstreamError as _UE
-            fb = upstream_feedback(_UE("connect failed", status=status)) \
-                if status else ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
-            await proxy.feedback(lease, fb)
-            yield {
-                "type":       "error",
-                "error_code": "rate_limit_exceeded" if status == 429 else "connection_failed",
-                "error":      str(exc),
-            }
-            return
+        if sock is None:
+            headers = build_ws_headers(token=token, lease=lease)
+            started = time.monotonic()
+            try:
+                conn = await _client.connect(
+                    WS_IMAGINE_URL,
+                    headers   = headers,
+                    timeout   = timeout_s,
+                    ws_kwargs = {"heartbeat": 20, "receive_timeout": stream_timeout_s},
+                    lease     = lease,
+                )
+            except Exception as exc:
+                status = getattr(exc, "status", None)
+                logger.error("imagine websocket connect failed: error={}", exc)
+                from app.platform.errors import UpstreamError as _UE
+                fb = upstream_feedback(_UE("connect failed", status=status)) \
+                    if status else ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                await proxy.feedback(lease, fb)
+                yield {
+                    "type":       "error",
+                    "error_code": "rate_limit_exceeded" if status == 429 else "connection_failed",
+                    "error":      str(exc),
+                }
+                return
+            connect_ms = int((time.monotonic() - started) * 1000)
+            sock = pool.wrap(token, lease.proxy_url, conn)
+        else:
+            logger.debug("imagine websocket reused: uses={}", sock.uses)
 
         # ── Run rounds on this connection ─────────────────────────────────────
+        ws       = sock.ws
+        clean    = False
+        stale    = False   # pooled socket broke before producing anything
+        produced = False   # any event yielded from this socket
         try:
-            async with conn as ws:
-                while collected < n:
-                    needed = n - collected
-                    async for ev in _stream_round(
-                        ws, prompt,
-                        aspect_ratio       = aspect_ratio,
-                        enable_nsfw        = enable_nsfw,
-                        enable_pro         = enable_pro,
-                        needed             = needed,
-                        stream_timeout_s   = stream_timeout_s,
-                        round_timeout_s    = timeout_s,
-                        inter_round_wait_s = inter_round_wait_s,
+            while collected < n:
+                needed = n - collected
+                async for ev in _stream_round(
+                    ws, prompt,
+                    aspect_ratio       = aspect_ratio,
+                    enable_nsfw        = enable_nsfw,
+                    enable_pro         = enable_pro,
+                    needed             = needed,
+                    stream_timeout_s   = stream_timeout_s,
+                    round_timeout_s    = timeout_s,
+                    inter_round_wait_s = inter_round_wait_s,
+                ):
+                    if ev["type"] == "_meta":
+                        ws_closed = ev["ws_closed"]
+                        clean     = ev["clean"]
+                        stale     = reused and ws_closed and not produced
+                        break   # exit inner for-loop; handle ws_closed below
+                    if (
+                        reused and not produced and ev["type"] == "error"
+                        and ev.get("error_code") in _SOCKET_ERROR_CODES
                     ):
-                        if ev["type"] == "_meta":
-                            ws_closed = ev["ws_closed"]
-                            break   # exit inner for-loop; handle ws_closed below
-                        if ev.get("is_final"):
-                            collected += 1
-                        yield ev
-                        if ev["type"] == "error":
-                            await proxy.feedback(lease, ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR))
-                            return
-                    else:
-                        # _stream_round exhausted without a _meta — shouldn't happen
-                        ws_closed = True
+                        continue   # dead pooled socket — its _meta follows; retry fresh
+                    produced = True
+                    if ev.get("is_final"):
+                        collected += 1
+                    yield ev
+                    if ev["type"] == "error":
+                        await proxy.feedback(lease, ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR))
+                        return
+                else:
+                    # _stream_round exhausted without a _meta — shouldn't happen
+                    ws_closed = True
 
-                    if ws_closed or collected >= n:
-                        break   # exit inner while; reconnect or finish
+                if ws_closed or collected >= n:
+                    break   # exit inner while; reconnect or finish
 
         except aiohttp.ClientError as exc:
-            logger.error("imagine websocket connection failed: error={}", exc)
-            await proxy.feedback(lease, ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR))
-            yield {"type": "error", "error_code": "connection_failed", "error": str(exc)}
-            return
+            if not (reused and not produced):
+                logger.error("imagine websocket connection failed: error={}", exc)
+                await proxy.feedback(lease, ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR))
+                yield {"type": "error", "error_code": "connection_failed", "error": str(exc)}
+                return
+            stale = True
+
+        finally:
+            # Only a socket with no slots left in flight may serve another call.
+            if clean and collected >= n:
+                await pool.checkin(sock)
+            else:
+                await pool.discard(sock)
+
+        if stale:
+            logger.debug("imagine pooled websocket was closed; reconnecting")
+            await proxy.release(lease)
+            continue
 
         if collected >= n:
-            await proxy.feedback(lease, ProxyFeedback(kind=ProxyFeedbackKind.SUCCESS, status_code=200))
+            await proxy.feedback(
+                lease,
+                ProxyFeedback(kind=ProxyFeedbackKind.SUCCESS, status_code=200, latency_ms=connect_ms),
+            )
             return
 
         # Server closed the connection but we still need more images → reconnect.
         # Give back the current lease before acquiring a new one on the next iteration.
-        await proxy.feedback(lease, ProxyFeedback(kind=ProxyFeedbackKind.SUCCESS, status_code=200))
+        await proxy.feedback(
+            lease,
+            ProxyFeedback(kind=ProxyFeedbackKind.SUCCESS, status_code=200, latency_ms=connect_ms),
+        )
         logger.info("imagine websocket reconnecting: remaining_images={} requested_images={}", n - collected, n)
 
 
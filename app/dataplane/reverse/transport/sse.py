@@ -0,0 +1,113 @@
+"""Byte-level SSE / NDJSON frame splitter for upstream streams.
+
+Upstream chat streams are newline-delimited JSON, sometimes wrapped as SSE
+``data: {...}`` lines.  Instead of ``aiter_lines()`` + a per-line
+decode/strip/prefix check, :class:`FrameSplitter` scans raw
+``aiter_content()`` chunks in a ``bytearray``, classifies each line by its
+first byte and hands back the JSON payload as ``bytes`` — ready for
+``orjson.loads`` without ever building a ``str``.
+
+Classification matches :func:`~app.dataplane.reverse.protocol.xai_chat.classify_line`:
+``{...`` and ``data: ...`` lines are payloads, ``data: [DONE]`` ends the
+stream, everything else (blank, ``event:``, ``:`` comments) is skipped.
+"""
+
+from typing import AsyncIterable, AsyncGenerator
+
+_LF = b"\n"
+_DATA = b"data:"
+_DONE = b"[DONE]"
+# Bytes stripped around a line / payload (str.strip() on ASCII whitespace).
+_WS = frozenset(b" \t\r\n\x0b\x0c")
+_OPEN_BRACE = ord("{")
+_LOWER_D = ord("d")
+
+
+class FrameSplitter:
+    """Incremental line splitter.
+
+    Only the newly fed bytes are searched for the last newline; completed
+    lines are then cut out with one C-level ``split`` and the remainder stays
+    in the buffer, so every byte is scanned a constant number of times no
+    matter how the stream is chunked.
+    """
+
+    __slots__ = ("_buf", "done")
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self.done = False
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Add *chunk*; return the payloads of every line it completed."""
+        if self.done or not chunk:
+            return []
+        buf = self._buf
+        if not buf:
+            # Common case: chunk boundaries fall on line boundaries.
+            last = chunk.rfind(_LF)
+            if last == -1:
+                buf += chunk
+                return []
+            complete = chunk[:last]
+            if last + 1 < len(chunk):
+                buf += chunk[last + 1 :]
+        else:
+            last = chunk.rfind(_LF)
+            if last == -1:
+                buf += chunk
+                return []
+            buf += chunk[:last]
+            complete = bytes(buf)
+            buf.clear()
+            if last + 1 < len(chunk):
+                buf += chunk[last + 1 :]
+        return self._classify_lines(complete.split(_LF))
+
+    def flush(self) -> list[bytes]:
+        """Classify a trailing line that had no newline (end of stream)."""
+        if self.done or not self._buf:
+            return []
+        tail = bytes(self._buf)
+        self._buf.clear()
+        return self._classify_lines([tail])
+
+    def _classify_lines(self, lines: list[bytes]) -> list[bytes]:
+        frames: list[bytes] = []
+        for line in lines:
+            if not line:
+                continue
+            first = line[0]
+            if first in _WS:
+                line = line.strip()
+                if not line:
+                    continue
+                first = line[0]
+            if first == _OPEN_BRACE:
+                if line[-1] in _WS:
+                    line = line.rstrip()
+                frames.append(line)
+            elif first == _LOWER_D and line.startswith(_DATA):
+                payload = line[5:].strip()
+                if payload == _DONE:
+                    self.done = True
+                    self._buf.clear()
+                    break
+                if payload:
+                    frames.append(payload)
+        return frames
+
+
+async def iter_frames(chunks: AsyncIterable[bytes]) -> AsyncGenerator[bytes, None]:
+    """Yield JSON payloads from a raw byte stream, stopping at ``[DONE]``."""
+    splitter = FrameSplitter()
+    async for chunk in chunks:
+        for frame in splitter.feed(chunk):
+            yield frame
+        if splitter.done:
+            return
+    for frame in splitter.flush():
+        yield frame
+
+
+__all__ = ["FrameSplitter", "iter_frames"]
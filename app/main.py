@@ -112,6 +112,12 @@ async def lifespan(app: FastAPI):
         platform.system(),
     )
 
+    # 1a. Tokenizer — load the bundled encoding in a thread while the rest of
+    #     start-up runs, so no request pays for it.
+    from app.platform.tokens import warm_encoding
+
+    tokenizer_warmup = asyncio.create_task(asyncio.to_thread(warm_encoding))
+
     # 2. Initialise account repository and bootstrap runtime table.
     from app.control.account.backends.factory import (
         create_repository,
@@ -251,6 +257,15 @@ async def lifespan(app: FastAPI):
     if is_leader and proxy_dir.egress_mode == EgressMode.SUBSCRIPTION:
         subscription_scheduler.start()
 
+    # 5b. Egress warm pool — every worker, connections are per process.
+    from app.dataplane.proxy.adapters.warm_pool import get_warm_pool
+
+    warm_pool = get_warm_pool()
+    warm_pool.start()
+
+    ranks_file, warm_ms = await tokenizer_warmup
+    logger.info("tokenizer ready: ranks={} elapsed_ms={:.0f}", ranks_file, warm_ms)
+
     logger.info("application startup completed")
     yield
 
@@ -270,6 +285,14 @@ async def lifespan(app: FastAPI):
         subscription_scheduler.stop()
         _release_scheduler_lock()
 
+    from app.dataplane.proxy.adapters.signer import close_signer_client
+    from app.dataplane.reverse.transport.imagine_pool import close_imagine_pool
+    from app.platform.state import close_state_store
+
+    await warm_pool.stop()
+    await close_imagine_pool()
+    await close_state_store()
+    await close_signer_client()
     set_refresh_scheduler(None)
     set_refresh_scheduler_leader(False)
     set_refresh_service(None)
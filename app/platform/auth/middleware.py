@@ -1,6 +1,7 @@
 """API-key authentication dependencies for FastAPI routes."""
 
 import hmac
+from contextvars import ContextVar
 
 from fastapi import Header, HTTPException, Query, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -9,6 +10,9 @@ from app.platform.config.snapshot import get_config
 
 _security = HTTPBearer(auto_error=False, scheme_name="API Key")
 
+# API key that authenticated the current request, for per-key settings.
+_request_api_key: ContextVar[str | None] = ContextVar("request_api_key", default=None)
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -43,6 +47,11 @@ def is_webui_enabled() -> bool:
     return bool(val)
 
 
+def current_api_key() -> str | None:
+    """API key of the current request (``None`` when API-key auth is off)."""
+    return _request_api_key.get()
+
+
 def _extract_bearer(authorization: str | None) -> str | None:
     if not authorization:
         return None
@@ -76,6 +85,7 @@ async def verify_api_key(
 
     if not any(hmac.compare_digest(token, k) for k in allowed_keys):
         raise HTTPException(status.HTTP_403_FORBIDDEN, "Invalid API key.")
+    _request_api_key.set(token)
 
 
 async def verify_admin_key(
@@ -118,6 +128,7 @@ async def verify_webui_key(
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid authentication token.")
 
 __all__ = [
+    "current_api_key",
     "verify_api_key",
     "verify_admin_key",
     "verify_webui_key",
@@ -0,0 +1,145 @@
+"""Byte-bounded memo caches for per-request prompt building.
+
+Agent loops resend the same history and tool list on every turn.  These
+caches let prompt builders reuse the work done for the previous turn; both
+are bounded by the approximate size of what they hold, not by entry count.
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class ByteLRU:
+    """LRU mapping bounded by the approximate size of its values.
+
+    Callers pass each value's size on :meth:`put`; values larger than an
+    eighth of the budget are not cached so one huge entry cannot flush the
+    rest.
+    """
+
+    __slots__ = ("_data", "_max_bytes", "_bytes")
+
+    def __init__(self, max_bytes: int) -> None:
+        self._data: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        if size > self._max_bytes // 8:
+            return
+        self._data[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self._max_bytes:
+            _, (_, evicted) = self._data.popitem(last=False)
+            self._bytes -= evicted
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+
+class _PrefixEntry:
+    __slots__ = ("prefix", "count", "value", "size")
+
+    def __init__(self, prefix: bytes, count: int, value: Any, size: int) -> None:
+        self.prefix = prefix
+        self.count = count
+        self.value = value
+        self.size = size
+
+
+class PrefixMemo:
+    """Memo of work done on a JSON array, reusable for any array extending it.
+
+    Keys are the ``orjson.dumps`` bytes of the whole array.  An entry stored
+    for ``[m0, ..., mk]`` matches a later array whose serialisation starts
+    with the same bytes up to the end of ``mk`` and continues with ``,`` or
+    ``]`` — i.e. whose first ``k + 1`` elements are identical.  Matching is a
+    ``startswith`` (memcmp), so no per-element hashing is needed.
+
+    Entries are bucketed by the first ``head`` bytes; each bucket keeps the
+    ``per_bucket`` most recent branches.  Shorter arrays than ``head`` are
+    not memoised — they are cheap to process anyway.
+    """
+
+    __slots__ = ("_buckets", "_max_bytes", "_bytes", "_head", "_per_bucket")
+
+    def __init__(self, max_bytes: int, *, head: int = 256, per_bucket: int = 4) -> None:
+        self._buckets: OrderedDict[bytes, list[_PrefixEntry]] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._head = head
+        self._per_bucket = per_bucket
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def lookup(self, raw: bytes) -> tuple[int, Any] | None:
+        """Return ``(count, value)`` of the longest stored prefix of *raw*."""
+        if len(raw) <= self._head:
+            return None
+        bucket = self._buckets.get(raw[: self._head])
+        if not bucket:
+            return None
+        best: _PrefixEntry | None = None
+        for entry in bucket:
+            n = len(entry.prefix)
+            if (
+                (best is None or entry.count > best.count)
+                and len(raw) > n
+                and raw[n] in b",]"
+                and raw.startswith(entry.prefix)
+            ):
+                best = entry
+        if best is None:
+            return None
+        self._buckets.move_to_end(raw[: self._head])
+        return best.count, best.value
+
+    def store(self, raw: bytes, count: int, value: Any, size: int) -> None:
+        """Remember *value* (``size`` bytes) as the result for the array *raw*."""
+        if len(raw) <= self._head:
+            return
+        size += len(raw)
+        if size > self._max_bytes // 8:
+            return
+        key = raw[: self._head]
+        bucket = self._buckets.pop(key, [])
+        kept: list[_PrefixEntry] = []
+        for entry in bucket:
+            # Drop entries the new array extends — the new entry supersedes them.
+            if raw.startswith(entry.prefix) or len(kept) >= self._per_bucket - 1:
+                self._bytes -= entry.size
+            else:
+                kept.append(entry)
+        kept.insert(0, _PrefixEntry(raw[:-1], count, value, size))
+        self._bytes += size
+        self._buckets[key] = kept
+        while self._bytes > self._max_bytes and self._buckets:
+            _, evicted = self._buckets.popitem(last=False)
+            self._bytes -= sum(e.size for e in evicted)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._bytes = 0
+
+
+__all__ = ["ByteLRU", "PrefixMemo"]
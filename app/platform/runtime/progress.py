@@ -0,0 +1,177 @@
+"""Event-driven progress channel for streaming job updates over SSE.
+
+Producers :meth:`~ProgressChannel.push` events without awaiting; the single
+consumer iterates the channel and wakes only when an event arrives, the
+channel closes, or its keepalive deadline passes.  Waiting costs one future
+per wake-up — no ``wait_for`` timer or task per poll.
+
+Keepalive deadlines of every channel live on one shared :class:`TimerWheel`
+of one-second buckets with a single timer for the earliest one; a channel idle
+for ``keepalive_s`` yields :data:`KEEPALIVE` so the stream can write an SSE
+comment.  Deadlines are moved lazily: a push only updates the channel's due
+time, and the wheel re-buckets it when its old slot comes up.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any
+
+# Yielded by a channel that has been idle for its keepalive interval.
+KEEPALIVE: Any = object()
+
+# Keepalive interval for SSE job streams (seconds).
+DEFAULT_KEEPALIVE_S = 15.0
+
+_WHEEL_RESOLUTION_S = 1.0
+
+
+class TimerWheel:
+    """Shared one-second wheel of channel keepalive deadlines.
+
+    Buckets are keyed by absolute tick number, so there is no wrap-around to
+    handle; a single ``call_at`` handle for the earliest bucket exists only
+    while channels are registered.
+    """
+
+    def __init__(self, resolution_s: float = _WHEEL_RESOLUTION_S) -> None:
+        self._resolution = resolution_s
+        self._buckets: dict[int, list["ProgressChannel"]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._armed_tick = 0
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self._buckets.values())
+
+    def schedule(self, channel: "ProgressChannel") -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # New event loop (tests / restart) — the old handle is dead.
+            self._loop = loop
+            self._buckets.clear()
+            self._handle = None
+        tick = int(channel._due / self._resolution) + 1
+        self._buckets.setdefault(tick, []).append(channel)
+        if self._handle is None or tick < self._armed_tick:
+            self._arm(loop)
+
+    def _arm(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+        self._armed_tick = min(self._buckets)
+        next_at = self._armed_tick * self._resolution
+        self._handle = loop.call_at(max(next_at, loop.time()), self._tick)
+
+    def _tick(self) -> None:
+        self._handle = None
+        loop = self._loop
+        if loop is None:
+            return
+        now = loop.time()
+        current = int(now / self._resolution)
+        for tick in [t for t in self._buckets if t <= current]:
+            for channel in self._buckets.pop(tick):
+                if channel._closed:
+                    channel._scheduled = False
+                elif channel._due <= now:
+                    channel._fire_keepalive(now)
+                    self.schedule(channel)
+                else:
+                    self.schedule(channel)
+        if self._buckets and self._handle is None:
+            self._arm(loop)
+
+
+_wheel: TimerWheel | None = None
+
+
+def get_timer_wheel() -> TimerWheel:
+    global _wheel
+    if _wheel is None:
+        _wheel = TimerWheel()
+    return _wheel
+
+
+class ProgressChannel:
+    """Single-consumer event channel with an optional idle keepalive.
+
+    ``async for event in channel`` yields pushed events in order, plus
+    :data:`KEEPALIVE` after ``keepalive_s`` seconds without one (``0`` = never),
+    and stops once the channel is closed and drained.  With *maxsize* set,
+    pushes beyond it are dropped (progress consumers only need the latest).
+    """
+
+    __slots__ = (
+        "_items", "_waiter", "_closed", "_keepalive_s", "_maxsize",
+        "_due", "_ping", "_scheduled",
+    )
+
+    def __init__(self, *, keepalive_s: float = 0.0, maxsize: int = 0) -> None:
+        self._items: deque[Any] = deque()
+        self._waiter: asyncio.Future | None = None
+        self._closed = False
+        self._keepalive_s = keepalive_s
+        self._maxsize = maxsize
+        self._due = 0.0
+        self._ping = False
+        self._scheduled = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def push(self, item: Any) -> None:
+        if self._closed or (self._maxsize and len(self._items) >= self._maxsize):
+            return
+        self._items.append(item)
+        self._wake()
+
+    def close(self, *_: Any) -> None:
+        """Stop the consumer once drained (usable as a task done-callback)."""
+        self._closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def _fire_keepalive(self, now: float) -> None:
+        self._due = now + self._keepalive_s
+        if self._waiter is not None:
+            self._ping = True
+            self._wake()
+
+    def __aiter__(self) -> "ProgressChannel":
+        return self
+
+    async def __anext__(self) -> Any:
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._items:
+                if self._keepalive_s:
+                    self._due = loop.time() + self._keepalive_s
+                return self._items.popleft()
+            if self._closed:
+                raise StopAsyncIteration
+            if self._ping:
+                self._ping = False
+                return KEEPALIVE
+            if self._keepalive_s and not self._scheduled:
+                self._due = loop.time() + self._keepalive_s
+                self._scheduled = True
+                get_timer_wheel().schedule(self)
+            self._waiter = loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+
+__all__ = [
+    "DEFAULT_KEEPALIVE_S",
+    "KEEPALIVE",
+    "ProgressChannel",
+    "TimerWheel",
+    "get_timer_wheel",
+]
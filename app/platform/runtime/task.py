@@ -5,6 +5,8 @@ import time
 import uuid
 from typing import Any, Dict, List, Optional
 
+from .progress import DEFAULT_KEEPALIVE_S, ProgressChannel
+
 
 class AsyncTask:
     """Tracks progress of an async batch operation with fan-out SSE support."""
@@ -27,24 +29,22 @@ class AsyncTask:
         self.error: Optional[str] = None
         self.created_at = time.time()
         self.cancelled = False
-        self._queues: List[asyncio.Queue] = []
+        self._queues: List[ProgressChannel] = []
         self._final_event: Optional[Dict[str, Any]] = None
 
     # -- Fan-out pub/sub ---------------------------------------------------
 
     def _publish(self, event: Dict[str, Any]) -> None:
         for q in list(self._queues):
-            try:
-                q.put_nowait(event)
-            except Exception:
-                pass
+            q.push(event)
 
-    def attach(self) -> asyncio.Queue:
-        q: asyncio.Queue = asyncio.Queue(maxsize=200)
+    def attach(self) -> ProgressChannel:
+        q = ProgressChannel(keepalive_s=DEFAULT_KEEPALIVE_S, maxsize=200)
         self._queues.append(q)
         return q
 
-    def detach(self, q: asyncio.Queue) -> None:
+    def detach(self, q: ProgressChannel) -> None:
+        q.close()
         if q in self._queues:
             self._queues.remove(q)
 
@@ -0,0 +1,162 @@
+"""Shared state store — short-lived documents visible to every worker.
+
+Backends follow ``ACCOUNT_STORAGE`` (see :mod:`.factory`), so state written
+by one granian worker — or one replica — is readable by all of them.
+
+Expiry runs on one :class:`ExpiryWheel` per process instead of a sleeping
+task per document: writers register the documents they own, the wheel
+deletes them in per-bucket batches, and an occasional ``purge_expired``
+catches documents whose owning process died.  Wheel deletes are conditional
+on the stored expiry, so a document another worker re-put with a later
+expiry survives.  Reads never depend on the wheel — stores filter expired
+documents themselves.
+"""
+
+import asyncio
+import math
+import time
+
+from app.platform.logging.logger import logger
+
+from .base import StateStore
+from .factory import create_state_store, get_state_backend_name
+
+_WHEEL_RESOLUTION_S = 10
+_PURGE_INTERVAL_S = 600.0
+
+
+class ExpiryWheel:
+    """Per-process timer wheel of owned document expiries.
+
+    Buckets are keyed by ``expires_at // resolution``; one background task
+    sleeps until the earliest bucket is due and is woken early only when a
+    sooner bucket is added.  Re-registering a document moves it lazily: the
+    old bucket entry is skipped because ``_due`` no longer points at it.
+    """
+
+    def __init__(self, store: StateStore, resolution_s: int = _WHEEL_RESOLUTION_S) -> None:
+        self._store = store
+        self._resolution = resolution_s
+        self._buckets: dict[int, list[tuple[str, str]]] = {}
+        self._due: dict[tuple[str, str], int] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._last_purge = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, namespace: str, key: str, expires_at: float) -> None:
+        tick = int(expires_at // self._resolution) + 1
+        item = (namespace, key)
+        if self._due.get(item) == tick:
+            return
+        self._due[item] = tick
+        earliest = min(self._buckets, default=None)
+        self._buckets.setdefault(tick, []).append(item)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+        elif earliest is None or tick < earliest:
+            self._wake.set()
+
+    async def _loop(self) -> None:
+        while self._buckets:
+            delay = min(self._buckets) * self._resolution - time.time()
+            if delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                    continue  # sooner bucket added — recompute
+                except TimeoutError:
+                    pass
+            await self._fire(int(time.time() // self._resolution))
+
+    async def _fire(self, current: int) -> None:
+        due: dict[str, list[str]] = {}
+        for tick in [t for t in self._buckets if t <= current]:
+            for item in self._buckets.pop(tick):
+                if self._due.get(item) == tick:
+                    del self._due[item]
+                    due.setdefault(item[0], []).append(item[1])
+        try:
+            for namespace, keys in due.items():
+                await self._store.delete_expired(namespace, keys)
+            if time.monotonic() - self._last_purge >= _PURGE_INTERVAL_S:
+                self._last_purge = time.monotonic()
+                await self._store.purge_expired()
+        except self._store.errors as exc:
+            logger.warning("state store expiry failed: error={}", exc)
+
+    async def close(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._buckets.clear()
+        self._due.clear()
+
+
+_store: StateStore | None = None
+_wheel: ExpiryWheel | None = None
+_init_lock: asyncio.Lock | None = None
+
+
+async def get_state_store() -> StateStore:
+    """Return the process-wide store, initialising it on first use."""
+    global _store, _wheel, _init_lock
+    if _store is not None:
+        return _store
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+    async with _init_lock:
+        if _store is None:
+            store = create_state_store()
+            await store.initialize()
+            try:
+                purged = await store.purge_expired()
+            except store.errors as exc:
+                logger.warning("state store purge failed: error={}", exc)
+                purged = 0
+            _wheel = ExpiryWheel(store)
+            _store = store
+            logger.info("state store ready: backend={} purged={}", store.name, purged)
+    return _store
+
+
+async def put_state(namespace: str, key: str, value: dict, *, expires_at: float) -> None:
+    """Write a document and register its wall-clock expiry on this process's wheel.
+
+    Re-writing a document with the same *expires_at* (progress updates) does
+    not touch the wheel.
+    """
+    store = await get_state_store()
+    await store.put(namespace, key, value, max(1, math.ceil(expires_at - time.time())))
+    if _wheel is not None:
+        _wheel.schedule(namespace, key, expires_at)
+
+
+async def close_state_store() -> None:
+    """Stop the expiry wheel and close the store (application shutdown)."""
+    global _store, _wheel
+    if _wheel is not None:
+        await _wheel.close()
+        _wheel = None
+    if _store is not None:
+        try:
+            await _store.close()
+        except _store.errors as exc:
+            logger.debug("state store close failed: error={}", exc)
+        _store = None
+
+
+__all__ = [
+    "ExpiryWheel",
+    "StateStore",
+    "close_state_store",
+    "create_state_store",
+    "get_state_backend_name",
+    "get_state_store",
+    "put_state",
+]
@@ -0,0 +1,46 @@
+"""Abstract shared state store interface."""
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class StateStore(ABC):
+    """Short-lived JSON documents shared by every worker (and replica).
+
+    Documents are addressed by ``(namespace, key)`` and carry a wall-clock
+    expiry; reads never return an expired document, whether or not it has
+    been purged yet.  Expiry is wall-clock based (``time.time()``) because
+    documents are shared between processes — and for ``redis`` / SQL between
+    hosts.
+    """
+
+    name: str = ""
+    # What this backend raises when the store is unreachable or failing;
+    # background callers catch exactly these and degrade.
+    errors: tuple[type[Exception], ...] = (OSError,)
+
+    async def initialize(self) -> None:
+        """Create tables / open connections (optional)."""
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> dict[str, Any] | None:
+        """Return the live document, or ``None`` when missing or expired."""
+
+    @abstractmethod
+    async def put(self, namespace: str, key: str, value: dict[str, Any], ttl_s: int) -> None:
+        """Insert or replace a document that expires *ttl_s* seconds from now."""
+
+    @abstractmethod
+    async def delete_expired(self, namespace: str, keys: list[str]) -> None:
+        """Remove those of *keys* that have expired.
+
+        A document another writer has since re-put with a later expiry is
+        left alone; missing keys are ignored.
+        """
+
+    @abstractmethod
+    async def purge_expired(self) -> int:
+        """Drop every expired document; return how many were removed."""
+
+    async def close(self) -> None:
+        """Release any resources held by the store (optional)."""
@@ -0,0 +1,72 @@
+"""State store factory — follows ACCOUNT_STORAGE automatically."""
+
+import os
+
+from app.platform.paths import data_path
+
+from .base import StateStore
+
+
+def get_state_backend_name() -> str:
+    """Return the active state backend name (mirrors ACCOUNT_STORAGE)."""
+    return os.getenv("ACCOUNT_STORAGE", "local").strip().lower()
+
+
+def create_state_store() -> StateStore:
+    """Instantiate the state store that matches the account storage backend.
+
+    ``ACCOUNT_STORAGE=local``       → SQLite (``${DATA_DIR}/state.db``)
+    ``ACCOUNT_STORAGE=redis``       → Redis  (ACCOUNT_REDIS_URL)
+    ``ACCOUNT_STORAGE=mysql``       → MySQL  (ACCOUNT_MYSQL_URL)
+    ``ACCOUNT_STORAGE=postgresql``  → PostgreSQL (ACCOUNT_POSTGRESQL_URL)
+
+    No extra env vars needed — reuses the same connection settings as accounts.
+    """
+    backend = get_state_backend_name()
+
+    if backend == "local":
+        from .local import LocalStateStore
+
+        return LocalStateStore(data_path("state.db"))
+    if backend == "redis":
+        return _make_redis()
+    if backend in ("mysql", "postgresql"):
+        return _make_sql(backend)
+
+    raise ValueError(f"Unknown account storage backend: {backend!r}")
+
+
+def _make_redis() -> StateStore:
+    from redis.asyncio import Redis
+
+    from .redis import RedisStateStore
+
+    url = os.getenv("ACCOUNT_REDIS_URL", "").strip()
+    if not url:
+        raise ValueError("Redis state store requires ACCOUNT_REDIS_URL")
+    return RedisStateStore(Redis.from_url(url, decode_responses=False))
+
+
+def _make_sql(dialect: str) -> StateStore:
+    from app.control.account.backends.sql import (
+        create_mysql_engine,
+        create_pgsql_engine,
+    )
+
+    from .sql import SqlStateStore
+
+    if dialect == "mysql":
+        url = os.getenv("ACCOUNT_MYSQL_URL", "").strip()
+        if not url:
+            raise ValueError("MySQL state store requires ACCOUNT_MYSQL_URL")
+        engine = create_mysql_engine(url)
+    else:
+        url = os.getenv("ACCOUNT_POSTGRESQL_URL", "").strip()
+        if not url:
+            raise ValueError("PostgreSQL state store requires ACCOUNT_POSTGRESQL_URL")
+        engine = create_pgsql_engine(url)
+
+    return SqlStateStore(engine, dialect=dialect, dispose_engine=False)
+
+
+__all__ = ["create_state_store", "get_state_backend_name"]
@@ -0,0 +1,114 @@
+"""SQLite state store — shared by the workers of one host."""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+from .base import StateStore
+
+_TBL = "state_store"
+
+
+class LocalStateStore(StateStore):
+    """One WAL-mode SQLite table keyed by ``(namespace, key)``.
+
+    Every granian worker opens the same file, so a document written by one
+    worker is visible to the others.  A single connection per process is
+    reused under a thread lock; calls run on the default executor.
+    """
+
+    name = "local"
+    errors = (OSError, sqlite3.Error)
+
+    def __init__(self, db_path: Path) -> None:
+        self._path = Path(db_path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS {_TBL} (
+                    namespace  TEXT    NOT NULL,
+                    key        TEXT    NOT NULL,
+                    value      BLOB    NOT NULL,
+                    expires_at INTEGER NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_state_expires
+                    ON {_TBL} (expires_at);
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn, *args):
+        with self._lock:
+            return fn(self._connect(), *args)
+
+    async def initialize(self) -> None:
+        await asyncio.to_thread(self._run, lambda conn: None)
+
+    async def get(self, namespace: str, key: str) -> dict[str, Any] | None:
+        def _sync(conn: sqlite3.Connection) -> bytes | None:
+            row = conn.execute(
+                f"SELECT value FROM {_TBL} WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, int(time.time())),
+            ).fetchone()
+            return row[0] if row else None
+
+        raw = await asyncio.to_thread(self._run, _sync)
+        return orjson.loads(raw) if raw else None
+
+    async def put(self, namespace: str, key: str, value: dict[str, Any], ttl_s: int) -> None:
+        raw = orjson.dumps(value)
+
+        def _sync(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {_TBL} (namespace, key, value, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (namespace, key, raw, int(time.time()) + ttl_s),
+            )
+            conn.commit()
+
+        await asyncio.to_thread(self._run, _sync)
+
+    async def delete_expired(self, namespace: str, keys: list[str]) -> None:
+        if not keys:
+            return
+
+        def _sync(conn: sqlite3.Connection) -> None:
+            now = int(time.time())
+            conn.executemany(
+                f"DELETE FROM {_TBL} WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                [(namespace, k, now) for k in keys],
+            )
+            conn.commit()
+
+        await asyncio.to_thread(self._run, _sync)
+
+    async def purge_expired(self) -> int:
+        def _sync(conn: sqlite3.Connection) -> int:
+            cur = conn.execute(
+                f"DELETE FROM {_TBL} WHERE expires_at <= ?", (int(time.time()),)
+            )
+            conn.commit()
+            return cur.rowcount
+
+        return await asyncio.to_thread(self._run, _sync)
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
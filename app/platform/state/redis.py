@@ -0,0 +1,45 @@
+"""Redis state store (multi-replica / K8s)."""
+
+from typing import Any
+
+import orjson
+from redis.exceptions import RedisError
+
+from .base import StateStore
+
+_PREFIX = "state"
+
+
+class RedisStateStore(StateStore):
+    """One string key per document (``state:<namespace>:<key>``).
+
+    Expiry is the key's own TTL, so Redis drops expired documents itself and
+    neither :meth:`delete_expired` nor :meth:`purge_expired` has anything to
+    do.
+    """
+
+    name = "redis"
+    errors = (OSError, RedisError)
+
+    def __init__(self, redis, prefix: str = _PREFIX) -> None:
+        self._r = redis
+        self._prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self._prefix}:{namespace}:{key}"
+
+    async def get(self, namespace: str, key: str) -> dict[str, Any] | None:
+        raw = await self._r.get(self._key(namespace, key))
+        return orjson.loads(raw) if raw else None
+
+    async def put(self, namespace: str, key: str, value: dict[str, Any], ttl_s: int) -> None:
+        await self._r.set(self._key(namespace, key), orjson.dumps(value), ex=max(1, ttl_s))
+
+    async def delete_expired(self, namespace: str, keys: list[str]) -> None:
+        return
+
+    async def purge_expired(self) -> int:
+        return 0
+
+    async def close(self) -> None:
+        await self._r.aclose()
@@ -0,0 +1,115 @@
+"""SQL state store (MySQL / PostgreSQL)."""
+
+import time
+from typing import Any
+
+import orjson
+import sqlalchemy as sa
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .base import StateStore
+
+_TABLE = "state_store"
+
+_metadata = sa.MetaData()
+
+state_store_table = sa.Table(
+    _TABLE,
+    _metadata,
+    sa.Column("namespace",  sa.String(64),  primary_key=True),
+    sa.Column("key",        sa.String(191), primary_key=True),
+    sa.Column("value",      sa.Text,        nullable=False),
+    sa.Column("expires_at", sa.BigInteger,  nullable=False, index=True),
+)
+
+
+class SqlStateStore(StateStore):
+    """One row per document; reads are a primary-key lookup."""
+
+    name = "sql"
+    errors = (OSError, SQLAlchemyError)
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        *,
+        dialect: str = "postgresql",
+        dispose_engine: bool = True,
+    ) -> None:
+        self._engine  = engine
+        self._dialect = dialect  # "mysql" | "postgresql"
+        self._ready   = False
+        self._dispose_engine = dispose_engine
+
+    async def _ensure_table(self) -> None:
+        if self._ready:
+            return
+        async with self._engine.begin() as conn:
+            await conn.run_sync(_metadata.create_all)
+        self._ready = True
+
+    async def initialize(self) -> None:
+        await self._ensure_table()
+
+    async def get(self, namespace: str, key: str) -> dict[str, Any] | None:
+        await self._ensure_table()
+        t = state_store_table
+        async with self._engine.connect() as conn:
+            row = await conn.execute(
+                sa.select(t.c.value).where(
+                    t.c.namespace == namespace,
+                    t.c.key == key,
+                    t.c.expires_at > int(time.time()),
+                )
+            )
+            raw = row.scalar()
+        return orjson.loads(raw) if raw else None
+
+    async def put(self, namespace: str, key: str, value: dict[str, Any], ttl_s: int) -> None:
+        await self._ensure_table()
+        raw = orjson.dumps(value).decode()
+        expires_at = int(time.time()) + ttl_s
+        async with self._engine.begin() as conn:
+            await conn.execute(self._upsert(namespace, key, raw, expires_at))
+
+    async def delete_expired(self, namespace: str, keys: list[str]) -> None:
+        if not keys:
+            return
+        await self._ensure_table()
+        t = state_store_table
+        async with self._engine.begin() as conn:
+            await conn.execute(
+                sa.delete(t).where(
+                    t.c.namespace == namespace,
+                    t.c.key.in_(keys),
+                    t.c.expires_at <= int(time.time()),
+                )
+            )
+
+    async def purge_expired(self) -> int:
+        await self._ensure_table()
+        t = state_store_table
+        async with self._engine.begin() as conn:
+            result = await conn.execute(
+                sa.delete(t).where(t.c.expires_at <= int(time.time()))
+            )
+        return result.rowcount or 0
+
+    def _upsert(self, namespace: str, key: str, value: str, expires_at: int) -> sa.Insert:
+        row = {"namespace": namespace, "key": key, "value": value, "expires_at": expires_at}
+        update = {"value": value, "expires_at": expires_at}
+        if self._dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+            return (
+                insert(state_store_table)
+                .values(**row)
+                .on_conflict_do_update(index_elements=["namespace", "key"], set_=update)
+            )
+        else:  # mysql
+            from sqlalchemy.dialects.mysql import insert
+            return insert(state_store_table).values(**row).on_duplicate_key_update(**update)
+
+    async def close(self) -> None:
+        if self._dispose_engine:
+            await self._engine.dispose()
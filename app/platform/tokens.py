@@ -3,21 +3,103 @@
 All API surfaces share the same tokenizer-backed approximation so usage
 reporting stays consistent across OpenAI-compatible and Anthropic-compatible
 responses.
+
+Request handlers use the ``*_async`` helpers: counts are cached per text
+(repeated history is never re-encoded) and large uncached inputs are encoded
+in a worker thread — tiktoken releases the GIL while encoding, so a long
+prompt no longer stalls every other stream on the event loop.
+
+Streaming handlers count completions with :class:`TokenCounter`, which is
+fed per delta, so the final usage needs no pass over the whole reply.
+
+The o200k_base rank file ships in ``app/platform/assets`` and is read through
+a read-only memory map, so nothing is downloaded and workers share the file's
+pages.  The
+application warms the encoding during start-up with :func:`warm_encoding`.
 """
 
+import asyncio
+import base64
+import hashlib
+import mmap
+import time
+from collections.abc import Sequence
 from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
 import orjson
+import regex
 import tiktoken
 
+from app.platform.runtime.memo import ByteLRU
+
 PROMPT_OVERHEAD = 4
 _ENCODING_NAME = "o200k_base"
+_RANKS_FILE = f"{_ENCODING_NAME}.tiktoken"
+_RANKS_SHA256 = "446a9538cb6c348e3516120d7c08b09f57c36495e2acfffe59a5bf8b0cfb1a2d"
+_BUNDLED_RANKS = Path(__file__).resolve().parent / "assets" / _RANKS_FILE
+# o200k_base pre-tokenizer and special tokens, as published with tiktoken.
+_PAT_STR = (
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?|"""
+    r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?|"""
+    r"""\p{N}{1,3}|"""
+    r""" ?[^\s\p{L}\p{N}]+[\r\n/]*|"""
+    r"""\s*[\r\n]+|"""
+    r"""\s+(?!\S)|"""
+    r"""\s+"""
+)
+_SPECIAL_TOKENS = {"<|endoftext|>": 199999, "<|endofprompt|>": 200018}
+
+# Inputs below this many characters are encoded inline: a thread hop costs
+# more than encoding them.
+_INLINE_MAX_CHARS = 16 * 1024
+# Texts shorter than this are not worth a cache entry.
+_CACHE_MIN_CHARS = 256
+_COUNT_CACHE = ByteLRU(16 * 1024 * 1024)
+
+# Positions where the o200k pre-tokenizer always starts a new piece, no
+# matter what follows: a separator (space, punctuation other than an
+# apostrophe) between two letters — it becomes the prefix of the next word —
+# and a letter or digit right after a line break.  BPE never merges across
+# pieces, so encoding a text in slices cut here gives the same count as
+# encoding it whole.
+_SAFE_CUT = regex.compile(
+    r"(?<=\p{L})[^\r\n\p{L}\p{M}\p{N}'](?=\p{L})|(?<=[\r\n])(?=[\p{L}\p{N}])"
+)
+
+
+def _load_ranks(path: Path) -> dict[bytes, int]:
+    """Parse a ``.tiktoken`` rank file through a read-only memory map."""
+    with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hashlib.sha256(mm).hexdigest() != _RANKS_SHA256:
+            raise ValueError(f"{path} is not the {_ENCODING_NAME} rank file (sha256 mismatch)")
+        ranks: dict[bytes, int] = {}
+        for line in iter(mm.readline, b""):
+            if line.strip():
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+    return ranks
 
 
 @lru_cache(maxsize=1)
 def _get_encoding() -> tiktoken.Encoding:
-    return tiktoken.get_encoding(_ENCODING_NAME)
+    return tiktoken.Encoding(
+        _ENCODING_NAME,
+        pat_str=_PAT_STR,
+        mergeable_ranks=_load_ranks(_BUNDLED_RANKS),
+        special_tokens=_SPECIAL_TOKENS,
+    )
+
+
+def warm_encoding() -> tuple[str, float]:
+    """Load the encoding now; returns ``(rank file, elapsed ms)``.
+
+    Blocking — call it from a thread during start-up.
+    """
+    started = time.perf_counter()
+    _get_encoding().encode("warm up", disallowed_special=())
+    return str(_BUNDLED_RANKS), (time.perf_counter() - started) * 1000
 
 
 def _coerce_text(value: Any) -> str:
@@ -38,6 +120,106 @@ def estimate_tokens(value: Any) -> int:
     return len(_get_encoding().encode(text, disallowed_special=()))
 
 
+def _encode_lengths(texts: list[str]) -> list[int]:
+    encoding = _get_encoding()
+    return [len(encoding.encode(text, disallowed_special=())) for text in texts]
+
+
+async def count_tokens_many(texts: Sequence[str]) -> list[int]:
+    """Token counts for *texts* (stripped), cached and encoded off-loop when large."""
+    counts = [0] * len(texts)
+    missing: list[int] = []
+    missing_texts: list[str] = []
+    for i, raw in enumerate(texts):
+        text = raw.strip() if raw else ""
+        if not text:
+            continue
+        if len(text) >= _CACHE_MIN_CHARS:
+            cached = _COUNT_CACHE.get(text)
+            if cached is not None:
+                counts[i] = cached
+                continue
+        missing.append(i)
+        missing_texts.append(text)
+    if not missing:
+        return counts
+
+    if sum(map(len, missing_texts)) > _INLINE_MAX_CHARS:
+        lengths = await asyncio.to_thread(_encode_lengths, missing_texts)
+    else:
+        lengths = _encode_lengths(missing_texts)
+    for i, text, n in zip(missing, missing_texts, lengths):
+        counts[i] = n
+        if len(text) >= _CACHE_MIN_CHARS:
+            _COUNT_CACHE.put(text, n, len(text) + 64)
+    return counts
+
+
+async def estimate_tokens_async(value: Any) -> int:
+    """Async :func:`estimate_tokens` — cached, large inputs encoded off-loop."""
+    return (await count_tokens_many([_coerce_text(value)]))[0]
+
+
+async def estimate_prompt_tokens_async(
+    parts: Sequence[str], *, overhead: int = PROMPT_OVERHEAD
+) -> int:
+    """Prompt tokens of a flattened prompt given as its separately cached parts.
+
+    Summing per-part counts lets a long history reuse the counts of every
+    message already seen; it differs from encoding the joined string only at
+    part boundaries.
+    """
+    base = sum(await count_tokens_many(parts))
+    if base <= 0:
+        return 0
+    return base + max(0, overhead)
+
+
+class TokenCounter:
+    """Running token count of a streamed text, fed one delta at a time.
+
+    Deltas are buffered and encoded up to the last safe cut, so only a short
+    tail is ever pending.  :attr:`total` equals :func:`estimate_tokens` of
+    the concatenated deltas (leading and trailing whitespace ignored).
+    """
+
+    __slots__ = ("_chars", "_pending", "_tokens")
+
+    def __init__(self) -> None:
+        self._tokens = 0
+        self._pending = ""
+        self._chars = 0
+
+    def __len__(self) -> int:
+        """Characters fed so far."""
+        return self._chars
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        self._chars += len(text)
+        if not self._tokens and not self._pending:
+            text = text.lstrip()
+            if not text:
+                return
+        start = max(0, len(self._pending) - 1)
+        pending = self._pending + text
+        cut = 0
+        for match in _SAFE_CUT.finditer(pending, start):
+            cut = match.start()
+        if cut > 0:
+            self._tokens += len(_get_encoding().encode(pending[:cut], disallowed_special=()))
+            pending = pending[cut:]
+        self._pending = pending
+
+    @property
+    def total(self) -> int:
+        tail = self._pending.rstrip()
+        if not tail:
+            return self._tokens
+        return self._tokens + len(_get_encoding().encode(tail, disallowed_special=()))
+
+
 def estimate_prompt_tokens(value: Any, *, overhead: int = PROMPT_OVERHEAD) -> int:
     base = estimate_tokens(value)
     if base <= 0:
@@ -67,7 +249,12 @@ def estimate_tool_call_tokens(tool_calls: list[Any]) -> int:
 
 __all__ = [
     "PROMPT_OVERHEAD",
-    "estimate_tokens",
+    "TokenCounter",
+    "count_tokens_many",
     "estimate_prompt_tokens",
+    "estimate_prompt_tokens_async",
+    "estimate_tokens",
+    "estimate_tokens_async",
     "estimate_tool_call_tokens",
+    "warm_encoding",
 ]
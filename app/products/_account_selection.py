@@ -46,16 +46,32 @@ async def reserve_account(
     spec: ModelSpec,
     *,
     exclude_tokens: list[str] | None = None,
+    prefer_token: str | None = None,
     now_s_override: int | None = None,
 ):
     """Reserve an account and return ``(lease, selected_mode_id)``.
 
+    ``prefer_token`` is tried first (sticky selection); when that account is
+    not selectable right now the normal selection runs instead, so callers
+    compare ``lease.token`` to learn which one they got.
+
     Returns ``(None, original_mode_id)`` when no account is available. Under the
     random strategy no on-demand refresh fallback is attempted — upstream quota
     data is never probed.
     """
     original_mode_id = int(spec.mode_id)
 
+    if prefer_token and prefer_token not in (exclude_tokens or ()):
+        for candidate_mode_id in mode_candidates(spec):
+            lease = await directory.reserve_token(
+                prefer_token,
+                spec.pool_candidates(),
+                candidate_mode_id,
+                now_s_override=now_s_override,
+            )
+            if lease is not None:
+                return lease, candidate_mode_id
+
     async def _try_reserve():
         for candidate_mode_id in mode_candidates(spec):
             lease = await directory.reserve(
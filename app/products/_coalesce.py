@@ -0,0 +1,224 @@
+"""Delta coalescing for streamed responses.
+
+grok.com streams one or two characters per frame and every surface forwards
+one SSE event per upstream token, so under load most of the bytes and send
+calls go to framing.  :func:`coalesce` sits between a stream generator and
+the client and merges consecutive content/reasoning deltas of the same
+channel into one frame, for at most ``coalesce_ms`` or ``coalesce_bytes``.
+
+A delta is sent at once when no delta went out for a whole window or when
+the previous frame was not a delta — so the first token of the stream and
+of every block is never delayed — and pending text is flushed before any
+other frame (tool-call, block boundary, final, ``[DONE]``), before an error
+and when the window expires.  The stream generator runs in its own task and
+keeps reading upstream while the client is slow; whatever piles up in the
+meantime goes out as one frame.
+
+Stream generators yield :class:`Delta` items instead of rendered bytes only
+when a window is active; without one nothing changes.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterator, Callable, NamedTuple
+
+from app.platform.auth.middleware import current_api_key
+from app.platform.config.snapshot import get_config
+from app.platform.logging.logger import logger
+
+# Items the generator may run ahead of a slow client.
+_QUEUE_SIZE = 256
+
+
+class Delta(NamedTuple):
+    """Text for a content/reasoning delta frame, rendered by *render*.
+
+    Consecutive deltas merge when their renderers compare equal, so streams
+    must reuse one renderer (e.g. a template's bound ``render``) per channel.
+    """
+
+    render: Callable[[str], bytes]
+    text: str
+
+
+@dataclass(slots=True, frozen=True)
+class CoalesceWindow:
+    seconds: float
+    max_bytes: int
+
+
+class _Stats:
+    __slots__ = ("streams", "deltas", "frames")
+
+    def __init__(self) -> None:
+        self.streams = 0
+        self.deltas = 0
+        self.frames = 0
+
+
+_STATS = _Stats()
+
+
+def coalesce_stats() -> dict:
+    """Process-wide counters since start-up."""
+    return {
+        "streams": _STATS.streams,
+        "deltas": _STATS.deltas,
+        "frames": _STATS.frames,
+        "frames_saved": _STATS.deltas - _STATS.frames,
+    }
+
+
+def _key_override(api_key: str) -> tuple[int, int | None] | None:
+    """``(ms, bytes)`` from a ``<api_key>=<ms>[:<bytes>]`` entry of ``stream.coalesce_keys``."""
+    for entry in get_config().get_list("stream.coalesce_keys", []):
+        key, sep, value = str(entry).strip().rpartition("=")
+        if not sep or key.strip() != api_key:
+            continue
+        ms, _, size = value.partition(":")
+        try:
+            return int(ms), int(size) if size.strip() else None
+        except ValueError:
+            logger.warning("invalid stream.coalesce_keys entry ignored: value={}", value)
+            return None
+    return None
+
+
+def coalesce_window(api_key: str | None = None) -> CoalesceWindow | None:
+    """Window for the current request; ``None`` when coalescing is off.
+
+    *api_key* defaults to the key that authenticated the request; a
+    ``stream.coalesce_keys`` entry for it overrides the global settings.
+    """
+    cfg = get_config()
+    ms = cfg.get_int("stream.coalesce_ms", 0)
+    max_bytes = cfg.get_int("stream.coalesce_bytes", 1024)
+    api_key = api_key if api_key is not None else current_api_key()
+    if api_key:
+        override = _key_override(api_key)
+        if override is not None:
+            ms = override[0]
+            if override[1] is not None:
+                max_bytes = override[1]
+    if ms <= 0:
+        return None
+    return CoalesceWindow(ms / 1000, max(1, max_bytes))
+
+
+class _Failed(NamedTuple):
+    exc: Exception
+
+
+_END = object()
+
+
+async def _pump(frames: AsyncIterator, queue: asyncio.Queue) -> None:
+    try:
+        async for item in frames:
+            await queue.put(item)
+    except Exception as exc:
+        await queue.put(_Failed(exc))
+    else:
+        await queue.put(_END)
+    finally:
+        aclose = getattr(frames, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def coalesce(
+    frames: AsyncIterator[bytes | Delta],
+    window: CoalesceWindow,
+) -> AsyncGenerator[bytes, None]:
+    """Render *frames*, merging consecutive :class:`Delta` items per *window*."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(_QUEUE_SIZE)
+    pump = asyncio.create_task(_pump(frames, queue))
+    render: Callable[[str], bytes] | None = None
+    parts: list[str] = []
+    size = 0
+    deadline = 0.0
+    last_out = float("-inf")
+    deltas = frames_out = 0
+    _STATS.streams += 1
+
+    def _take() -> bytes:
+        nonlocal render, parts, size, frames_out
+        frame = render("".join(parts))
+        render, parts, size = None, [], 0
+        frames_out += 1
+        return frame
+
+    try:
+        while True:
+            if render is None:
+                item = await queue.get()
+            elif loop.time() >= deadline:
+                last_out = loop.time()
+                yield _take()
+                continue
+            elif not queue.empty():
+                item = queue.get_nowait()
+            else:
+                try:
+                    async with asyncio.timeout_at(deadline):
+                        item = await queue.get()
+                except TimeoutError:
+                    last_out = loop.time()
+                    yield _take()
+                    continue
+
+            if type(item) is Delta:
+                deltas += 1
+                if render is not None and item.render != render:
+                    last_out = loop.time()
+                    yield _take()
+                now = loop.time()
+                if render is None:
+                    if now - last_out >= window.seconds:
+                        frames_out += 1
+                        last_out = now
+                        yield item.render(item.text)
+                        continue
+                    render, deadline = item.render, now + window.seconds
+                text = item.text
+                parts.append(text)
+                size += len(text) if text.isascii() else len(text.encode())
+                if size >= window.max_bytes:
+                    last_out = now
+                    yield _take()
+                continue
+
+            if render is not None:
+                yield _take()
+            if item is _END:
+                return
+            if type(item) is _Failed:
+                raise item.exc
+            # Pass-through frames (block starts, output items) usually
+            # precede a block's first delta, which must not wait for them.
+            last_out = float("-inf")
+            yield item
+    finally:
+        _STATS.deltas += deltas
+        _STATS.frames += frames_out
+        if not pump.done():
+            pump.cancel()
+            await asyncio.wait((pump,))
+        if deltas:
+            logger.debug(
+                "stream coalesced: deltas={} frames={} window_ms={:g} max_bytes={}",
+                deltas,
+                frames_out,
+                window.seconds * 1000,
+                window.max_bytes,
+            )
+
+
+__all__ = [
+    "CoalesceWindow",
+    "Delta",
+    "coalesce",
+    "coalesce_stats",
+    "coalesce_window",
+]
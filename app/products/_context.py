@@ -0,0 +1,149 @@
+"""Context-window budgeting for chat-style requests.
+
+Every chat surface (chat completions, responses, anthropic messages)
+flattens its history into one upstream message.  When that message cannot
+fit the model's window, grok.com either takes a long time to reject it or
+silently truncates it — while the request holds an account's quota and
+inflight slot.  :func:`fit_context` trims the history *before* an account is
+reserved: system messages and the most recent messages are kept intact and
+whole middle turns are dropped, oldest first, behind a short marker.
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+from app.control.model.spec import ModelSpec
+from app.platform.config.snapshot import get_config
+from app.platform.errors import ValidationError
+from app.platform.logging.logger import logger
+from app.platform.tokens import PROMPT_OVERHEAD, count_tokens_many
+
+_PROTECTED_ROLES = frozenset({"system", "developer"})
+# Upper bound of tokens per character (a token is at least one UTF-8 byte).
+_MAX_TOKENS_PER_CHAR = 4
+
+Extracted = tuple[str, Sequence[str]]
+
+
+@dataclass(slots=True, frozen=True)
+class ContextFit:
+    """Result of :func:`fit_context`."""
+
+    extracted: Sequence[Extracted]
+    trimmed_tokens: int = 0
+    dropped_messages: int = 0
+
+
+def prompt_budget(spec: ModelSpec) -> int:
+    """Token budget for the flattened prompt of *spec*; 0 when it has no window."""
+    cfg = get_config()
+    budget = cfg.get_int("context.max_prompt_tokens", 0)
+    if budget > 0:
+        return budget
+    if spec.context_tokens <= 0:
+        return 0
+    return max(1, spec.context_tokens - max(0, cfg.get_int("context.reserve_tokens", 8192)))
+
+
+def _units(roles: Sequence[str], start: int, stop: int) -> list[tuple[int, int]]:
+    """Split ``[start, stop)`` into droppable units.
+
+    A unit starts at a non-tool message and absorbs the tool results that
+    follow it, so an assistant tool call is never kept without its results
+    (or the other way round).  System messages are never part of a unit.
+    """
+    units: list[tuple[int, int]] = []
+    i = start
+    while i < stop:
+        if roles[i] in _PROTECTED_ROLES:
+            i += 1
+            continue
+        j = i + 1
+        while j < stop and roles[j] == "tool":
+            j += 1
+        units.append((i, j))
+        i = j
+    return units
+
+
+async def fit_context(
+    messages: Sequence[dict],
+    extracted: Sequence[Extracted],
+    spec: ModelSpec,
+    *,
+    extra_text: str = "",
+    label: str = "chat",
+) -> ContextFit:
+    """Trim the flattened history so it fits the model's prompt budget.
+
+    *extracted* holds one ``(text, files)`` pair per message of *messages*;
+    *extra_text* is text added after flattening (the tool prompt); it counts
+    against the budget but is never trimmed.
+    Raises :class:`ValidationError` (``context_length_exceeded``) when the
+    messages that must be kept do not fit on their own.
+    """
+    if not get_config().get_bool("context.enabled", True):
+        return ContextFit(extracted)
+    full_budget = prompt_budget(spec)
+    if full_budget <= 0:
+        return ContextFit(extracted)
+    chars = sum(len(text) for text, _ in extracted) + len(extra_text)
+    if chars * _MAX_TOKENS_PER_CHAR <= full_budget:
+        return ContextFit(extracted)
+
+    counts = await count_tokens_many([extra_text, *(text for text, _ in extracted)])
+    extra_tokens = counts.pop(0)
+    budget = full_budget - extra_tokens
+    counts = [n + PROMPT_OVERHEAD if n else 0 for n in counts]
+    total = sum(counts)
+    if total <= budget:
+        return ContextFit(extracted)
+
+    roles = [str(msg.get("role") or "user") for msg in messages]
+    keep_recent = max(1, get_config().get_int("context.keep_recent", 8))
+    recent = max(0, len(messages) - keep_recent)
+    # Never split a tool-call group at the recent boundary.
+    while recent > 0 and roles[recent] == "tool":
+        recent -= 1
+
+    dropped: set[int] = set()
+    trimmed = 0
+    for start, stop in _units(roles, 0, recent):
+        if total - trimmed <= budget:
+            break
+        dropped.update(range(start, stop))
+        trimmed += sum(counts[start:stop])
+
+    if total - trimmed > budget:
+        raise ValidationError(
+            f"This model's maximum prompt length is {full_budget} tokens, "
+            f"but the messages that cannot be trimmed need {total - trimmed + extra_tokens}.",
+            param="messages",
+            code="context_length_exceeded",
+        )
+
+    first = min(dropped)
+    marker = (
+        f"[system]: ({len(dropped)} earlier messages were omitted to fit the context window)",
+        (),
+    )
+    kept: list[Extracted] = []
+    for i, item in enumerate(extracted):
+        if i == first:
+            kept.append(marker)
+        if i not in dropped:
+            kept.append(item)
+
+    logger.info(
+        "{} context trimmed: model={} dropped_messages={} trimmed_tokens={} prompt_tokens={} budget={}",
+        label,
+        spec.model_name,
+        len(dropped),
+        trimmed,
+        total - trimmed + extra_tokens,
+        full_budget,
+    )
+    return ContextFit(kept, trimmed_tokens=trimmed, dropped_messages=len(dropped))
+
+
+__all__ = ["ContextFit", "fit_context", "prompt_budget"]
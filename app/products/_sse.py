@@ -0,0 +1,59 @@
+"""Bytes-native SSE frames for streamed responses.
+
+Per-token frames differ from each other only in the delta text: ids, model,
+indices and the ``created`` timestamp are fixed for the whole stream.
+:class:`FrameTemplate` serialises such a frame once with :data:`SLOT`
+markers in place of the variable fields and afterwards only splices the
+JSON-encoded values between the pre-rendered pieces.  Frames are ``bytes``
+so the ASGI server sends them without another encode.
+"""
+
+from typing import Any
+
+import orjson
+
+# Placeholder for a variable field; a private-use code point keeps it from
+# colliding with real content.
+SLOT = "\ue000slot\ue000"
+_SLOT_JSON = orjson.dumps(SLOT)
+
+DONE_FRAME = b"data: [DONE]\n\n"
+
+
+def sse_frame(data: Any, event: str | None = None) -> bytes:
+    """Encode one SSE frame (``event:`` line only when *event* is given)."""
+    if event:
+        return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+class FrameTemplate:
+    """An SSE frame pre-rendered around its variable fields.
+
+    Build it from a sample payload whose variable fields hold :data:`SLOT`;
+    :meth:`render` takes one value per slot, in serialisation order.
+    """
+
+    __slots__ = ("_head", "_parts")
+
+    def __init__(self, data: Any, event: str | None = None) -> None:
+        pieces = sse_frame(data, event).split(_SLOT_JSON)
+        if len(pieces) < 2:
+            raise ValueError("frame template has no SLOT")
+        self._head = pieces[0]
+        self._parts = tuple(pieces[1:])
+
+    def render(self, *values: Any) -> bytes:
+        parts = self._parts
+        if len(values) != len(parts):
+            raise ValueError(f"expected {len(parts)} values, got {len(values)}")
+        if len(parts) == 1:
+            return self._head + orjson.dumps(values[0]) + parts[0]
+        out = [self._head]
+        for value, part in zip(values, parts):
+            out.append(orjson.dumps(value))
+            out.append(part)
+        return b"".join(out)
+
+
+__all__ = ["DONE_FRAME", "SLOT", "FrameTemplate", "sse_frame"]
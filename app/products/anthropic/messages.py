@@ -8,6 +8,7 @@ responses.py — only the input/output format conversion differs.
 """
 
 import asyncio
+import hashlib
 import os
 import time
 from typing import Any, AsyncGenerator
@@ -18,22 +19,31 @@ from app.platform.logging.logger import logger
 from app.platform.config.snapshot import get_config
 from app.platform.errors import RateLimitError, UpstreamError
 from app.platform.runtime.clock import now_s
-from app.platform.tokens import estimate_prompt_tokens, estimate_tokens, estimate_tool_call_tokens
+from app.platform.runtime.memo import ByteLRU
+from app.platform.tokens import (
+    TokenCounter,
+    estimate_prompt_tokens_async,
+    estimate_tokens_async,
+    estimate_tool_call_tokens,
+)
 from app.control.model.enums import ModeId
 from app.control.model.registry import resolve as resolve_model
 from app.control.account.enums import FeedbackKind
-from app.dataplane.reverse.protocol.xai_chat import classify_line, StreamAdapter
+from app.dataplane.reverse.protocol.xai_chat import StreamAdapter
 from app.dataplane.reverse.protocol.tool_prompt import (
     build_tool_system_prompt, extract_tool_names, inject_into_message,
 )
-from app.dataplane.reverse.protocol.tool_parser import parse_tool_calls
+from app.dataplane.reverse.protocol.tool_parser import ToolCallDelta, parse_tool_calls
 
 from app.products.openai.chat import (
-    _stream_chat, _extract_message, _resolve_image,
+    _stream_chat, _extract_each, _join_extracted, _resolve_image,
     _quota_sync, _fail_sync, _parse_retry_codes, _feedback_kind, _log_task_exception,
     _configured_retry_codes, _should_retry_upstream,
 )
 from app.products._account_selection import reserve_account, selection_max_retries
+from app.products._coalesce import Delta, coalesce, coalesce_window
+from app.products._context import fit_context
+from app.products._sse import DONE_FRAME, SLOT, FrameTemplate, sse_frame
 from app.products.openai._tool_sieve import ToolSieve
 
 
@@ -53,14 +63,69 @@ def _make_tool_id() -> str:
 # SSE encoding (Anthropic event format)
 # ---------------------------------------------------------------------------
 
-def _sse(event: str, data: dict) -> str:
-    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+def _sse(event: str, data: dict) -> bytes:
+    return sse_frame(data, event)
+
+
+# Per-token delta frames differ only in their text; one template per
+# (delta type, block index), the index range being small in practice.
+_DELTA_FRAMES: dict[tuple[str, int], FrameTemplate] = {}
+_DELTA_FRAMES_MAX_INDEX = 64
+
+
+def _delta_template(kind: str, index: int) -> FrameTemplate:
+    template = _DELTA_FRAMES.get((kind, index))
+    if template is None:
+        field = "thinking" if kind == "thinking_delta" else "text"
+        template = FrameTemplate({
+            "type":  "content_block_delta",
+            "index": index,
+            "delta": {"type": kind, field: SLOT},
+        }, "content_block_delta")
+        if index < _DELTA_FRAMES_MAX_INDEX:
+            _DELTA_FRAMES[(kind, index)] = template
+    return template
+
+
+def _delta_frame(kind: str, index: int, text: str) -> bytes:
+    return _delta_template(kind, index).render(text)
 
 
 # ---------------------------------------------------------------------------
 # Request conversion: Anthropic → internal format
 # ---------------------------------------------------------------------------
 
+def _tool_use_events(deltas: list[ToolCallDelta], block_index: int) -> tuple[list[bytes], int]:
+    """tool_use block events for streamed sieve deltas; returns the next block index."""
+    events: list[bytes] = []
+    for d in deltas:
+        if d.kind == "start":
+            events.append(_sse("content_block_start", {
+                "type":  "content_block_start",
+                "index": block_index,
+                "content_block": {
+                    "type":  "tool_use",
+                    "id":    d.call_id,
+                    "name":  d.name,
+                    "input": {},
+                },
+            }))
+        elif d.kind == "args":
+            events.append(_sse("content_block_delta", {
+                "type":  "content_block_delta",
+                "index": block_index,
+                "delta": {"type": "input_json_delta", "partial_json": d.arguments},
+            }))
+        else:
+            # ``end`` or ``drop`` — either way the started block is closed.
+            events.append(_sse("content_block_stop", {
+                "type":  "content_block_stop",
+                "index": block_index,
+            }))
+            block_index += 1
+    return events, block_index
+
+
 def _anthropic_content_to_internal(content: Any, role: str) -> list[dict]:
     """Convert Anthropic content (string or block list) to internal message list.
 
@@ -251,8 +316,9 @@ def _build_message_response(
     stop_reason: str,
     input_tokens:  int,
     output_tokens: int,
+    trimmed_tokens: int = 0,
 ) -> dict:
-    return {
+    resp = {
         "id":            msg_id,
         "type":          "message",
         "role":          "assistant",
@@ -265,6 +331,51 @@ def _build_message_response(
             "output_tokens": output_tokens,
         },
     }
+    if trimmed_tokens > 0:
+        # 超出上下文窗口时被裁剪、未发送到上游的历史 token 数
+        resp["usage"]["trimmed_input_tokens"] = trimmed_tokens
+    return resp
+
+
+# ---------------------------------------------------------------------------
+# Token counting (/v1/messages/count_tokens)
+# ---------------------------------------------------------------------------
+
+# input_tokens by request digest; agent tools probe the same payload repeatedly.
+_COUNT_CACHE = ByteLRU(1024 * 1024)
+_COUNT_ENTRY_BYTES = 64
+
+
+async def count_tokens(
+    *,
+    messages:    list[dict],
+    system:      str | list | None = None,
+    tools:       list[dict] | None = None,
+    tool_choice: Any = None,
+) -> dict:
+    """Count input tokens exactly as :func:`create` would report them.
+
+    Purely local: no account is reserved and nothing is sent upstream.
+    Context trimming is not applied — the count is what the full request
+    needs.
+    """
+    key = hashlib.blake2b(
+        orjson.dumps([system, messages, tools, tool_choice]), digest_size=16
+    ).digest()
+    cached = _COUNT_CACHE.get(key)
+    if cached is not None:
+        return {"input_tokens": cached}
+
+    internal_messages = _parse_anthropic_messages(messages, system)
+    tool_prompt = ""
+    if tools:
+        tool_prompt = build_tool_system_prompt(
+            _convert_tools(tools), _convert_tool_choice(tool_choice)
+        )
+    prompt_parts = [tool_prompt, *(text for text, _ in _extract_each(internal_messages))]
+    input_tokens = await estimate_prompt_tokens_async(prompt_parts)
+    _COUNT_CACHE.put(key, input_tokens, _COUNT_ENTRY_BYTES)
+    return {"input_tokens": input_tokens}
 
 
 # ---------------------------------------------------------------------------
@@ -282,7 +393,7 @@ async def create(
     top_p:        float,
     tools:        list[dict] | None = None,
     tool_choice:  Any = None,
-) -> dict | AsyncGenerator[str, None]:
+) -> dict | AsyncGenerator[bytes, None]:
 
     cfg     = get_config()
     spec    = resolve_model(model)
@@ -290,18 +401,27 @@ async def create(
 
     # Build internal message list
     internal_messages = _parse_anthropic_messages(messages, system)
-    internal_message, files = _extract_message(internal_messages)
-    if not internal_message.strip():
-        raise UpstreamError("Empty message after extraction", status=400)
 
     # Tool injection
     tool_names: list[str] = []
+    tool_prompt = ""
     internal_tool_choice: Any = None
     if tools:
         chat_tools       = _convert_tools(tools)
         tool_names       = extract_tool_names(chat_tools)
         internal_tool_choice = _convert_tool_choice(tool_choice)
         tool_prompt      = build_tool_system_prompt(chat_tools, internal_tool_choice)
+
+    fit = await fit_context(
+        internal_messages, _extract_each(internal_messages), spec,
+        extra_text=tool_prompt, label="messages",
+    )
+    internal_message, files = _join_extracted(fit.extracted)
+    prompt_parts = [tool_prompt, *(text for text, _ in fit.extracted)]
+    if not internal_message.strip():
+        raise UpstreamError("Empty message after extraction", status=400)
+
+    if tool_prompt:
         internal_message = inject_into_message(internal_message, tool_prompt)
         logger.info("messages tool injection: tool_names={} choice={}", tool_names, internal_tool_choice)
 
@@ -318,7 +438,14 @@ async def create(
     # -------------------------------------------------------------------------
     # Streaming
     # -------------------------------------------------------------------------
-    async def _run_stream() -> AsyncGenerator[str, None]:
+    window = coalesce_window() if stream else None
+
+    def _delta(kind: str, index: int, text: str) -> bytes | Delta:
+        if window:
+            return Delta(_delta_template(kind, index).render, text)
+        return _delta_frame(kind, index, text)
+
+    async def _run_stream() -> AsyncGenerator[bytes | Delta, None]:
         excluded: list[str] = []
         for attempt in range(max_retries + 1):
             acct, selected_mode_id = await reserve_account(
@@ -335,12 +462,12 @@ async def create(
             _retry  = False
             fail_exc: BaseException | None = None
             adapter               = StreamAdapter()
-            think_buf:  list[str] = []
-            text_buf:   list[str] = []
+            think_count           = TokenCounter()
+            text_count            = TokenCounter()
             think_started         = False
             think_closed          = False
             text_started          = False
-            sieve                 = ToolSieve(tool_names) if tool_names else None
+            sieve                 = ToolSieve(tool_names, stream_args=True) if tool_names else None
             tool_calls_emitted    = False
             tool_output_tokens    = 0
             block_index           = 0  # tracks next content_block index
@@ -358,13 +485,13 @@ async def create(
                             "model":       model,
                             "content":     [],
                             "stop_reason": None,
-                            "usage":       {"input_tokens": estimate_prompt_tokens(internal_message), "output_tokens": 0},
+                            "usage":       {"input_tokens": await estimate_prompt_tokens_async(prompt_parts), "output_tokens": 0},
                         },
                     })
                     yield _sse("ping", {"type": "ping"})
 
                     ended = False
-                    async for line in _stream_chat(
+                    async for data in _stream_chat(
                         token     = token,
                         mode_id   = ModeId(selected_mode_id),
                         message   = internal_message,
@@ -374,11 +501,6 @@ async def create(
                         if tool_calls_emitted:
                             break
 
-                        event_type, data = classify_line(line)
-                        if event_type == "done":
-                            break
-                        if event_type != "data" or not data:
-                            continue
 
                         for ev in adapter.feed(data):
 
@@ -390,12 +512,8 @@ async def create(
                                         "index":         block_index,
                                         "content_block": {"type": "thinking", "thinking": ""},
                                     })
-                                think_buf.append(ev.content)
-                                yield _sse("content_block_delta", {
-                                    "type":  "content_block_delta",
-                                    "index": block_index,
-                                    "delta": {"type": "thinking_delta", "thinking": ev.content},
-                                })
+                                think_count.feed(ev.content)
+                                yield _delta("thinking_delta", block_index, ev.content)
 
                             elif ev.kind == "text":
                                 # Close thinking block if open
@@ -410,36 +528,6 @@ async def create(
                                 # Feed through ToolSieve if tools active
                                 if sieve is not None:
                                     safe_text, calls = sieve.feed(ev.content)
-                                    if calls is not None:
-                                        # Emit tool_use blocks
-                                        for call in calls:
-                                            yield _sse("content_block_start", {
-                                                "type":  "content_block_start",
-                                                "index": block_index,
-                                                "content_block": {
-                                                    "type":  "tool_use",
-                                                    "id":    call.call_id,
-                                                    "name":  call.name,
-                                                    "input": {},
-                                                },
-                                            })
-                                            yield _sse("content_block_delta", {
-                                                "type":  "content_block_delta",
-                                                "index": block_index,
-                                                "delta": {
-                                                    "type":         "input_json_delta",
-                                                    "partial_json": call.arguments,
-                                                },
-                                            })
-                                            yield _sse("content_block_stop", {
-                                                "type":  "content_block_stop",
-                                                "index": block_index,
-                                            })
-                                            block_index += 1
-                                        tool_output_tokens = estimate_tool_call_tokens(calls)
-                                        tool_calls_emitted = True
-                                        ended = True
-                                        break
                                     text_chunk = safe_text
                                 else:
                                     text_chunk = ev.content
@@ -452,12 +540,26 @@ async def create(
                                             "index":         block_index,
                                             "content_block": {"type": "text", "text": ""},
                                         })
-                                    text_buf.append(text_chunk)
-                                    yield _sse("content_block_delta", {
-                                        "type":  "content_block_delta",
-                                        "index": block_index,
-                                        "delta": {"type": "text_delta", "text": text_chunk},
-                                    })
+                                    text_count.feed(text_chunk)
+                                    yield _delta("text_delta", block_index, text_chunk)
+
+                                if sieve is not None:
+                                    deltas = sieve.drain_deltas()
+                                    if deltas and text_started:
+                                        yield _sse("content_block_stop", {
+                                            "type":  "content_block_stop",
+                                            "index": block_index,
+                                        })
+                                        block_index += 1
+                                        text_started = False
+                                    events, block_index = _tool_use_events(deltas, block_index)
+                                    for evt in events:
+                                        yield evt
+                                    if calls is not None:
+                                        tool_output_tokens = estimate_tool_call_tokens(calls)
+                                        tool_calls_emitted = True
+                                        ended = True
+                                        break
 
                             elif ev.kind == "annotation" and ev.annotation_data:
                                 collected_annotations.append(ev.annotation_data)
@@ -472,39 +574,18 @@ async def create(
                     # Flush sieve — incomplete XML at end of stream
                     if sieve is not None and not tool_calls_emitted:
                         calls = sieve.flush()
+                        deltas = sieve.drain_deltas()
+                        if deltas and text_started:
+                            yield _sse("content_block_stop", {
+                                "type":  "content_block_stop",
+                                "index": block_index,
+                            })
+                            block_index += 1
+                            text_started = False
+                        events, block_index = _tool_use_events(deltas, block_index)
+                        for evt in events:
+                            yield evt
                         if calls:
-                            # Close text block if open
-                            if text_started:
-                                yield _sse("content_block_stop", {
-                                    "type":  "content_block_stop",
-                                    "index": block_index,
-                                })
-                                block_index += 1
-                                text_started = False
-                            for call in calls:
-                                yield _sse("content_block_start", {
-                                    "type":  "content_block_start",
-                                    "index": block_index,
-                                    "content_block": {
-                                        "type":  "tool_use",
-                                        "id":    call.call_id,
-                                        "name":  call.name,
-                                        "input": {},
-                                    },
-                                })
-                                yield _sse("content_block_delta", {
-                                    "type":  "content_block_delta",
-                                    "index": block_index,
-                                    "delta": {
-                                        "type":         "input_json_delta",
-                                        "partial_json": call.arguments,
-                                    },
-                                })
-                                yield _sse("content_block_stop", {
-                                    "type":  "content_block_stop",
-                                    "index": block_index,
-                                })
-                                block_index += 1
                             tool_output_tokens = estimate_tool_call_tokens(calls)
                             tool_calls_emitted = True
 
@@ -520,7 +601,7 @@ async def create(
                             "usage": {"output_tokens": tool_output_tokens},
                         })
                         yield _sse("message_stop", {"type": "message_stop"})
-                        yield "data: [DONE]\n\n"
+                        yield DONE_FRAME
                         success = True
                         logger.info("messages stream tool_calls: attempt={}/{} model={}",
                                     attempt + 1, max_retries + 1, model)
@@ -530,23 +611,15 @@ async def create(
                             img_text = await _resolve_image(token, url, img_id)
                             if isinstance(img_text, str):
                                 chunk = img_text + "\n"
-                                text_buf.append(chunk)
+                                text_count.feed(chunk)
                                 if text_started:
-                                    yield _sse("content_block_delta", {
-                                        "type":  "content_block_delta",
-                                        "index": block_index,
-                                        "delta": {"type": "text_delta", "text": chunk},
-                                    })
+                                    yield _delta("text_delta", block_index, chunk)
 
                         references = adapter.references_suffix()
                         if references:
-                            text_buf.append(references)
+                            text_count.feed(references)
                             if text_started:
-                                yield _sse("content_block_delta", {
-                                    "type":  "content_block_delta",
-                                    "index": block_index,
-                                    "delta": {"type": "text_delta", "text": references},
-                                })
+                                yield _delta("text_delta", block_index, references)
 
                         # Close open blocks
                         if think_started and not think_closed:
@@ -562,11 +635,7 @@ async def create(
                                 "index": block_index,
                             })
 
-                        full_text  = "".join(text_buf)
-                        full_think = "".join(think_buf)
-                        out_tokens = estimate_tokens(full_text)
-                        if full_think:
-                            out_tokens += estimate_tokens(full_think)
+                        out_tokens = text_count.total + think_count.total
 
                         # 构建 message_delta，注入结构化搜索信源和 annotations
                         msg_delta: dict = {"stop_reason": "end_turn", "stop_sequence": None}
@@ -581,12 +650,12 @@ async def create(
                             "usage": {"output_tokens": out_tokens},
                         })
                         yield _sse("message_stop", {"type": "message_stop"})
-                        yield "data: [DONE]\n\n"
+                        yield DONE_FRAME
                         success = True
                         logger.info(
                             "messages stream completed: attempt={}/{} model={} text_len={} think_len={} images={}",
                             attempt + 1, max_retries + 1, model,
-                            len(full_text), len(full_think), len(adapter.image_urls),
+                            len(text_count), len(think_count), len(adapter.image_urls),
                         )
 
                 except UpstreamError as exc:
@@ -618,7 +687,7 @@ async def create(
             excluded.append(token)
 
     if stream:
-        return _run_stream()
+        return coalesce(_run_stream(), window) if window else _run_stream()
 
     # -------------------------------------------------------------------------
     # Non-streaming
@@ -646,18 +715,13 @@ async def create(
         try:
             try:
                 ended = False
-                async for line in _stream_chat(
+                async for data in _stream_chat(
                     token     = token,
                     mode_id   = ModeId(selected_mode_id),
                     message   = internal_message,
                     files     = files,
                     timeout_s = timeout_s,
                 ):
-                    event_type, data = classify_line(line)
-                    if event_type == "done":
-                        break
-                    if event_type != "data" or not data:
-                        continue
                     for ev in adapter.feed(data):
                         if ev.kind == "soft_stop":
                             ended = True
@@ -714,10 +778,10 @@ async def create(
 
     full_think = ("".join(adapter.thinking_buf) or "") if emit_think else ""
 
-    in_tokens  = estimate_prompt_tokens(internal_message)
-    out_tokens = estimate_tokens(full_text)
+    in_tokens  = await estimate_prompt_tokens_async(prompt_parts)
+    out_tokens = await estimate_tokens_async(full_text)
     if full_think:
-        out_tokens += estimate_tokens(full_think)
+        out_tokens += await estimate_tokens_async(full_think)
 
     # Check for tool calls
     if tool_names:
@@ -737,7 +801,9 @@ async def create(
                 })
             ct = estimate_tool_call_tokens(tc_result.calls)
             logger.info("messages tool_calls: model={} calls={}", model, len(tc_result.calls))
-            resp = _build_message_response(msg_id, model, content, "tool_use", in_tokens, ct)
+            resp = _build_message_response(
+                msg_id, model, content, "tool_use", in_tokens, ct, fit.trimmed_tokens,
+            )
             # 注入结构化搜索信源（tool_use 场景）
             sources = adapter.search_sources_list()
             if sources:
@@ -753,11 +819,13 @@ async def create(
     anns = adapter.annotations_list()
     if anns:
         content[0]["annotations"] = anns
-    resp = _build_message_response(msg_id, model, content, "end_turn", in_tokens, out_tokens)
+    resp = _build_message_response(
+        msg_id, model, content, "end_turn", in_tokens, out_tokens, fit.trimmed_tokens,
+    )
     sources = adapter.search_sources_list()
     if sources:
         resp["search_sources"] = sources
     return resp
 
 
-__all__ = ["create"]
+__all__ = ["count_tokens", "create"]
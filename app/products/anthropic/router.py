@@ -1,4 +1,4 @@
-"""Anthropic Messages API router (/v1/messages)."""
+"""Anthropic Messages API router (/v1/messages, /v1/messages/count_tokens)."""
 
 from typing import Any
 
@@ -49,6 +49,17 @@ class MessagesRequest(BaseModel):
     thinking:    Any = None          # {type:"enabled", budget_tokens:N} — used to enable thinking output
 
 
+class CountTokensRequest(BaseModel):
+    model_config = {"extra": "ignore"}
+
+    model:       str
+    messages:    list[_Message]
+    system:      Any = None
+    tools:       list[dict] | None = None
+    tool_choice: Any = None
+    thinking:    Any = None          # accepted; does not change the input count
+
+
 # ---------------------------------------------------------------------------
 # SSE error wrapper
 # ---------------------------------------------------------------------------
@@ -76,21 +87,24 @@ async def _safe_sse_anthropic(stream):
 # /v1/messages
 # ---------------------------------------------------------------------------
 
-@router.post("/messages", tags=[_TAG_MESSAGES])
-async def messages_endpoint(req: MessagesRequest):
-    from app.platform.config.snapshot import get_config
-
-    # Model validation
-    spec = model_registry.get(req.model)
+def _validate_request(model: str, messages: list[_Message]) -> None:
+    spec = model_registry.get(model)
     if spec is None or not spec.enabled:
         raise ValidationError(
-            f"Model {req.model!r} does not exist or you do not have access to it.",
+            f"Model {model!r} does not exist or you do not have access to it.",
             param="model", code="model_not_found",
         )
 
-    if not req.messages:
+    if not messages:
         raise ValidationError("messages cannot be empty", param="messages")
 
+
+@router.post("/messages", tags=[_TAG_MESSAGES])
+async def messages_endpoint(req: MessagesRequest):
+    from app.platform.config.snapshot import get_config
+
+    _validate_request(req.model, req.messages)
+
     cfg       = get_config()
     is_stream = req.stream if req.stream is not None else cfg.get_bool("features.stream", True)
 
@@ -125,4 +139,22 @@ async def messages_endpoint(req: MessagesRequest):
     )
 
 
+# ---------------------------------------------------------------------------
+# /v1/messages/count_tokens
+# ---------------------------------------------------------------------------
+
+@router.post("/messages/count_tokens", tags=[_TAG_MESSAGES])
+async def count_tokens_endpoint(req: CountTokensRequest):
+    _validate_request(req.model, req.messages)
+
+    from .messages import count_tokens
+    result = await count_tokens(
+        messages    = [m.model_dump() for m in req.messages],
+        system      = req.system,
+        tools       = req.tools or None,
+        tool_choice = req.tool_choice,
+    )
+    return JSONResponse(result)
+
+
 __all__ = ["router"]
@@ -0,0 +1,109 @@
+"""Upstream conversation affinity for multi-turn chat completions.
+
+Chat clients resend the whole history on every turn.  After a successful
+turn we record which account and upstream conversation produced it, keyed by
+a digest of the history *including* our reply.  When the next request's
+history up to its last assistant message hashes to a recorded key, the turn
+is posted to that conversation as a follow-up and only the messages after
+the assistant reply are sent.
+
+Any mismatch — edited history, different tools, expired record, account not
+selectable, upstream refusing the follow-up — falls back to replaying the
+full history in a new conversation.  Records live in the shared state store
+so every worker sees them.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import orjson
+
+from app.platform.config.snapshot import get_config
+from app.platform.logging.logger import logger
+from app.platform.state import get_state_store, put_state
+
+_NAMESPACE = "chat_affinity"
+_SEP = b"\x1e"
+
+
+@dataclass(slots=True, frozen=True)
+class Affinity:
+    """Where a conversation history lives upstream."""
+
+    token: str
+    conversation_id: str
+    response_id: str
+
+
+def continuation_enabled() -> bool:
+    return get_config().get_bool("chat.continuation", True)
+
+
+def scope_digest(tools: list[dict] | None, tool_choice: Any) -> bytes:
+    """Digest of request settings that are baked into the first upstream turn.
+
+    The tool prompt is injected only when a conversation starts, so a
+    conversation can be continued only with the same tools and tool_choice.
+    """
+    raw = orjson.dumps([tools or [], tool_choice], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def history_key(scope: bytes, parts: Iterable[str]) -> str:
+    """Hash canonical per-message strings into an affinity key."""
+    h = hashlib.blake2b(scope, digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8", "surrogatepass"))
+        h.update(_SEP)
+    return h.hexdigest()
+
+
+def split_point(messages: list[dict]) -> int:
+    """Index just past the last assistant message (0 when there is none)."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "assistant":
+            return i + 1
+    return 0
+
+
+async def lookup(key: str) -> Affinity | None:
+    """Return the recorded upstream location for *key*; errors read as a miss."""
+    try:
+        store = await get_state_store()
+        doc = await store.get(_NAMESPACE, key)
+    except Exception as exc:
+        logger.warning("chat affinity read failed: error={}", exc)
+        return None
+    if not doc:
+        return None
+    try:
+        return Affinity(doc["token"], doc["conversation_id"], doc["response_id"])
+    except (KeyError, TypeError):
+        return None
+
+
+async def remember(key: str, affinity: Affinity) -> None:
+    """Record *affinity* under *key*; failures are logged, never raised."""
+    ttl_s = max(60, get_config().get_int("chat.continuation_ttl_sec", 3600))
+    doc = {
+        "token": affinity.token,
+        "conversation_id": affinity.conversation_id,
+        "response_id": affinity.response_id,
+    }
+    try:
+        await put_state(_NAMESPACE, key, doc, expires_at=time.time() + ttl_s)
+    except Exception as exc:
+        logger.warning("chat affinity write failed: error={}", exc)
+
+
+__all__ = [
+    "Affinity",
+    "continuation_enabled",
+    "history_key",
+    "lookup",
+    "remember",
+    "scope_digest",
+    "split_point",
+]
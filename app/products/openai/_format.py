@@ -9,8 +9,8 @@ import os
 import time
 from typing import Any
 
-import orjson
 from app.platform.tokens import estimate_prompt_tokens, estimate_tokens, estimate_tool_call_tokens
+from app.products._sse import sse_frame
 
 
 # ---------------------------------------------------------------------------
@@ -21,11 +21,17 @@ def make_response_id() -> str:
     return f"chatcmpl-{int(time.time() * 1000)}{os.urandom(4).hex()}"
 
 
-def build_usage(prompt_tokens: int, completion_tokens: int, *, reasoning_tokens: int = 0) -> dict:
+def build_usage(
+    prompt_tokens: int,
+    completion_tokens: int,
+    *,
+    reasoning_tokens: int = 0,
+    trimmed_tokens: int = 0,
+) -> dict:
     pt = max(0, prompt_tokens)
     ct = max(0, completion_tokens)
     rt = max(0, reasoning_tokens)
-    return {
+    usage = {
         "prompt_tokens":     pt,
         "completion_tokens": ct,
         "total_tokens":      pt + ct,
@@ -37,6 +43,10 @@ def build_usage(prompt_tokens: int, completion_tokens: int, *, reasoning_tokens:
             "text_tokens": ct - rt, "audio_tokens": 0, "reasoning_tokens": rt,
         },
     }
+    if trimmed_tokens > 0:
+        # 超出上下文窗口时被裁剪、未发送到上游的历史 token 数
+        usage["prompt_tokens_details"]["trimmed_tokens"] = trimmed_tokens
+    return usage
 
 
 def make_stream_chunk(
@@ -73,6 +83,18 @@ def make_stream_chunk(
     return chunk
 
 
+def make_usage_chunk(response_id: str, model: str, usage: dict) -> dict:
+    """Trailing chunk for ``stream_options.include_usage`` (empty choices)."""
+    return {
+        "id":      response_id,
+        "object":  "chat.completion.chunk",
+        "created": int(time.time()),
+        "model":   model,
+        "choices": [],
+        "usage":   usage,
+    }
+
+
 def make_thinking_chunk(
     response_id: str,
     model:       str,
@@ -106,10 +128,11 @@ def make_chat_response(
     annotations:       list[dict] | None = None,
 ) -> dict:
     rid = response_id or make_response_id()
-    pt  = estimate_prompt_tokens(prompt_content)
-    ct  = estimate_tokens(content)
-    rt  = estimate_tokens(reasoning_content) if reasoning_content else 0
-    ct += rt
+    if usage is None:
+        pt  = estimate_prompt_tokens(prompt_content)
+        ct  = estimate_tokens(content)
+        rt  = estimate_tokens(reasoning_content) if reasoning_content else 0
+        usage = build_usage(pt, ct + rt, reasoning_tokens=rt)
 
     msg: dict = {"role": "assistant", "content": content}
     if reasoning_content:
@@ -126,7 +149,7 @@ def make_chat_response(
             "message":       msg,
             "finish_reason": "stop",
         }],
-        "usage": usage or build_usage(pt, ct, reasoning_tokens=rt),
+        "usage": usage,
     }
     # search_sources 放在响应根对象（避免 Vercel AI SDK 的 message strict schema 拒绝未知字段）
     if search_sources:
@@ -143,13 +166,22 @@ def make_resp_id(prefix: str) -> str:
     return f"{prefix}_{int(time.time() * 1000)}{os.urandom(4).hex()}"
 
 
-def build_resp_usage(input_tokens: int, output_tokens: int, reasoning_tokens: int = 0) -> dict:
-    return {
+def build_resp_usage(
+    input_tokens: int,
+    output_tokens: int,
+    reasoning_tokens: int = 0,
+    *,
+    trimmed_tokens: int = 0,
+) -> dict:
+    usage = {
         "input_tokens":  max(0, input_tokens),
         "output_tokens": max(0, output_tokens),
         "total_tokens":  max(0, input_tokens + output_tokens),
         "output_tokens_details": {"reasoning_tokens": max(0, reasoning_tokens)},
     }
+    if trimmed_tokens > 0:
+        usage["input_tokens_details"] = {"trimmed_tokens": trimmed_tokens}
+    return usage
 
 
 def make_resp_object(
@@ -172,9 +204,9 @@ def make_resp_object(
     return obj
 
 
-def format_sse(event: str, data: dict) -> str:
+def format_sse(event: str, data: dict) -> bytes:
     """Encode a single Responses API SSE event frame."""
-    return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+    return sse_frame(data, event)
 
 
 # ---------------------------------------------------------------------------
@@ -271,8 +303,10 @@ def make_tool_call_response(
         for tc in tool_calls
         if isinstance(tc, ParsedToolCall)
     ]
-    ct = estimate_tool_call_tokens(tool_calls)
-    pt = estimate_prompt_tokens(prompt_content)
+    if usage is None:
+        usage = build_usage(
+            estimate_prompt_tokens(prompt_content), estimate_tool_call_tokens(tool_calls)
+        )
     return {
         "id":      rid,
         "object":  "chat.completion",
@@ -287,14 +321,14 @@ def make_tool_call_response(
             },
             "finish_reason": "tool_calls",
         }],
-        "usage": usage or build_usage(pt, ct),
+        "usage": usage,
     }
 
 
 __all__ = [
     # chat completions
     "make_response_id", "build_usage",
-    "make_stream_chunk", "make_thinking_chunk", "make_chat_response",
+    "make_stream_chunk", "make_usage_chunk", "make_thinking_chunk", "make_chat_response",
     # tool calls
     "make_tool_call_chunk", "make_tool_call_done_chunk", "make_tool_call_response",
     # responses api
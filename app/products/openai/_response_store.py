@@ -0,0 +1,119 @@
+"""Server-side Responses API state for ``previous_response_id``.
+
+Every stored response keeps only its own turn: the input items the client
+sent, the output items we produced and a link to the previous response.
+Rehydrating a conversation walks that chain (at most
+``responses.max_chain`` links) in the shared state store, so any worker can
+continue a conversation another worker started.
+
+Stored turns never change after they are written, so decoded turns are also
+kept in a small per-process LRU — a long agent session re-reads only the
+newest turn on each call.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.platform.config.snapshot import get_config
+from app.platform.errors import ValidationError
+from app.platform.logging.logger import logger
+from app.platform.state import get_state_store, put_state
+
+_NAMESPACE = "response"
+_LRU_MAX = 1024
+
+_turns: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+
+def store_enabled(store: bool | None) -> bool:
+    """Resolve the request's ``store`` flag (``None`` = ``responses.store``)."""
+    if store is not None:
+        return store
+    return get_config().get_bool("responses.store", True)
+
+
+def input_items(input_val: str | list) -> list[dict]:
+    """Normalise request ``input`` to a list of Responses input items."""
+    if isinstance(input_val, str):
+        return [{"type": "message", "role": "user", "content": input_val}]
+    return [item for item in input_val if isinstance(item, dict)]
+
+
+def _remember(response_id: str, turn: dict[str, Any]) -> None:
+    _turns[response_id] = turn
+    _turns.move_to_end(response_id)
+    while len(_turns) > _LRU_MAX:
+        _turns.popitem(last=False)
+
+
+async def _load_turn(response_id: str) -> dict[str, Any] | None:
+    turn = _turns.get(response_id)
+    if turn is not None:
+        if turn["expires_at"] > time.time():
+            _turns.move_to_end(response_id)
+            return turn
+        del _turns[response_id]
+    store = await get_state_store()
+    turn = await store.get(_NAMESPACE, response_id)
+    if turn is not None:
+        _remember(response_id, turn)
+    return turn
+
+
+async def load_history(previous_response_id: str) -> list[dict]:
+    """Return the input + output items of every turn up to *previous_response_id*.
+
+    Raises :class:`ValidationError` when the response is unknown or expired.
+    The walk stops after ``responses.max_chain`` turns; older turns drop out
+    of the rehydrated context.
+    """
+    max_chain = max(1, get_config().get_int("responses.max_chain", 100))
+    chain: list[dict[str, Any]] = []
+    next_id: str | None = previous_response_id
+    while next_id and len(chain) < max_chain:
+        turn = await _load_turn(next_id)
+        if turn is None:
+            if not chain:
+                raise ValidationError(
+                    f"Previous response with id {previous_response_id!r} not found.",
+                    param="previous_response_id",
+                    code="previous_response_not_found",
+                )
+            logger.debug("responses chain truncated: missing_id={}", next_id)
+            break
+        chain.append(turn)
+        next_id = turn.get("previous_response_id")
+
+    items: list[dict] = []
+    for turn in reversed(chain):
+        items.extend(turn["input"])
+        items.extend(turn["output"])
+    return items
+
+
+async def save_turn(
+    response_id: str,
+    *,
+    previous_response_id: str | None,
+    input_items: list[dict],
+    output: list[dict],
+) -> None:
+    """Persist one turn; failures are logged, never raised."""
+    ttl_s = max(60, get_config().get_int("responses.store_ttl_sec", 86400))
+    expires_at = time.time() + ttl_s
+    turn = {
+        "previous_response_id": previous_response_id,
+        "input": input_items,
+        "output": output,
+        "expires_at": expires_at,
+    }
+    try:
+        await put_state(_NAMESPACE, response_id, turn, expires_at=expires_at)
+    except Exception as exc:
+        logger.warning("responses state write failed: response_id={} error={}", response_id, exc)
+        return
+    _remember(response_id, turn)
+
+
+__all__ = ["input_items", "load_history", "save_turn", "store_enabled"]
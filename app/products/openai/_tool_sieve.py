@@ -4,28 +4,46 @@ Sits between the raw SSE text stream and the response formatter.
 Accumulates chunks, detects when the model starts emitting a <tool_calls>
 XML block, buffers the entire block, then parses it once complete.
 
+Each character is scanned once: plain text is forwarded as soon as it cannot
+be part of an opening tag, and while capturing only the new chunk plus a
+short look-behind (a possible partial closing tag) is searched, so a
+multi-megabyte argument streamed in small chunks costs linear time.
+
 Usage pattern (streaming path in chat.py):
 
-    sieve = ToolSieve(tool_names)
+    sieve = ToolSieve(tool_names, stream_args=True)
     async for text_chunk in model_stream:
         safe_text, tool_calls = sieve.feed(text_chunk)
         if safe_text:
             yield make_stream_chunk(safe_text)
-        if tool_calls:
-            yield make_tool_call_chunk(tool_calls)
+        for delta in sieve.drain_deltas():
+            yield make_tool_call_chunk(delta)   # start / arguments piece
+        if tool_calls is not None:
+            yield make_tool_call_done_chunk()
             break   # nothing more to send
 
     # After the stream ends, flush any remaining buffer
     tool_calls = sieve.flush()
-    if tool_calls:
-        yield make_tool_call_chunk(tool_calls)
+    ...same delta draining...
+
+With ``stream_args=True`` the captured block is also fed to a
+:class:`StreamingToolCallParser`, so a call's name and argument JSON reach
+the client while the model is still generating them; every call — including
+ones recovered by the batch parser from non-canonical output — is reported
+through :meth:`ToolSieve.drain_deltas`.  Without it, calls are only returned
+whole from :meth:`feed` / :meth:`flush`.
 """
 
 from __future__ import annotations
 
 import re
 
-from app.dataplane.reverse.protocol.tool_parser import ParsedToolCall, parse_tool_calls
+from app.dataplane.reverse.protocol.tool_parser import (
+    ParsedToolCall,
+    StreamingToolCallParser,
+    ToolCallDelta,
+    parse_tool_calls,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -37,6 +55,12 @@ from app.dataplane.reverse.protocol.tool_parser import ParsedToolCall, parse_too
 _OPEN_TAG_RE  = re.compile(r"<tool_calls[\s>]?", re.IGNORECASE)
 _CLOSE_TAG    = "</tool_calls>"
 _CLOSE_TAG_RE = re.compile(r"</tool_calls\s*>", re.IGNORECASE)
+# A string that could still grow into a closing-tag match (the look-behind
+# kept between chunks while capturing).
+_CLOSE_PREFIX_RE = re.compile(
+    r"<(?:/(?:t(?:o(?:o(?:l(?:_(?:c(?:a(?:l(?:l(?:s\s*)?)?)?)?)?)?)?)?)?)?)?",
+    re.IGNORECASE,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -50,11 +74,14 @@ class ToolSieve:
     Call :meth:`flush` once the stream ends to handle any buffered remainder.
     """
 
-    __slots__ = ("_tool_names", "_buf", "_capturing", "_done")
+    __slots__ = ("_tool_names", "_buf", "_parts", "_tail", "_capturing", "_done", "_stream")
 
-    def __init__(self, tool_names: list[str]) -> None:
+    def __init__(self, tool_names: list[str], *, stream_args: bool = False) -> None:
         self._tool_names = tool_names
-        self._buf: str = ""
+        self._stream = StreamingToolCallParser(tool_names) if stream_args else None
+        self._buf: str = ""               # scanning: possible partial open tag
+        self._parts: list[str] = []       # capturing: block text before _tail
+        self._tail: str = ""              # capturing: possible partial close tag
         self._capturing: bool = False
         self._done: bool = False          # already emitted tool calls once
 
@@ -82,15 +109,25 @@ class ToolSieve:
     def flush(self) -> list[ParsedToolCall] | None:
         """Call after the stream ends.  Attempts to parse anything remaining
         in the buffer.  Returns None if no tool-call syntax was present."""
+        if self._capturing:
+            self._commit(self._tail)
+            self._buf = "".join(self._parts)
+            self._parts, self._tail = [], ""
         if self._done or not self._buf:
             return None
         self._done = True
-        result = parse_tool_calls(self._buf, self._tool_names)
-        self._buf = ""
+        text, self._buf = self._buf, ""
+        if self._stream is not None:
+            return self._finish_stream(text)
+        result = parse_tool_calls(text, self._tool_names)
         if result.saw_tool_syntax:
             return result.calls
         return None
 
+    def drain_deltas(self) -> list[ToolCallDelta]:
+        """Tool-call events produced since the last call (``stream_args`` only)."""
+        return self._stream.drain() if self._stream is not None else []
+
     # ------------------------------------------------------------------
     # Internal
     # ------------------------------------------------------------------
@@ -109,32 +146,66 @@ class ToolSieve:
             return safe, None
 
         # Opening tag found → emit everything before it, start capturing.
-        # Then immediately attempt to consume the rest of this chunk as the
-        # capture phase (the closing tag may already be present).
+        # Then immediately consume the rest of this chunk as the capture
+        # phase (the closing tag may already be present).
         safe_part = combined[: m.start()]
-        self._buf = combined[m.start():]
         self._capturing = True
-        cap_safe, calls = self._feed_capturing("")
+        cap_safe, calls = self._feed_capturing(combined[m.start():])
         return safe_part + cap_safe, calls
 
     def _feed_capturing(self, chunk: str) -> tuple[str, list[ParsedToolCall] | None]:
-        """In capture mode — accumulate until closing tag."""
-        self._buf += chunk
+        """In capture mode — accumulate until closing tag.
 
-        close_m = _CLOSE_TAG_RE.search(self._buf)
+        Only ``_tail + chunk`` is searched; ``_tail`` is the shortest suffix
+        that could still be the start of a closing tag.
+        """
+        window = self._tail + chunk
+        close_m = _CLOSE_TAG_RE.search(window)
         if close_m is None:
             # Not complete yet — keep buffering, emit nothing
+            lt = window.rfind("<")
+            if lt != -1 and _CLOSE_PREFIX_RE.fullmatch(window, lt):
+                self._commit(window[:lt])
+                self._tail = window[lt:]
+            else:
+                self._commit(window)
+                self._tail = ""
             return "", None
 
         # Complete block found
-        xml_block = self._buf[: close_m.end()]
-        self._buf = ""
+        self._commit(window[: close_m.end()])
+        xml_block = "".join(self._parts)
+        self._parts, self._tail = [], ""
         self._capturing = False
         self._done = True
 
+        if self._stream is not None:
+            return "", self._finish_stream(xml_block)
         result = parse_tool_calls(xml_block, self._tool_names)
         return "", result.calls if result.saw_tool_syntax else None
 
+    def _commit(self, text: str) -> None:
+        """Append captured *text* to the block (and the streaming parser)."""
+        if not text:
+            return
+        self._parts.append(text)
+        if self._stream is not None:
+            self._stream.feed(text)
+
+    def _finish_stream(self, text: str) -> list[ParsedToolCall] | None:
+        stream = self._stream
+        stream.finish()
+        if stream.saw_call:
+            return stream.calls
+        # Non-canonical output — fall back to the batch parser and report the
+        # recovered calls through the same delta channel.
+        result = parse_tool_calls(text, self._tool_names)
+        if not result.saw_tool_syntax:
+            return None
+        for call in result.calls:
+            stream.emit_whole(call)
+        return stream.calls
+
 
 # ---------------------------------------------------------------------------
 # Helper
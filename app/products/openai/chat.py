@@ -3,7 +3,8 @@
 import asyncio
 import base64
 import re
-from typing import Any, AsyncGenerator
+import time
+from typing import Any, AsyncGenerator, Callable, Sequence
 from urllib.parse import urlparse
 
 import orjson
@@ -12,10 +13,12 @@ from app.platform.logging.logger import logger
 from app.platform.config.snapshot import get_config
 from app.platform.errors import RateLimitError, UpstreamError, ValidationError
 from app.platform.runtime.clock import now_s
+from app.platform.runtime.memo import PrefixMemo
 from app.platform.storage import save_local_image
 from app.platform.tokens import (
-    estimate_prompt_tokens,
-    estimate_tokens,
+    TokenCounter,
+    estimate_prompt_tokens_async,
+    estimate_tokens_async,
     estimate_tool_call_tokens,
 )
 from app.control.account.runtime import get_refresh_service
@@ -23,6 +26,7 @@ from app.control.account.invalid_credentials import feedback_kind_for_error
 from app.control.model.registry import resolve as resolve_model
 from app.control.model.enums import ModeId
 from app.control.account.enums import FeedbackKind
+from app.control.proxy.models import ProxyFeedback, ProxyFeedbackKind
 from app.dataplane.account.selector import current_strategy
 from app.dataplane.proxy.adapters.headers import build_http_headers
 from app.dataplane.proxy import get_proxy_runtime
@@ -32,22 +36,24 @@ from app.dataplane.proxy.adapters.session import (
 )
 from app.dataplane.reverse.protocol.xai_chat import (
     build_chat_payload,
-    classify_line,
     StreamAdapter,
 )
 from app.dataplane.reverse.protocol.xai_usage import is_invalid_credentials_error
-from app.dataplane.reverse.runtime.endpoint_table import CHAT
+from app.dataplane.reverse.runtime.endpoint_table import CHAT, CHAT_CONTINUE
+from app.dataplane.reverse.transport._proxy_feedback import response_feedback
 from app.dataplane.reverse.transport.asset_upload import upload_from_input
+from app.dataplane.reverse.transport.sse import iter_frames
 from app.dataplane.reverse.protocol.tool_prompt import (
     build_tool_system_prompt,
     extract_tool_names,
     inject_into_message,
     tool_calls_to_xml,
 )
-from app.dataplane.reverse.protocol.tool_parser import parse_tool_calls
+from app.dataplane.reverse.protocol.tool_parser import ToolCallDelta, parse_tool_calls
 from ._format import (
     make_response_id,
     make_stream_chunk,
+    make_usage_chunk,
     make_thinking_chunk,
     make_chat_response,
     make_tool_call_chunk,
@@ -56,7 +62,19 @@ from ._format import (
     build_usage,
 )
 from ._tool_sieve import ToolSieve
+from ._conversation import (
+    Affinity,
+    continuation_enabled,
+    history_key,
+    lookup as lookup_affinity,
+    remember as remember_affinity,
+    scope_digest,
+    split_point,
+)
 from app.products._account_selection import reserve_account, selection_max_retries
+from app.products._coalesce import Delta, coalesce, coalesce_window
+from app.products._context import fit_context
+from app.products._sse import DONE_FRAME, SLOT, FrameTemplate, sse_frame
 
 
 def _to_chat_annotations(anns: list[dict]) -> list[dict]:
@@ -79,6 +97,25 @@ def _to_chat_annotations(anns: list[dict]) -> list[dict]:
     )
 
 
+def _tool_delta_chunks(
+    response_id: str, model: str, deltas: list[ToolCallDelta], first_index: int
+) -> list[dict]:
+    """tool_calls chunks for the calls the sieve finished, numbered from *first_index*.
+
+    A chunk cannot be taken back, and ``end`` may carry repaired arguments
+    that differ from the streamed ``args`` pieces, so each call is sent whole
+    on its ``end``; ``start`` / ``args`` / ``drop`` produce nothing.
+    """
+    chunks: list[dict] = []
+    for d in deltas:
+        if d.kind == "end":
+            chunks.append(make_tool_call_chunk(
+                response_id, model, first_index + len(chunks), d.call_id, d.name,
+                d.arguments, is_first=True,
+            ))
+    return chunks
+
+
 def _log_task_exception(task: "asyncio.Task") -> None:
     """Done-callback: log exceptions from fire-and-forget tasks."""
     exc = task.exception() if not task.cancelled() else None
@@ -298,71 +335,175 @@ def _strip_generated_artifacts(text: str, *, strip_sources: bool = False) -> str
     return text.strip()
 
 
-def _extract_message(messages: list[dict]) -> tuple[str, list[str]]:
-    """Flatten OpenAI messages into a single prompt string + file attachments."""
+# Flattened history reused across turns: agent loops resend the same messages
+# with a few new ones appended, so only that tail is flattened again.
+_FLATTEN_MEMO = PrefixMemo(32 * 1024 * 1024)
+_FLATTEN_MEMO_MIN_MESSAGES = 4
+
+
+def _flatten_message(msg: dict) -> tuple[list[str], list[str]]:
+    """Flatten one OpenAI message into prompt parts + file attachments."""
     parts: list[str] = []
     files: list[str] = []
 
-    for msg in messages:
-        role = msg.get("role", "user")
-        content = msg.get("content") or ""
-        tool_calls = msg.get("tool_calls")
+    role = msg.get("role", "user")
+    content = msg.get("content") or ""
+    tool_calls = msg.get("tool_calls")
 
-        # ── role=tool: tool execution result ─────────────────────────────────
-        if role == "tool":
-            tool_call_id = msg.get("tool_call_id", "")
-            label = (
-                f"[tool result for {tool_call_id}]" if tool_call_id else "[tool result]"
-            )
-            text = content.strip() if isinstance(content, str) else ""
-            if text:
-                parts.append(f"{label}:\n{text}")
-            continue
+    # ── role=tool: tool execution result ─────────────────────────────────
+    if role == "tool":
+        tool_call_id = msg.get("tool_call_id", "")
+        label = (
+            f"[tool result for {tool_call_id}]" if tool_call_id else "[tool result]"
+        )
+        text = content.strip() if isinstance(content, str) else ""
+        if text:
+            parts.append(f"{label}:\n{text}")
+        return parts, files
+
+    # ── role=assistant with tool_calls: reconstruct as XML ────────────────
+    if role == "assistant" and tool_calls:
+        xml = tool_calls_to_xml(tool_calls)
+        # Prepend any accompanying text content (rare but valid)
+        text = content.strip() if isinstance(content, str) else ""
+        if text:
+            parts.append(f"[assistant]: {text}\n{xml}")
+        else:
+            parts.append(f"[assistant]:\n{xml}")
+        return parts, files
+
+    # ── 剥离前轮 assistant 消息中 grok2api 注入的 Sources 段落 ────────────
+    if role == "assistant" and isinstance(content, str):
+        content = _strip_generated_artifacts(content, strip_sources=True)
+
+    # ── normal content handling ───────────────────────────────────────────
+    if isinstance(content, str):
+        cleaned = _strip_generated_artifacts(content.strip())
+        if cleaned:
+            parts.append(f"[{role}]: {cleaned}")
+    elif isinstance(content, list):
+        for block in content:
+            if not isinstance(block, dict):
+                continue
+            btype = block.get("type")
+            if btype == "text":
+                text = block.get("text") or ""
+                text = _strip_generated_artifacts(
+                    text.strip(),
+                    strip_sources=(role == "assistant"),
+                )
+                if text:
+                    parts.append(f"[{role}]: {text}")
+            elif btype == "image_url":
+                url = (block.get("image_url") or {}).get("url", "")
+                if url:
+                    files.append(url)
+            elif btype in ("input_audio", "file"):
+                inner = block.get(btype) or {}
+                data = inner.get("data") or inner.get("file_data", "")
+                if data:
+                    files.append(data)
+
+    return parts, files
+
+
+def _extract_each(messages: list[dict]) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """Flatten each message to ``(text, files)``, reusing the previous turn's work."""
+    raw = None
+    if len(messages) >= _FLATTEN_MEMO_MIN_MESSAGES:
+        try:
+            raw = orjson.dumps(messages)
+        except TypeError:
+            pass
+    done: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    done_bytes = 0
+    if raw is not None:
+        hit = _FLATTEN_MEMO.lookup(raw)
+        if hit is not None:
+            _, (done, done_bytes) = hit
+
+    tail: list[tuple[str, tuple[str, ...]]] = []
+    for msg in messages[len(done):]:
+        parts, files = _flatten_message(msg)
+        tail.append(("\n\n".join(parts), tuple(files)))
+        done_bytes += sum(map(len, parts)) + sum(map(len, files)) + 64
+    if not tail:
+        return done
+    extracted = done + tuple(tail)
+    if raw is not None:
+        _FLATTEN_MEMO.store(raw, len(extracted), (extracted, done_bytes), done_bytes)
+    return extracted
 
-        # ── role=assistant with tool_calls: reconstruct as XML ────────────────
-        if role == "assistant" and tool_calls:
-            xml = tool_calls_to_xml(tool_calls)
-            # Prepend any accompanying text content (rare but valid)
-            text = content.strip() if isinstance(content, str) else ""
-            if text:
-                parts.append(f"[assistant]: {text}\n{xml}")
-            else:
-                parts.append(f"[assistant]:\n{xml}")
-            continue
 
-        # ── 剥离前轮 assistant 消息中 grok2api 注入的 Sources 段落 ────────────
-        if role == "assistant" and isinstance(content, str):
-            content = _strip_generated_artifacts(content, strip_sources=True)
-
-        # ── normal content handling ───────────────────────────────────────────
-        if isinstance(content, str):
-            cleaned = _strip_generated_artifacts(content.strip())
-            if cleaned:
-                parts.append(f"[{role}]: {cleaned}")
-        elif isinstance(content, list):
-            for block in content:
-                if not isinstance(block, dict):
-                    continue
-                btype = block.get("type")
-                if btype == "text":
-                    text = block.get("text") or ""
-                    text = _strip_generated_artifacts(
-                        text.strip(),
-                        strip_sources=(role == "assistant"),
-                    )
-                    if text:
-                        parts.append(f"[{role}]: {text}")
-                elif btype == "image_url":
-                    url = (block.get("image_url") or {}).get("url", "")
-                    if url:
-                        files.append(url)
-                elif btype in ("input_audio", "file"):
-                    inner = block.get(btype) or {}
-                    data = inner.get("data") or inner.get("file_data", "")
-                    if data:
-                        files.append(data)
+def _extract_message(messages: list[dict]) -> tuple[str, list[str]]:
+    """Flatten OpenAI messages into a single prompt string + file attachments."""
+    return _join_extracted(_extract_each(messages))
+
+
+def _join_extracted(extracted: Sequence[tuple[str, Sequence[str]]]) -> tuple[str, list[str]]:
+    """Combine per-message :func:`_extract_each` results into one prompt."""
+    return (
+        "\n\n".join(text for text, _ in extracted if text),
+        [f for _, fs in extracted for f in fs],
+    )
+
 
-    return "\n\n".join(parts), files
+def _canonical_part(text: str, files: list[str]) -> str:
+    """Per-message string hashed into conversation affinity keys."""
+    return "\x1f".join((text, *files)) if files else text
+
+
+def _assistant_part(text: str, calls: list | None = None) -> str:
+    """Canonical part for our own reply, as the client will echo it back."""
+    msg: dict[str, Any] = {"role": "assistant", "content": text}
+    if calls:
+        msg["tool_calls"] = [
+            {"function": {"name": c.name, "arguments": c.arguments}} for c in calls
+        ]
+    return _canonical_part(*_extract_message([msg]))
+
+
+def _remember_turn(
+    scope: bytes,
+    history_parts: list[str],
+    reply_part: str,
+    token: str,
+    adapter: StreamAdapter,
+    sticky: Affinity | None,
+) -> None:
+    """Fire-and-forget: record where this history now lives upstream."""
+    conversation_id = adapter.conversation_id or (sticky.conversation_id if sticky else "")
+    if not conversation_id or not adapter.response_id:
+        return
+    key = history_key(scope, [*history_parts, reply_part])
+    asyncio.create_task(
+        remember_affinity(key, Affinity(token, conversation_id, adapter.response_id))
+    ).add_done_callback(_log_task_exception)
+
+
+class _StreamUsage:
+    """Usage of one streamed attempt, counted as the deltas go out."""
+
+    __slots__ = ("prompt_tokens", "trimmed_tokens", "text", "thinking", "call_tokens")
+
+    def __init__(self, prompt_tokens: int, trimmed_tokens: int) -> None:
+        self.prompt_tokens = prompt_tokens
+        self.trimmed_tokens = trimmed_tokens
+        self.text = TokenCounter()
+        self.thinking = TokenCounter()
+        self.call_tokens = 0
+
+    def add_calls(self, calls: list) -> None:
+        self.call_tokens += estimate_tool_call_tokens(calls)
+
+    def snapshot(self) -> dict:
+        rt = self.thinking.total
+        return build_usage(
+            self.prompt_tokens,
+            self.text.total + self.call_tokens + rt,
+            reasoning_tokens=rt,
+            trimmed_tokens=self.trimmed_tokens,
+        )
 
 
 async def _prepare_file_attachments(token: str, file_inputs: list[str]) -> list[str]:
@@ -387,65 +528,86 @@ async def _stream_chat(
     model_config_override: dict | None = None,
     request_overrides: dict | None = None,
     timeout_s: float = 120.0,
-) -> AsyncGenerator[str, None]:
-    """Yield raw SSE lines from the Grok app-chat endpoint."""
+    conversation_id: str | None = None,
+    parent_response_id: str | None = None,
+) -> AsyncGenerator[bytes, None]:
+    """Yield JSON frame payloads (bytes) from the Grok app-chat endpoint.
+
+    With ``conversation_id`` the message is posted as a follow-up to that
+    upstream conversation (after ``parent_response_id``) instead of opening
+    a new one.
+    """
+    url = CHAT_CONTINUE.format(conversation_id=conversation_id) if conversation_id else CHAT
     proxy = await get_proxy_runtime()
     lease = await proxy.acquire(account_id=token)
-    attachments = await _prepare_file_attachments(token, files)
-
-    payload = build_chat_payload(
-        message=message,
-        mode_id=mode_id,
-        file_attachments=attachments,
-        tool_overrides=tool_overrides,
-        model_config_override=model_config_override,
-        request_overrides=request_overrides,
-    )
-    payload_bytes = orjson.dumps(payload)
-
-    headers = await build_http_headers(
-        token,
-        content_type="application/json",
-        origin="https://grok.com",
-        referer="https://grok.com/",
-        lease=lease,
-        url=CHAT,
-        method="POST",
-    )
-    session_kwargs = build_session_kwargs(lease=lease)
-
-    async with ResettableSession(**session_kwargs) as session:
-        try:
-            response = await session.post(
-                CHAT,
-                headers=headers,
-                data=payload_bytes,
-                timeout=timeout_s,
-                stream=True,
-            )
-        except Exception as exc:
-            raise _transport_upstream_error(
-                exc, context="Chat transport failed"
-            ) from exc
+    proxy_fb: ProxyFeedback | None = None
+    try:
+        attachments = await _prepare_file_attachments(token, files)
+
+        payload = build_chat_payload(
+            message=message,
+            mode_id=mode_id,
+            file_attachments=attachments,
+            tool_overrides=tool_overrides,
+            model_config_override=model_config_override,
+            request_overrides=request_overrides,
+            parent_response_id=parent_response_id if conversation_id else None,
+        )
+        payload_bytes = orjson.dumps(payload)
+
+        headers = await build_http_headers(
+            token,
+            content_type="application/json",
+            origin="https://grok.com",
+            referer="https://grok.com/",
+            lease=lease,
+            url=url,
+            method="POST",
+        )
+        session_kwargs = build_session_kwargs(lease=lease)
 
-        if response.status_code != 200:
+        async with ResettableSession(**session_kwargs) as session:
+            started = time.monotonic()
             try:
-                body = response.content.decode("utf-8", "replace")[:400]
-            except Exception:
-                body = ""
-            raise UpstreamError(
-                f"Chat upstream returned {response.status_code}",
-                status=response.status_code,
-                body=body,
-            )
+                response = await session.post(
+                    url,
+                    headers=headers,
+                    data=payload_bytes,
+                    timeout=timeout_s,
+                    stream=True,
+                )
+            except Exception as exc:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise _transport_upstream_error(
+                    exc, context="Chat transport failed"
+                ) from exc
+
+            proxy_fb = response_feedback(response.status_code, started)
+            if response.status_code != 200:
+                try:
+                    body = response.content.decode("utf-8", "replace")[:400]
+                except Exception:
+                    body = ""
+                raise UpstreamError(
+                    f"Chat upstream returned {response.status_code}",
+                    status=response.status_code,
+                    body=body,
+                )
 
-        try:
-            async for line in response.aiter_lines():
-                yield line
-        except Exception as exc:
-            raise _transport_upstream_error(
-                exc, context="Chat stream read failed"
-            ) from exc
+            try:
+                async for frame in iter_frames(response.aiter_content()):
+                    yield frame
+            except Exception as exc:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise _transport_upstream_error(
+                    exc, context="Chat stream read failed"
+                ) from exc
+    finally:
+        # Reported once the body ends so the node keeps the inflight slot.
+        if proxy_fb is None:
+            await proxy.release(lease)
+        else:
+            await proxy.feedback(lease, proxy_fb)
 
 
 async def completions(
@@ -459,12 +621,18 @@ async def completions(
     temperature: float = 0.8,
     top_p: float = 0.95,
     request_overrides: dict | None = None,
-) -> dict | AsyncGenerator[str, None]:
+    include_usage: bool = False,
+    continuous_usage: bool = False,
+) -> dict | AsyncGenerator[bytes, None]:
     """Entry point for /v1/chat/completions.
 
     Returns an async generator for streaming, or a dict for non-streaming.
     Supports transparent retry with a different account on configured HTTP
     status codes (chat.retry_on_codes) up to chat.max_retries times.
+
+    Streaming honours ``stream_options``: *include_usage* adds a trailing
+    usage chunk before ``[DONE]``; *continuous_usage* puts the running usage
+    on every chunk.
     """
     cfg = get_config()
     spec = resolve_model(model)
@@ -479,9 +647,22 @@ async def completions(
         len(messages),
     )
 
-    message, files = _extract_message(messages)
+    # ── Tool call setup ───────────────────────────────────────────────────────
+    tool_names: list[str] = []
+    tool_prompt = ""
+    if tools:
+        tool_names = extract_tool_names(tools)
+        tool_prompt = build_tool_system_prompt(tools, tool_choice)
+    tool_overrides: dict | None = None
+
+    extracted = _extract_each(messages)
+    fit = await fit_context(messages, extracted, spec, extra_text=tool_prompt, label="chat")
+    message, files = _join_extracted(fit.extracted)
+    prompt_parts = [tool_prompt, *(text for text, _ in fit.extracted)]
     if not message.strip():
         raise UpstreamError("Empty message after extraction", status=400)
+    if tool_prompt:
+        message = inject_into_message(message, tool_prompt)
 
     from app.dataplane.account import _directory as _acct_dir
 
@@ -494,55 +675,117 @@ async def completions(
     response_id = make_response_id()
     timeout_s = cfg.get_float("chat.timeout", 120.0)
 
-    # ── Tool call setup ───────────────────────────────────────────────────────
-    tool_names: list[str] = []
-    if tools:
-        tool_names = extract_tool_names(tools)
-        tool_prompt = build_tool_system_prompt(tools, tool_choice)
-        message = inject_into_message(message, tool_prompt)
-    tool_overrides: dict | None = None
+    # ── Upstream conversation continuation ───────────────────────────────────
+    # A hit sends only the messages after the last assistant reply, on the
+    # account that owns the upstream conversation (the tool prompt is already
+    # part of that conversation).  A miss or any failure replays everything.
+    affinity: Affinity | None = None
+    affinity_scope = b""
+    history_parts: list[str] = []
+    delta_message, delta_files = "", []
+    continuation = continuation_enabled()
+    if continuation:
+        affinity_scope = scope_digest(tools, tool_choice)
+        history_parts = [_canonical_part(text, fs) for text, fs in extracted]
+        cut = split_point(messages)
+        if 0 < cut < len(messages):
+            affinity = await lookup_affinity(
+                history_key(affinity_scope, history_parts[:cut])
+            )
+            if affinity is not None:
+                delta_message, delta_files = _join_extracted(extracted[cut:])
+                if not delta_message.strip():
+                    affinity = None
+    last_attempt = max_retries + (1 if affinity is not None else 0)
 
     # ── Streaming path ────────────────────────────────────────────────────────
     if is_stream:
+        window = coalesce_window()
 
-        async def _run_stream() -> AsyncGenerator[str, None]:
+        async def _run_stream() -> AsyncGenerator[bytes | Delta, None]:
             excluded: list[str] = []
-            for attempt in range(max_retries + 1):
+            sticky = affinity
+            limit = last_attempt
+            pt = (
+                await estimate_prompt_tokens_async(prompt_parts)
+                if include_usage or continuous_usage
+                else 0
+            )
+
+            # Content and reasoning deltas are spliced into frames rendered
+            # once per stream; the rarer frames are serialised whole.
+            text_chunk = make_stream_chunk(response_id, model, SLOT)
+            think_chunk = make_thinking_chunk(response_id, model, SLOT)
+            if continuous_usage:
+                text_chunk["usage"] = think_chunk["usage"] = SLOT
+            text_frame = FrameTemplate(text_chunk)
+            think_frame = FrameTemplate(think_chunk)
+
+            def _renderer(template: FrameTemplate) -> Callable[[str], bytes]:
+                if continuous_usage:
+                    return lambda text: template.render(text, usage.snapshot())
+                return template.render
+
+            text_render, think_render = _renderer(text_frame), _renderer(think_frame)
+
+            def _delta(render: Callable[[str], bytes], text: str) -> bytes | Delta:
+                # With a coalescing window the text is rendered when flushed.
+                return Delta(render, text) if window else render(text)
+
+            def _frame(chunk: dict) -> bytes:
+                if continuous_usage:
+                    chunk["usage"] = usage.snapshot()
+                return sse_frame(chunk)
+
+            def _done() -> bytes:
+                if not include_usage:
+                    return DONE_FRAME
+                return sse_frame(make_usage_chunk(response_id, model, usage.snapshot())) + DONE_FRAME
+
+            for attempt in range(last_attempt + 1):
                 acct, selected_mode_id = await reserve_account(
                     directory,
                     spec,
                     now_s_override=now_s(),
                     exclude_tokens=excluded or None,
+                    prefer_token=sticky.token if sticky else None,
                 )
                 if acct is None:
                     raise RateLimitError("No available accounts for this model tier")
 
                 token = acct.token
+                continuing = sticky is not None and token == sticky.token
+                if sticky is not None and not continuing:
+                    sticky, limit = None, max_retries  # owner busy — plain replay
                 success = False
                 _retry = False
+                _exclude = True
                 fail_exc: BaseException | None = None
                 adapter = StreamAdapter()
                 collected_annotations: list[dict] = []
+                reply_parts: list[str] = []
+                usage = _StreamUsage(pt, fit.trimmed_tokens)
+                # Set once the first frame of this attempt reaches the client;
+                # from then on a replay would repeat output it has seen.
+                produced = False
 
                 try:
                     try:
                         ended = False
-                        sieve = ToolSieve(tool_names)
+                        sieve = ToolSieve(tool_names, stream_args=True)
+                        tool_index = 0
                         tool_calls_emitted = False
-                        async for line in _stream_chat(
+                        async for data in _stream_chat(
                             token=token,
                             mode_id=ModeId(selected_mode_id),
-                            message=message,
-                            files=files,
+                            message=delta_message if continuing else message,
+                            files=delta_files if continuing else files,
                             tool_overrides=tool_overrides,
                             request_overrides=request_overrides,
                             timeout_s=timeout_s,
+                            conversation_id=sticky.conversation_id if continuing else None,
+                            parent_response_id=sticky.response_id if continuing else None,
                         ):
-                            event_type, data = classify_line(line)
-                            if event_type == "done":
-                                break
-                            if event_type != "data" or not data:
-                                continue
                             events = adapter.feed(data)
                             for ev in events:
                                 if tool_calls_emitted:
@@ -551,29 +794,32 @@ async def completions(
                                     if tool_names:
                                         safe_text, parsed_calls = sieve.feed(ev.content)
                                         if safe_text:
-                                            chunk = make_stream_chunk(
-                                                response_id, model, safe_text
-                                            )
-                                            yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+                                            reply_parts.append(safe_text)
+                                            usage.text.feed(safe_text)
+                                            produced = True
+                                            yield _delta(text_render, safe_text)
+                                        chunks = _tool_delta_chunks(
+                                            response_id, model, sieve.drain_deltas(), tool_index
+                                        )
+                                        tool_index += len(chunks)
+                                        for chunk in chunks:
+                                            produced = True
+                                            yield _frame(chunk)
                                         if parsed_calls is not None:
-                                            for i, tc in enumerate(parsed_calls):
-                                                chunk = make_tool_call_chunk(
-                                                    response_id,
-                                                    model,
-                                                    i,
-                                                    tc.call_id,
-                                                    tc.name,
-                                                    tc.arguments,
-                                                    is_first=True,
-                                                )
-                                                yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+                                            usage.add_calls(parsed_calls)
                                             done_chunk = make_tool_call_done_chunk(
                                                 response_id, model
                                             )
-                                            yield f"data: {orjson.dumps(done_chunk).decode()}\n\n"
-                                            yield "data: [DONE]\n\n"
+                                            yield _frame(done_chunk)
+                                            yield _done()
                                             tool_calls_emitted = True
                                             success = True
+                                            if continuation:
+                                                _remember_turn(
+                                                    affinity_scope, history_parts,
+                                                    _assistant_part("".join(reply_parts), parsed_calls),
+                                                    token, adapter, sticky if continuing else None,
+                                                )
                                             logger.info(
                                                 "chat stream tool_calls: attempt={}/{} model={} call_count={}",
                                                 attempt + 1,
@@ -584,15 +830,14 @@ async def completions(
                                             ended = True
                                             break  # stop processing remaining events in this batch
                                     else:
-                                        chunk = make_stream_chunk(
-                                            response_id, model, ev.content
-                                        )
-                                        yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+                                        reply_parts.append(ev.content)
+                                        usage.text.feed(ev.content)
+                                        produced = True
+                                        yield _delta(text_render, ev.content)
                                 elif ev.kind == "thinking" and emit_think:
-                                    chunk = make_thinking_chunk(
-                                        response_id, model, ev.content
-                                    )
-                                    yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+                                    usage.thinking.feed(ev.content)
+                                    produced = True
+                                    yield _delta(think_render, ev.content)
                                 elif ev.kind == "annotation" and ev.annotation_data:
                                     collected_annotations.append(ev.annotation_data)
                                 elif ev.kind == "soft_stop":
@@ -604,18 +849,13 @@ async def completions(
                         if not tool_calls_emitted and tool_names:
                             # Stream ended — flush sieve for any buffered XML
                             flushed_calls = sieve.flush()
+                            for chunk in _tool_delta_chunks(
+                                response_id, model, sieve.drain_deltas(), tool_index
+                            ):
+                                produced = True
+                                yield _frame(chunk)
                             if flushed_calls:
-                                for i, tc in enumerate(flushed_calls):
-                                    chunk = make_tool_call_chunk(
-                                        response_id,
-                                        model,
-                                        i,
-                                        tc.call_id,
-                                        tc.name,
-                                        tc.arguments,
-                                        is_first=True,
-                                    )
-                                    yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+                                usage.add_calls(flushed_calls)
                                 done_chunk = make_tool_call_done_chunk(
                                     response_id, model
                                 )
@@ -623,10 +863,16 @@ async def completions(
                                 sources = adapter.search_sources_list()
                                 if sources:
                                     done_chunk["search_sources"] = sources
-                                yield f"data: {orjson.dumps(done_chunk).decode()}\n\n"
-                                yield "data: [DONE]\n\n"
+                                yield _frame(done_chunk)
+                                yield _done()
                                 tool_calls_emitted = True
                                 success = True
+                                if continuation:
+                                    _remember_turn(
+                                        affinity_scope, history_parts,
+                                        _assistant_part("".join(reply_parts), flushed_calls),
+                                        token, adapter, sticky if continuing else None,
+                                    )
                                 logger.info(
                                     "chat stream tool_calls (flushed): model={} call_count={}",
                                     model,
@@ -636,17 +882,17 @@ async def completions(
                         if not tool_calls_emitted:
                             for url, img_id in adapter.image_urls:
                                 img_text = await _resolve_image(token, url, img_id)
-                                chunk = make_stream_chunk(
-                                    response_id, model, img_text + "\n"
-                                )
-                                yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+                                reply_parts.append(img_text + "\n")
+                                usage.text.feed(img_text + "\n")
+                                produced = True
+                                yield _delta(text_render, img_text + "\n")
 
                             references = adapter.references_suffix()
                             if references:
-                                chunk = make_stream_chunk(
-                                    response_id, model, references
-                                )
-                                yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+                                reply_parts.append(references)
+                                usage.text.feed(references)
+                                produced = True
+                                yield _delta(text_render, references)
 
                             chat_anns = _to_chat_annotations(collected_annotations)
                             final = make_stream_chunk(
@@ -660,9 +906,15 @@ async def completions(
                             sources = adapter.search_sources_list()
                             if sources:
                                 final["search_sources"] = sources
-                            yield f"data: {orjson.dumps(final).decode()}\n\n"
-                            yield "data: [DONE]\n\n"
+                            yield _frame(final)
+                            yield _done()
                             success = True
+                            if continuation:
+                                _remember_turn(
+                                    affinity_scope, history_parts,
+                                    _assistant_part("".join(reply_parts)),
+                                    token, adapter, sticky if continuing else None,
+                                )
                             logger.info(
                                 "chat stream completed: attempt={}/{} model={} image_count={}",
                                 attempt + 1,
@@ -673,9 +925,28 @@ async def completions(
 
                     except UpstreamError as exc:
                         fail_exc = exc
-                        if (
+                        if continuing and produced:
+                            # Partial output already sent — a replay would
+                            # repeat it, so end the stream with the error.
+                            logger.warning(
+                                "chat stream continuation failed mid-stream: status={} token={}...",
+                                exc.status,
+                                token[:8],
+                            )
+                            raise
+                        if continuing:
+                            # Follow-up refused — replay the full history next.
+                            sticky = None
+                            _retry = True
+                            _exclude = _should_retry_upstream(exc, retry_codes)
+                            logger.warning(
+                                "chat stream continuation failed, replaying history: status={} token={}...",
+                                exc.status,
+                                token[:8],
+                            )
+                        elif (
                             _should_retry_upstream(exc, retry_codes)
-                            and attempt < max_retries
+                            and attempt < limit
                         ):
                             _retry = True
                             logger.warning(
@@ -719,46 +990,52 @@ async def completions(
 
                 if success or not _retry:
                     return
-                excluded.append(token)
+                if _exclude:
+                    excluded.append(token)
 
-        return _run_stream()
+        return coalesce(_run_stream(), window) if window else _run_stream()
 
     # ── Non-streaming path ────────────────────────────────────────────────────
     excluded: list[str] = []
     token = ""
     adapter = StreamAdapter()
-    for attempt in range(max_retries + 1):
+    sticky = affinity
+    continuing = False
+    limit = last_attempt
+    for attempt in range(last_attempt + 1):
         acct, selected_mode_id = await reserve_account(
             directory,
             spec,
             now_s_override=now_s(),
             exclude_tokens=excluded or None,
+            prefer_token=sticky.token if sticky else None,
         )
         if acct is None:
             raise RateLimitError("No available accounts for this model tier")
 
         token = acct.token
+        continuing = sticky is not None and token == sticky.token
+        if sticky is not None and not continuing:
+            sticky, limit = None, max_retries  # owner busy — plain replay
         success = False
         _retry = False
+        _exclude = True
         fail_exc: BaseException | None = None
         adapter = StreamAdapter()  # fresh adapter per attempt
 
         try:
             try:
-                async for line in _stream_chat(
+                async for data in _stream_chat(
                     token=token,
                     mode_id=ModeId(selected_mode_id),
-                    message=message,
-                    files=files,
+                    message=delta_message if continuing else message,
+                    files=delta_files if continuing else files,
                     tool_overrides=tool_overrides,
                     request_overrides=request_overrides,
                     timeout_s=timeout_s,
+                    conversation_id=sticky.conversation_id if continuing else None,
+                    parent_response_id=sticky.response_id if continuing else None,
                 ):
-                    event_type, data = classify_line(line)
-                    if event_type == "done":
-                        break
-                    if event_type != "data" or not data:
-                        continue
                     ended = False
                     for ev in adapter.feed(data):
                         if ev.kind == "soft_stop":
@@ -770,7 +1047,17 @@ async def completions(
 
             except UpstreamError as exc:
                 fail_exc = exc
-                if _should_retry_upstream(exc, retry_codes) and attempt < max_retries:
+                if continuing:
+                    # Follow-up refused — replay the full history next.
+                    sticky = None
+                    _retry = True
+                    _exclude = _should_retry_upstream(exc, retry_codes)
+                    logger.warning(
+                        "chat continuation failed, replaying history: status={} token={}...",
+                        exc.status,
+                        token[:8],
+                    )
+                elif _should_retry_upstream(exc, retry_codes) and attempt < limit:
                     _retry = True
                     logger.warning(
                         "chat retry scheduled: attempt={}/{} status={} token={}...",
@@ -811,7 +1098,8 @@ async def completions(
 
         if success or not _retry:
             break
-        excluded.append(token)
+        if _exclude:
+            excluded.append(token)
 
     full_text = "".join(adapter.text_buf)
     if adapter.image_urls:
@@ -844,13 +1132,23 @@ async def completions(
                 model,
                 len(parse_result.calls),
             )
-            pt = estimate_prompt_tokens(message)
+            if continuation:
+                _remember_turn(
+                    affinity_scope, history_parts,
+                    _assistant_part("", parse_result.calls),
+                    token, adapter, sticky if continuing else None,
+                )
+            pt = await estimate_prompt_tokens_async(prompt_parts)
             resp = make_tool_call_response(
                 model,
                 parse_result.calls,
                 prompt_content=message,
                 response_id=response_id,
-                usage=build_usage(pt, estimate_tool_call_tokens(parse_result.calls)),
+                usage=build_usage(
+                    pt,
+                    estimate_tool_call_tokens(parse_result.calls),
+                    trimmed_tokens=fit.trimmed_tokens,
+                ),
             )
             # 注入结构化搜索信源（tool_calls 场景）
             sources = adapter.search_sources_list()
@@ -868,9 +1166,14 @@ async def completions(
         len(adapter.image_urls),
     )
 
-    pt = estimate_prompt_tokens(message)
-    ct = estimate_tokens(full_text)
-    rt = estimate_tokens(thinking_text) if thinking_text else 0
+    if continuation:
+        _remember_turn(
+            affinity_scope, history_parts, _assistant_part(full_text),
+            token, adapter, sticky if continuing else None,
+        )
+    pt = await estimate_prompt_tokens_async(prompt_parts)
+    ct = await estimate_tokens_async(full_text)
+    rt = await estimate_tokens_async(thinking_text) if thinking_text else 0
     chat_anns = _to_chat_annotations(adapter.annotations_list())
     return make_chat_response(
         model,
@@ -880,7 +1183,9 @@ async def completions(
         reasoning_content=thinking_text,
         search_sources=adapter.search_sources_list(),
         annotations=chat_anns or None,
-        usage=build_usage(pt, ct + rt, reasoning_tokens=rt),
+        usage=build_usage(
+            pt, ct + rt, reasoning_tokens=rt, trimmed_tokens=fit.trimmed_tokens
+        ),
     )
 
 
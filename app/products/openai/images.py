@@ -16,16 +16,17 @@ from app.platform.logging.logger import logger
 from app.platform.config.snapshot import get_config
 from app.platform.errors import RateLimitError, UpstreamError, ValidationError
 from app.platform.runtime.clock import now_s
+from app.platform.runtime.progress import DEFAULT_KEEPALIVE_S, KEEPALIVE, ProgressChannel
 from app.platform.storage import save_local_image
 from app.control.model.registry import resolve as resolve_model
 from app.control.model.enums import ModeId
 from app.control.model.spec import ModelSpec
 from app.control.account.enums import FeedbackKind
+from app.control.proxy.models import ProxyFeedback, ProxyFeedbackKind
 from app.dataplane.reverse.transport.imagine_ws import stream_images
 from app.dataplane.reverse.protocol.xai_chat import (
     StreamAdapter,
     build_chat_payload,
-    classify_line,
     raise_for_stream_error,
 )
 from app.dataplane.reverse.protocol.xai_assets import infer_content_type, resolve_asset_reference, resolve_download_url
@@ -36,12 +37,14 @@ from app.dataplane.reverse.protocol.xai_image_edit import (
     extract_model_response_urls,
     extract_streaming_response,
 )
+from app.dataplane.reverse.transport._proxy_feedback import response_feedback
 from app.dataplane.reverse.transport.assets import download_asset
 from app.dataplane.reverse.transport.asset_upload import (
     resolve_uploaded_asset_reference,
     upload_from_input,
 )
 from app.dataplane.reverse.transport.media import create_media_post
+from app.dataplane.reverse.transport.sse import iter_frames
 from app.dataplane.proxy import get_proxy_runtime
 from app.dataplane.proxy.adapters.headers import build_http_headers, build_sso_cookie
 from app.dataplane.proxy.adapters.session import ResettableSession, build_session_kwargs
@@ -267,6 +270,190 @@ def _output_content(image: _ImageOutput, *, chat_format: bool) -> str:
 _LITE_IMAGE_MODELS = frozenset({"grok-imagine-image-lite"})
 # WS models that use quality mode (enable_pro=True).
 _PRO_IMAGE_MODELS  = frozenset({"grok-imagine-image-pro"})
+# Images one imagine round produces per mode (speed / quality).
+_ROUND_IMAGES_SPEED = 6
+_ROUND_IMAGES_PRO   = 4
+
+_SHARD_DONE = object()
+
+
+def _shard_sizes(n: int, shards: int) -> list[int]:
+    """Split *n* images as evenly as possible over *shards* accounts."""
+    base, extra = divmod(n, shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def _image_error_exc(ev: dict[str, Any]) -> UpstreamError:
+    """Exception equivalent of a :func:`stream_images` error event."""
+    return UpstreamError(f"Image error: {ev.get('error', '')}")
+
+
+async def _report_image_account(acct_dir: Any, token: str, mode_id: int, exc: BaseException) -> None:
+    """Report an image failure on *token* when it is an auth failure.
+
+    WS image gen has its own upstream rate limiting — skip quota tracking and
+    health feedback, but still propagate auth failures so bad accounts get
+    marked expired.
+    """
+    kind = _feedback_kind(exc)
+    if kind in (FeedbackKind.UNAUTHORIZED, FeedbackKind.FORBIDDEN):
+        await acct_dir.feedback(token, kind, mode_id, now_s_val=now_s())
+
+
+async def _fanout_stream_images(
+    acct_dir: Any,
+    spec: ModelSpec,
+    primary: Any,
+    prompt: str,
+    *,
+    aspect_ratio: str,
+    n: int,
+    enable_nsfw: bool,
+    enable_pro: bool,
+) -> AsyncGenerator[dict[str, Any], None]:
+    """Run :func:`stream_images` for *n* images across several accounts at once.
+
+    One account only produces a round's worth of images at a time, so a
+    larger *n* is split into shards of at most one round each, every shard on
+    its own reserved account and WebSocket (capped by ``image.fanout_accounts``).
+    Events from all shards are merged as they arrive; final events carry the
+    ``token`` that produced them and a ``rank`` (shard, index) for ordering.
+
+    A failed shard is re-dispatched to another account for the images it has
+    not delivered yet (at most ``selection_max_retries()`` times); only when
+    that runs out does its error event reach the caller.  *primary* is owned
+    by the caller — extra accounts are reserved and released here.  Auth
+    failures on any shard account, the primary's included, are reported to
+    *acct_dir* as soon as its shard attempt ends.
+    """
+    mode_id = int(spec.mode_id)
+    per_round = _ROUND_IMAGES_PRO if enable_pro else _ROUND_IMAGES_SPEED
+    max_accounts = max(1, get_config().get_int("image.fanout_accounts", 4))
+    wanted = min(max_accounts, -(-n // per_round))
+
+    leases = [primary]
+    busy: set[str] = {primary.token}
+    while len(leases) < wanted:
+        acct = await acct_dir.reserve_any(
+            spec.pool_candidates(),
+            exclude_tokens=list(busy),
+            now_s_override=now_s(),
+        )
+        if acct is None:
+            break
+        leases.append(acct)
+        busy.add(acct.token)
+
+    if len(leases) == 1:
+        try:
+            async for ev in stream_images(
+                primary.token, prompt,
+                aspect_ratio = aspect_ratio,
+                n            = n,
+                enable_nsfw  = enable_nsfw,
+                enable_pro   = enable_pro,
+            ):
+                if ev.get("type") == "error":
+                    # The caller raises on this event and never resumes us.
+                    await _report_image_account(acct_dir, primary.token, mode_id, _image_error_exc(ev))
+                    yield ev
+                    return
+                if ev.get("is_final"):
+                    ev["token"] = primary.token
+                yield ev
+        except Exception as exc:
+            await _report_image_account(acct_dir, primary.token, mode_id, exc)
+            raise
+        return
+
+    logger.info(
+        "image generation fanned out: requested_images={} accounts={}",
+        n,
+        len(leases),
+    )
+    queue: asyncio.Queue = asyncio.Queue()
+    failed: set[str] = set()
+
+    async def _run_shard(shard: int, acct: Any, count: int) -> None:
+        delivered = 0
+        retries = selection_max_retries()
+        try:
+            while True:
+                error: dict[str, Any] | None = None
+                error_exc: BaseException | None = None
+                try:
+                    async for ev in stream_images(
+                        acct.token, prompt,
+                        aspect_ratio = aspect_ratio,
+                        n            = count - delivered,
+                        enable_nsfw  = enable_nsfw,
+                        enable_pro   = enable_pro,
+                    ):
+                        if ev.get("type") == "error":
+                            error = ev
+                            break
+                        if ev.get("is_final"):
+                            ev["token"] = acct.token
+                            ev["rank"] = (shard, delivered)
+                            delivered += 1
+                        queue.put_nowait(ev)
+                except Exception as exc:
+                    error = {"type": "error", "error_code": "shard_failed", "error": str(exc)}
+                    error_exc = exc
+                finally:
+                    busy.discard(acct.token)
+                    if acct is not primary:
+                        await acct_dir.release(acct)
+                if error is not None and error_exc is None:
+                    error_exc = _image_error_exc(error)
+                if error_exc is not None:
+                    await _report_image_account(acct_dir, acct.token, mode_id, error_exc)
+
+                if error is None or delivered >= count:
+                    return
+                failed.add(acct.token)
+                replacement = None
+                if retries > 0:
+                    retries -= 1
+                    replacement = await acct_dir.reserve_any(
+                        spec.pool_candidates(),
+                        exclude_tokens=list(busy | failed),
+                        now_s_override=now_s(),
+                    )
+                if replacement is None:
+                    queue.put_nowait(error)
+                    return
+                logger.warning(
+                    "image shard re-dispatched: shard={} remaining_images={} error={}",
+                    shard,
+                    count - delivered,
+                    error.get("error", ""),
+                )
+                acct = replacement
+                busy.add(acct.token)
+        finally:
+            queue.put_nowait(_SHARD_DONE)
+
+    sizes = _shard_sizes(n, len(leases))
+    tasks = [
+        asyncio.create_task(_run_shard(i, acct, size))
+        for i, (acct, size) in enumerate(zip(leases, sizes))
+    ]
+    pending = len(tasks)
+    try:
+        while pending:
+            ev = await queue.get()
+            if ev is _SHARD_DONE:
+                pending -= 1
+                continue
+            yield ev
+            if ev.get("type") == "error":
+                return
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
 
 
 async def generate(
@@ -320,18 +507,15 @@ async def generate(
     token       = acct.token
     response_id = make_response_id()
     enable_pro  = model in _PRO_IMAGE_MODELS
-    _ws_mode_id = int(spec.mode_id)
 
     if stream:
         async def _sse_stream() -> AsyncGenerator[str, None]:
-            success = False
-            fail_exc: BaseException | None = None
             progress_map: dict[object, int] = {}
             completed_ids: set[object] = set()
             last_progress = -1
             try:
-                async for ev in stream_images(
-                    token, prompt,
+                async for ev in _fanout_stream_images(
+                    _acct_dir, spec, acct, prompt,
                     aspect_ratio = aspect_ratio,
                     n            = n,
                     enable_nsfw  = enable_nsfw,
@@ -370,7 +554,7 @@ async def generate(
                         chunk = make_thinking_chunk(response_id, model, reason + "\n")
                         yield f"data: {orjson.dumps(chunk).decode()}\n\n"
                     image = await _resolve_image_output(
-                        token=token,
+                        token=ev.get("token") or token,
                         url=ev.get("url", ""),
                         response_format=response_format,
                         blob_b64=ev.get("blob") or None,
@@ -382,31 +566,20 @@ async def generate(
                 final = make_stream_chunk(response_id, model, "", is_final=True)
                 yield f"data: {orjson.dumps(final).decode()}\n\n"
                 yield "data: [DONE]\n\n"
-                success = True
-            except BaseException as exc:
-                fail_exc = exc
-                raise
             finally:
+                # Auth failures are reported per shard by the fan-out.
                 await _acct_dir.release(acct)
-                # WS image gen has its own upstream rate limiting — skip quota tracking.
-                # Still propagate auth failures so bad accounts get marked expired.
-                if not success and fail_exc is not None:
-                    kind = _feedback_kind(fail_exc)
-                    if kind in (FeedbackKind.UNAUTHORIZED, FeedbackKind.FORBIDDEN):
-                        await _acct_dir.feedback(token, kind, _ws_mode_id)
 
         return _sse_stream()
 
     # Non-streaming: collect all final images.
-    finals: list[_ImageOutput] = []
+    finals: list[tuple[tuple[int, int], _ImageOutput]] = []
     reasoning_updates: list[str] = []
     progress_map: dict[object, int] = {}
     completed_ids: set[object] = set()
-    success = False
-    fail_exc: BaseException | None = None
     try:
-        async for ev in stream_images(
-            token, prompt,
+        async for ev in _fanout_stream_images(
+            _acct_dir, spec, acct, prompt,
             aspect_ratio = aspect_ratio,
             n            = n,
             enable_nsfw  = enable_nsfw,
@@ -443,26 +616,21 @@ async def generate(
                         total=n,
                     )
                 image = await _resolve_image_output(
-                    token=token,
+                    token=ev.get("token") or token,
                     url=ev.get("url", ""),
                     response_format=response_format,
                     blob_b64=ev.get("blob") or None,
                 )
-                finals.append(image)
-        success = True
-    except BaseException as exc:
-        fail_exc = exc
-        raise
+                finals.append((ev.get("rank") or (0, len(finals)), image))
     finally:
+        # Auth failures are reported per shard by the fan-out.
         await _acct_dir.release(acct)
-        # WS image gen has its own upstream rate limiting — skip quota tracking.
-        if not success and fail_exc is not None:
-            kind = _feedback_kind(fail_exc)
-            if kind in (FeedbackKind.UNAUTHORIZED, FeedbackKind.FORBIDDEN):
-                await _acct_dir.feedback(token, kind, _ws_mode_id)
+
+    # Shards finish out of order — restore shard order for the response.
+    images = [image for _, image in sorted(finals, key=lambda item: item[0])]
 
     if chat_format:
-        content = "\n\n".join(image.markdown_value for image in finals)
+        content = "\n\n".join(image.markdown_value for image in images)
         reasoning = "\n".join(reasoning_updates) if reasoning_updates else None
         return make_chat_response(
             model,
@@ -476,7 +644,7 @@ async def generate(
         {"b64_json": image.api_value}
         if _normalize_response_format(response_format) == "b64_json"
         else {"url": image.api_value}
-        for image in finals
+        for image in images
     ]
     return {"created": int(time.time()), "data": data}
 
@@ -507,11 +675,11 @@ async def _generate_lite(
         async def _sse_stream() -> AsyncGenerator[str, None]:
             progress_map: dict[int, int] = {}
             last_progress = -1
-            queue: asyncio.Queue[tuple[int, int]] = asyncio.Queue()
+            channel = ProgressChannel(keepalive_s=DEFAULT_KEEPALIVE_S)
 
             async def _progress(idx: int, progress: int) -> None:
                 progress_map[idx] = _clamp_progress(progress)
-                await queue.put((
+                channel.push((
                     _compute_progress_percent(progress_map, n),
                     _completed_items(progress_map),
                 ))
@@ -526,25 +694,29 @@ async def _generate_lite(
                     progress_cb=_progress,
                 )
             )
+            task.add_done_callback(channel.close)
 
-            while not task.done() or not queue.empty():
-                try:
-                    aggregate, completed = await asyncio.wait_for(queue.get(), timeout=0.1)
-                except asyncio.TimeoutError:
-                    continue
-                if chat_format and aggregate > last_progress:
-                    last_progress = aggregate
-                    chunk = make_thinking_chunk(
-                        response_id,
-                        spec.model_name,
-                        _progress_reason_delta(
-                            "图片",
-                            aggregate,
-                            completed=completed,
-                            total=n,
-                        ),
-                    )
-                    yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+            try:
+                async for event in channel:
+                    if event is KEEPALIVE:
+                        yield ": keepalive\n\n"
+                        continue
+                    aggregate, completed = event
+                    if chat_format and aggregate > last_progress:
+                        last_progress = aggregate
+                        chunk = make_thinking_chunk(
+                            response_id,
+                            spec.model_name,
+                            _progress_reason_delta(
+                                "图片",
+                                aggregate,
+                                completed=completed,
+                                total=n,
+                            ),
+                        )
+                        yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+            finally:
+                channel.close()
 
             images = await task
             for image in images:
@@ -804,18 +976,13 @@ async def _collect_edit_final_urls(
     """Collect final image URLs from the dedicated image-edit SSE stream."""
     final_urls: dict[int, str] = {}
     user_id = _extract_user_id(token)
-    async for line in _stream_image_edit(
+    async for data in _stream_image_edit(
         token,
         prompt,
         image_references,
         parent_post_id,
         timeout_s=timeout_s,
     ):
-        ev_type, data = classify_line(line)
-        if ev_type == "done":
-            break
-        if ev_type != "data" or not data:
-            continue
         try:
             obj = orjson.loads(data)
         except Exception:
@@ -898,41 +1065,58 @@ async def _stream_image_edit(
     parent_post_id: str,
     *,
     timeout_s: float = 120.0,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     proxy = await get_proxy_runtime()
     lease = await proxy.acquire(account_id=token)
-    payload = build_image_edit_payload(
-        prompt=prompt,
-        image_references=image_references,
-        parent_post_id=parent_post_id,
-    )
-    headers = await build_http_headers(
-        token,
-        lease=lease,
-        origin="https://grok.com",
-        referer=f"https://grok.com/imagine/post/{parent_post_id}",
-        url=CHAT,
-        method="POST",
-    )
-    kwargs = build_session_kwargs(lease=lease)
-
-    async with ResettableSession(**kwargs) as session:
-        response = await session.post(
-            CHAT,
-            headers=headers,
-            data=orjson.dumps(payload),
-            timeout=timeout_s,
-            stream=True,
+    proxy_fb: ProxyFeedback | None = None
+    try:
+        payload = build_image_edit_payload(
+            prompt=prompt,
+            image_references=image_references,
+            parent_post_id=parent_post_id,
         )
-        if response.status_code != 200:
-            body = response.content.decode("utf-8", "replace")[:300]
-            raise UpstreamError(
-                f"Image-edit upstream returned {response.status_code}",
-                status=response.status_code,
-                body=body,
-            )
-        async for line in response.aiter_lines():
-            yield line
+        headers = await build_http_headers(
+            token,
+            lease=lease,
+            origin="https://grok.com",
+            referer=f"https://grok.com/imagine/post/{parent_post_id}",
+            url=CHAT,
+            method="POST",
+        )
+        kwargs = build_session_kwargs(lease=lease)
+
+        async with ResettableSession(**kwargs) as session:
+            started = time.monotonic()
+            try:
+                response = await session.post(
+                    CHAT,
+                    headers=headers,
+                    data=orjson.dumps(payload),
+                    timeout=timeout_s,
+                    stream=True,
+                )
+            except Exception:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise
+            proxy_fb = response_feedback(response.status_code, started)
+            if response.status_code != 200:
+                body = response.content.decode("utf-8", "replace")[:300]
+                raise UpstreamError(
+                    f"Image-edit upstream returned {response.status_code}",
+                    status=response.status_code,
+                    body=body,
+                )
+            try:
+                async for frame in iter_frames(response.aiter_content()):
+                    yield frame
+            except Exception:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise
+    finally:
+        if proxy_fb is None:
+            await proxy.release(lease)
+        else:
+            await proxy.feedback(lease, proxy_fb)
 
 
 async def _stream_lite_generate(
@@ -941,35 +1125,52 @@ async def _stream_lite_generate(
     mode_id:     ModeId,
     *,
     timeout_s: float = 120.0,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     proxy   = await get_proxy_runtime()
     lease   = await proxy.acquire(account_id=token)
-    payload = build_chat_payload(
-        message           = f"Drawing: {message}",
-        mode_id           = mode_id,
-        file_attachments  = [],
-        request_overrides = {"imageGenerationCount": 2},
-    )
-    headers = await build_http_headers(token, lease=lease, url=CHAT, method="POST")
-    kwargs  = build_session_kwargs(lease=lease)
-
-    async with ResettableSession(**kwargs) as session:
-        response = await session.post(
-            CHAT,
-            headers = headers,
-            data    = orjson.dumps(payload),
-            timeout = timeout_s,
-            stream  = True,
+    proxy_fb: ProxyFeedback | None = None
+    try:
+        payload = build_chat_payload(
+            message           = f"Drawing: {message}",
+            mode_id           = mode_id,
+            file_attachments  = [],
+            request_overrides = {"imageGenerationCount": 2},
         )
-        if response.status_code != 200:
-            body = response.content.decode("utf-8", "replace")[:300]
-            raise UpstreamError(
-                f"Image-generation upstream returned {response.status_code}",
-                status = response.status_code,
-                body   = body,
-            )
-        async for line in response.aiter_lines():
-            yield line
+        headers = await build_http_headers(token, lease=lease, url=CHAT, method="POST")
+        kwargs  = build_session_kwargs(lease=lease)
+
+        async with ResettableSession(**kwargs) as session:
+            started = time.monotonic()
+            try:
+                response = await session.post(
+                    CHAT,
+                    headers = headers,
+                    data    = orjson.dumps(payload),
+                    timeout = timeout_s,
+                    stream  = True,
+                )
+            except Exception:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise
+            proxy_fb = response_feedback(response.status_code, started)
+            if response.status_code != 200:
+                body = response.content.decode("utf-8", "replace")[:300]
+                raise UpstreamError(
+                    f"Image-generation upstream returned {response.status_code}",
+                    status = response.status_code,
+                    body   = body,
+                )
+            try:
+                async for frame in iter_frames(response.aiter_content()):
+                    yield frame
+            except Exception:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise
+    finally:
+        if proxy_fb is None:
+            await proxy.release(lease)
+        else:
+            await proxy.feedback(lease, proxy_fb)
 
 
 async def _run_lite_request(
@@ -1006,17 +1207,12 @@ async def _run_lite_request(
         fail_exc: BaseException | None = None
 
         try:
-            async for line in _stream_lite_generate(
+            async for data in _stream_lite_generate(
                 token,
                 prompt,
                 spec.mode_id,
                 timeout_s=timeout_s,
             ):
-                ev_type, data = classify_line(line)
-                if ev_type == "done":
-                    break
-                if ev_type != "data" or not data:
-                    continue
                 for ev in adapter.feed(data):
                     if ev.kind == "image_progress":
                         if progress_cb is not None:
@@ -1171,11 +1367,11 @@ async def edit(
             fail_exc: BaseException | None = None
             progress_map: dict[int, int] = {}
             last_progress = -1
-            queue: asyncio.Queue[tuple[int, int]] = asyncio.Queue()
+            channel = ProgressChannel(keepalive_s=DEFAULT_KEEPALIVE_S)
             try:
                 async def _progress(index: int, progress: int) -> None:
                     progress_map[index] = _clamp_progress(progress)
-                    await queue.put((
+                    channel.push((
                         _compute_progress_percent(progress_map, n),
                         _completed_items(progress_map),
                     ))
@@ -1192,11 +1388,12 @@ async def edit(
                         progress_cb=_progress,
                     )
                 )
-                while not task.done() or not queue.empty():
-                    try:
-                        aggregate, completed = await asyncio.wait_for(queue.get(), timeout=0.1)
-                    except asyncio.TimeoutError:
+                task.add_done_callback(channel.close)
+                async for event in channel:
+                    if event is KEEPALIVE:
+                        yield ": keepalive\n\n"
                         continue
+                    aggregate, completed = event
                     if chat_format and aggregate > last_progress:
                         last_progress = aggregate
                         chunk = make_thinking_chunk(
@@ -1224,6 +1421,7 @@ async def edit(
                 fail_exc = exc
                 raise
             finally:
+                channel.close()
                 await _acct_dir.release(acct)
                 kind = FeedbackKind.SUCCESS if success else _feedback_kind(fail_exc) if fail_exc else FeedbackKind.SERVER_ERROR
                 await _acct_dir.feedback(token, kind, int(spec.mode_id))
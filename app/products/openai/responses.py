@@ -7,20 +7,26 @@ Streaming emits standard Responses API SSE events.
 import asyncio
 from typing import Any, AsyncGenerator
 
-import orjson
-
 from app.platform.logging.logger import logger
 from app.platform.config.snapshot import get_config
 from app.platform.errors import RateLimitError, UpstreamError
 from app.platform.runtime.clock import now_s
-from app.platform.tokens import estimate_prompt_tokens, estimate_tokens, estimate_tool_call_tokens
+from app.platform.tokens import (
+    TokenCounter,
+    estimate_prompt_tokens_async,
+    estimate_tokens_async,
+    estimate_tool_call_tokens,
+)
 from app.control.model.enums import ModeId
 from app.control.model.registry import resolve as resolve_model
 from app.control.account.enums import FeedbackKind
-from app.dataplane.reverse.protocol.xai_chat import classify_line, StreamAdapter
+from app.dataplane.reverse.protocol.xai_chat import StreamAdapter
 from app.products._account_selection import reserve_account, selection_max_retries
+from app.products._coalesce import Delta, coalesce, coalesce_window
+from app.products._context import fit_context
+from app.products._sse import DONE_FRAME, SLOT, FrameTemplate
 
-from .chat import _stream_chat, _extract_message, _resolve_image, _quota_sync, _fail_sync, _parse_retry_codes, _feedback_kind, _log_task_exception, _upstream_body_excerpt
+from .chat import _stream_chat, _extract_each, _join_extracted, _resolve_image, _quota_sync, _fail_sync, _parse_retry_codes, _feedback_kind, _log_task_exception, _upstream_body_excerpt
 from .chat import _configured_retry_codes, _should_retry_upstream
 from ._format import (
     make_resp_id, build_resp_usage, make_resp_object, format_sse,
@@ -28,7 +34,8 @@ from ._format import (
 from app.dataplane.reverse.protocol.tool_prompt import (
     build_tool_system_prompt, extract_tool_names, inject_into_message, tool_calls_to_xml,
 )
-from app.dataplane.reverse.protocol.tool_parser import parse_tool_calls
+from app.dataplane.reverse.protocol.tool_parser import ToolCallDelta, parse_tool_calls
+from ._response_store import input_items, load_history, save_turn, store_enabled
 from ._tool_sieve import ToolSieve
 
 
@@ -80,44 +87,73 @@ def _build_fc_items(calls: list) -> list[dict]:
     ]
 
 
-async def _emit_fc_events(items: list[dict], base_idx: int):
-    """Async generator — yields SSE events for pre-built function_call items.
+def _fc_delta_events(
+    deltas:    list[ToolCallDelta],
+    open_items: dict[int, dict],
+    done_items: list[dict],
+    base_idx:  int,
+) -> list[bytes]:
+    """SSE events for streamed tool-call deltas from the sieve.
 
-    Using pre-built items ensures the IDs in the streaming events match those
-    in the final response.completed payload.
+    *open_items* tracks the in-progress ``function_call`` item per call
+    index; completed items are appended to *done_items* so the IDs in the
+    streaming events match those in the final response.completed payload.
     """
-    for i, item in enumerate(items):
-        out_idx    = base_idx + i
-        fc_item_id = item["id"]
-        yield format_sse("response.output_item.added", {
-            "type":         "response.output_item.added",
-            "output_index": out_idx,
-            "item": {
-                "id":        fc_item_id,
+    events: list[bytes] = []
+    for d in deltas:
+        out_idx = base_idx + d.index
+        if d.kind == "start":
+            item = {
+                "id":        make_resp_id("fc"),
                 "type":      "function_call",
-                "call_id":   item["call_id"],
-                "name":      item["name"],
+                "call_id":   d.call_id,
+                "name":      d.name,
                 "arguments": "",
                 "status":    "in_progress",
-            },
-        })
-        yield format_sse("response.function_call_arguments.delta", {
-            "type":         "response.function_call_arguments.delta",
-            "item_id":      fc_item_id,
-            "output_index": out_idx,
-            "delta":        item["arguments"],
-        })
-        yield format_sse("response.function_call_arguments.done", {
+            }
+            open_items[d.index] = item
+            events.append(format_sse("response.output_item.added", {
+                "type":         "response.output_item.added",
+                "output_index": out_idx,
+                "item":         dict(item),
+            }))
+            continue
+        item = open_items.get(d.index)
+        if item is None:
+            continue
+        if d.kind == "args":
+            events.append(format_sse("response.function_call_arguments.delta", {
+                "type":         "response.function_call_arguments.delta",
+                "item_id":      item["id"],
+                "output_index": out_idx,
+                "delta":        d.arguments,
+            }))
+            continue
+        del open_items[d.index]
+        if d.kind == "drop":
+            # Truncated or invalid arguments: close the item, keep it out of the output.
+            item["status"] = "incomplete"
+            events.append(format_sse("response.output_item.done", {
+                "type":         "response.output_item.done",
+                "output_index": out_idx,
+                "item":         item,
+            }))
+            continue
+        item["arguments"] = d.arguments
+        item["status"]    = "completed"
+        done_items.append(item)
+        events.append(format_sse("response.function_call_arguments.done", {
             "type":         "response.function_call_arguments.done",
-            "item_id":      fc_item_id,
+            "item_id":      item["id"],
             "output_index": out_idx,
-            "arguments":    item["arguments"],
-        })
-        yield format_sse("response.output_item.done", {
+            "arguments":    d.arguments,
+        }))
+        events.append(format_sse("response.output_item.done", {
             "type":         "response.output_item.done",
             "output_index": out_idx,
             "item":         item,
-        })
+        }))
+    return events
 
 
 # ---------------------------------------------------------------------------
@@ -217,28 +253,41 @@ async def create(
     top_p:        float,
     tools:        list[dict] | None = None,
     tool_choice:  Any = None,
-) -> dict | AsyncGenerator[str, None]:
+    previous_response_id: str | None = None,
+    store:        bool | None = None,
+) -> dict | AsyncGenerator[bytes, None]:
 
     cfg     = get_config()
     spec    = resolve_model(model)
     mode_id = int(spec.mode_id)   # cast once, reuse everywhere
 
+    # previous_response_id → earlier turns come from the state store; the
+    # client only sends the new turn.  Instructions are never carried over.
+    turn_items = input_items(input_val)
+    history    = await load_history(previous_response_id) if previous_response_id else []
+    persist    = store_enabled(store)
+
     messages: list[dict] = []
     if instructions:
         messages.append({"role": "system", "content": instructions})
-    messages.extend(_parse_input(input_val))
-
-    message, files = _extract_message(messages)
-    if not message.strip():
-        raise UpstreamError("Empty message after extraction", status=400)
+    messages.extend(_parse_input(history + turn_items))
 
     # Tool prompt injection — only modify the message text, never the Grok payload
     # Normalise to Chat Completions format first (Responses API uses a flat structure)
     tool_names: list[str] = []
+    tool_prompt = ""
     if tools:
         chat_tools = _to_chat_tools(tools)
         tool_names = extract_tool_names(chat_tools)
         tool_prompt = build_tool_system_prompt(chat_tools, tool_choice)
+
+    fit = await fit_context(messages, _extract_each(messages), spec, extra_text=tool_prompt, label="responses")
+    message, files = _join_extracted(fit.extracted)
+    prompt_parts = [tool_prompt, *(text for text, _ in fit.extracted)]
+    if not message.strip():
+        raise UpstreamError("Empty message after extraction", status=400)
+
+    if tool_prompt:
         message = inject_into_message(message, tool_prompt)
         logger.info("responses tool injection: tool_names={} choice={}", tool_names, tool_choice)
 
@@ -254,10 +303,43 @@ async def create(
     message_id   = make_resp_id("msg")
     timeout_s    = cfg.get_float("chat.timeout", 120.0)
 
+    async def _save(output: list[dict]) -> None:
+        if persist:
+            await save_turn(
+                response_id,
+                previous_response_id=previous_response_id,
+                input_items=turn_items,
+                output=output,
+            )
+
     # -------------------------------------------------------------------------
     # Streaming
     # -------------------------------------------------------------------------
-    async def _run_stream() -> AsyncGenerator[str, None]:
+    # Per-token deltas are spliced into frames rendered once per stream; the
+    # message is output 1 when a reasoning item precedes it.
+    reasoning_frame = FrameTemplate({
+        "type":          "response.reasoning_summary_text.delta",
+        "item_id":       reasoning_id,
+        "output_index":  0,
+        "summary_index": 0,
+        "delta":         SLOT,
+    }, "response.reasoning_summary_text.delta")
+    text_frames = tuple(
+        FrameTemplate({
+            "type":          "response.output_text.delta",
+            "item_id":       message_id,
+            "output_index":  idx,
+            "content_index": 0,
+            "delta":         SLOT,
+        }, "response.output_text.delta")
+        for idx in (0, 1)
+    )
+    window = coalesce_window() if stream else None
+
+    def _delta(template: FrameTemplate, text: str) -> bytes | Delta:
+        return Delta(template.render, text) if window else template.render(text)
+
+    async def _run_stream() -> AsyncGenerator[bytes | Delta, None]:
         excluded: list[str] = []
         for attempt in range(max_retries + 1):
             acct, selected_mode_id = await reserve_account(
@@ -276,12 +358,15 @@ async def create(
             adapter           = StreamAdapter()
             think_buf:  list[str] = []
             text_buf:   list[str] = []
+            think_count         = TokenCounter()
+            text_count          = TokenCounter()
             reasoning_started   = False
             reasoning_closed    = False
             message_started     = False
-            sieve               = ToolSieve(tool_names) if tool_names else None
+            sieve               = ToolSieve(tool_names, stream_args=True) if tool_names else None
             tool_calls_emitted  = False
             detected_fc_items: list[dict] = []
+            open_fc_items: dict[int, dict] = {}
             collected_annotations: list[dict] = []
 
             try:
@@ -292,7 +377,7 @@ async def create(
                     })
 
                     ended = False
-                    async for line in _stream_chat(
+                    async for data in _stream_chat(
                         token     = token,
                         mode_id   = ModeId(selected_mode_id),
                         message   = message,
@@ -302,11 +387,6 @@ async def create(
                         if tool_calls_emitted:
                             break
 
-                        event_type, data = classify_line(line)
-                        if event_type == "done":
-                            break
-                        if event_type != "data" or not data:
-                            continue
 
                         for ev in adapter.feed(data):
 
@@ -329,13 +409,8 @@ async def create(
                                         "part":          {"type": "summary_text", "text": ""},
                                     })
                                 think_buf.append(ev.content)
-                                yield format_sse("response.reasoning_summary_text.delta", {
-                                    "type":          "response.reasoning_summary_text.delta",
-                                    "item_id":       reasoning_id,
-                                    "output_index":  0,
-                                    "summary_index": 0,
-                                    "delta":         ev.content,
-                                })
+                                think_count.feed(ev.content)
+                                yield _delta(reasoning_frame, ev.content)
 
                             elif ev.kind == "text":
                                 if reasoning_started and not reasoning_closed:
@@ -369,15 +444,6 @@ async def create(
                                 # Feed through ToolSieve if tools are active
                                 if sieve is not None:
                                     safe_text, calls = sieve.feed(ev.content)
-                                    if calls is not None:
-                                        fc_items = _build_fc_items(calls)
-                                        detected_fc_items = fc_items
-                                        base_idx = 1 if reasoning_started else 0
-                                        async for evt in _emit_fc_events(fc_items, base_idx):
-                                            yield evt
-                                        tool_calls_emitted = True
-                                        ended = True
-                                        break
                                     text_chunk = safe_text
                                 else:
                                     text_chunk = ev.content
@@ -403,13 +469,19 @@ async def create(
                                         })
 
                                     text_buf.append(text_chunk)
-                                    yield format_sse("response.output_text.delta", {
-                                        "type":          "response.output_text.delta",
-                                        "item_id":       message_id,
-                                        "output_index":  msg_idx,
-                                        "content_index": 0,
-                                        "delta":         text_chunk,
-                                    })
+                                    text_count.feed(text_chunk)
+                                    yield _delta(text_frames[msg_idx], text_chunk)
+
+                                if sieve is not None:
+                                    base_idx = 1 if reasoning_started else 0
+                                    for evt in _fc_delta_events(
+                                        sieve.drain_deltas(), open_fc_items, detected_fc_items, base_idx,
+                                    ):
+                                        yield evt
+                                    if calls is not None:
+                                        tool_calls_emitted = True
+                                        ended = True
+                                        break
 
                             elif ev.kind == "annotation" and ev.annotation_data:
                                 if message_started:
@@ -434,12 +506,12 @@ async def create(
                     # Flush sieve after stream ends (incomplete XML at end of stream)
                     if sieve is not None and not tool_calls_emitted:
                         calls = sieve.flush()
+                        base_idx = 1 if reasoning_started else 0
+                        for evt in _fc_delta_events(
+                            sieve.drain_deltas(), open_fc_items, detected_fc_items, base_idx,
+                        ):
+                            yield evt
                         if calls:
-                            fc_items = _build_fc_items(calls)
-                            detected_fc_items = fc_items
-                            base_idx = 1 if reasoning_started else 0
-                            async for evt in _emit_fc_events(fc_items, base_idx):
-                                yield evt
                             tool_calls_emitted = True
 
                     if tool_calls_emitted:
@@ -454,17 +526,18 @@ async def create(
                                 "status":  "completed",
                             })
                         output.extend(detected_fc_items)
-                        pt = estimate_prompt_tokens(message)
+                        await _save(output)
+                        pt = await estimate_prompt_tokens_async(prompt_parts)
                         ct = estimate_tool_call_tokens(detected_fc_items)
-                        rt = estimate_tokens(full_think) if full_think else 0
+                        rt = think_count.total
                         yield format_sse("response.completed", {
                             "type":     "response.completed",
                             "response": make_resp_object(
                                 response_id, model, "completed", output,
-                                build_resp_usage(pt, ct + rt, rt),
+                                build_resp_usage(pt, ct + rt, rt, trimmed_tokens=fit.trimmed_tokens),
                             ),
                         })
-                        yield "data: [DONE]\n\n"
+                        yield DONE_FRAME
                         success = True
                         logger.info("responses stream tool_calls: attempt={}/{} model={}",
                                     attempt + 1, max_retries + 1, model)
@@ -475,26 +548,16 @@ async def create(
                             img_text = await _resolve_image(token, url, img_id)
                             img_md   = img_text + "\n"
                             text_buf.append(img_md)
+                            text_count.feed(img_md)
                             if message_started:
-                                yield format_sse("response.output_text.delta", {
-                                    "type":          "response.output_text.delta",
-                                    "item_id":       message_id,
-                                    "output_index":  msg_idx,
-                                    "content_index": 0,
-                                    "delta":         img_md,
-                                })
+                                yield _delta(text_frames[msg_idx], img_md)
 
                         references = adapter.references_suffix()
                         if references:
                             text_buf.append(references)
+                            text_count.feed(references)
                             if message_started:
-                                yield format_sse("response.output_text.delta", {
-                                    "type":          "response.output_text.delta",
-                                    "item_id":       message_id,
-                                    "output_index":  msg_idx,
-                                    "content_index": 0,
-                                    "delta":         references,
-                                })
+                                yield _delta(text_frames[msg_idx], references)
 
                         full_text = "".join(text_buf)
                         if message_started:
@@ -551,18 +614,19 @@ async def create(
                             if sources:
                                 msg_item["search_sources"] = sources
                         output.append(msg_item)
+                        await _save(output)
 
-                        pt  = estimate_prompt_tokens(message)
-                        ct  = estimate_tokens(full_text)
-                        rt  = estimate_tokens(full_think) if full_think else 0
+                        pt  = await estimate_prompt_tokens_async(prompt_parts)
+                        ct  = text_count.total
+                        rt  = think_count.total
                         yield format_sse("response.completed", {
                             "type":     "response.completed",
                             "response": make_resp_object(
                                 response_id, model, "completed", output,
-                                build_resp_usage(pt, ct + rt, rt),
+                                build_resp_usage(pt, ct + rt, rt, trimmed_tokens=fit.trimmed_tokens),
                             ),
                         })
-                        yield "data: [DONE]\n\n"
+                        yield DONE_FRAME
                         success = True
                         logger.info("responses stream completed: attempt={}/{} model={} text_len={} reasoning_len={} image_count={}",
                                     attempt + 1, max_retries + 1, model,
@@ -599,7 +663,7 @@ async def create(
             excluded.append(token)
 
     if stream:
-        return _run_stream()
+        return coalesce(_run_stream(), window) if window else _run_stream()
 
     # -------------------------------------------------------------------------
     # Non-streaming
@@ -625,18 +689,13 @@ async def create(
 
         try:
             try:
-                async for line in _stream_chat(
+                async for data in _stream_chat(
                     token     = token,
                     mode_id   = ModeId(selected_mode_id),
                     message   = message,
                     files     = files,
                     timeout_s = timeout_s,
                 ):
-                    event_type, data = classify_line(line)
-                    if event_type == "done":
-                        break
-                    if event_type != "data" or not data:
-                        continue
                     ended = False
                     for ev in adapter.feed(data):
                         if ev.kind == "soft_stop":
@@ -708,13 +767,14 @@ async def create(
                     "status":  "completed",
                 })
             output.extend(_build_fc_items(tc_result.calls))
-            pt = estimate_prompt_tokens(message)
+            await _save(output)
+            pt = await estimate_prompt_tokens_async(prompt_parts)
             ct = estimate_tool_call_tokens(tc_result.calls)
-            rt = estimate_tokens(full_think) if full_think else 0
+            rt = await estimate_tokens_async(full_think) if full_think else 0
             logger.info("responses tool_calls: model={} calls={}", model, len(tc_result.calls))
             return make_resp_object(
                 response_id, model, "completed", output,
-                build_resp_usage(pt, ct + rt, rt),
+                build_resp_usage(pt, ct + rt, rt, trimmed_tokens=fit.trimmed_tokens),
             )
 
     logger.info("responses request completed: model={} text_len={} reasoning_len={} image_count={}",
@@ -739,13 +799,14 @@ async def create(
     if sources:
         msg_item["search_sources"] = sources
     output.append(msg_item)
+    await _save(output)
 
-    pt = estimate_prompt_tokens(message)
-    ct = estimate_tokens(full_text)
-    rt = estimate_tokens(full_think) if full_think else 0
+    pt = await estimate_prompt_tokens_async(prompt_parts)
+    ct = await estimate_tokens_async(full_text)
+    rt = await estimate_tokens_async(full_think) if full_think else 0
     return make_resp_object(
         response_id, model, "completed", output,
-        build_resp_usage(pt, ct + rt, rt),
+        build_resp_usage(pt, ct + rt, rt, trimmed_tokens=fit.trimmed_tokens),
     )
 
 
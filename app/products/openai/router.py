@@ -114,7 +114,7 @@ async def get_model_endpoint(model_id: str, request: Request):
 # ---------------------------------------------------------------------------
 
 
-async def _safe_sse(stream: AsyncIterable[str]) -> AsyncGenerator[str, None]:
+async def _safe_sse(stream: AsyncIterable[str | bytes]) -> AsyncGenerator[str | bytes, None]:
     """Wrap an SSE stream, converting exceptions to in-band error events."""
     try:
         async for chunk in stream:
@@ -300,6 +300,7 @@ async def chat_completions_endpoint(req: ChatCompletionRequest):
                 emit_think: bool | None = None
             else:
                 emit_think = req.reasoning_effort != "none"
+            opts = req.stream_options
             result = await chat_completions(
                 model=req.model,
                 messages=messages,
@@ -309,6 +310,8 @@ async def chat_completions_endpoint(req: ChatCompletionRequest):
                 tool_choice=req.tool_choice,
                 temperature=req.temperature or 0.8,
                 top_p=req.top_p or 0.95,
+                include_usage=bool(opts and opts.include_usage),
+                continuous_usage=bool(opts and opts.continuous_usage_stats),
             )
 
     except AppError:
@@ -349,7 +352,7 @@ async def chat_completions_endpoint(req: ChatCompletionRequest):
 # ---------------------------------------------------------------------------
 
 
-async def _safe_sse_responses(stream) -> AsyncGenerator[str, None]:
+async def _safe_sse_responses(stream) -> AsyncGenerator[str | bytes, None]:
     """SSE wrapper that converts errors to Responses API error events."""
     try:
         async for chunk in stream:
@@ -414,6 +417,8 @@ async def responses_endpoint(req: ResponsesCreateRequest):
         top_p=req.top_p or 0.95,
         tools=req.tools or None,
         tool_choice=req.tool_choice,
+        previous_response_id=req.previous_response_id,
+        store=req.store,
     )
 
     if isinstance(result, dict):
@@ -26,10 +26,17 @@ class VideoConfig(BaseModel):
     preset: Literal["fun", "normal", "spicy", "custom"] | None = None
 
 
+class StreamOptions(BaseModel):
+    include_usage:          bool | None = None
+    # vLLM extension: running usage on every chunk.
+    continuous_usage_stats: bool | None = None
+
+
 class ChatCompletionRequest(BaseModel):
     model:               str
     messages:            list[MessageItem]
     stream:              bool | None                = None
+    stream_options:      StreamOptions | None       = None
     reasoning_effort:    str | None                 = None
     temperature:         float | None               = 0.8
     top_p:               float | None               = 0.95
@@ -62,7 +69,8 @@ class ImageEditRequest(BaseModel):
 class ResponsesCreateRequest(BaseModel):
     """OpenAI Responses API — /v1/responses.
 
-    Only model/input/instructions/stream/reasoning/temperature/top_p are acted on.
+    Only model/input/instructions/stream/reasoning/temperature/top_p/tools/
+    previous_response_id/store are acted on.
     All other fields are accepted and silently discarded.
     """
     model:                str
@@ -72,12 +80,12 @@ class ResponsesCreateRequest(BaseModel):
     reasoning:            dict[str, Any] | None = None
     temperature:          float | None         = None
     top_p:                float | None         = None
-    # silently ignored
-    max_output_tokens:    int | None            = None
     tools:                list[Any] | None      = None
     tool_choice:          Any | None            = None
     previous_response_id: str | None            = None
     store:                bool | None           = None
+    # silently ignored
+    max_output_tokens:    int | None            = None
     metadata:             dict[str, Any] | None = None
     truncation:           str | None            = None
     parallel_tool_calls:  bool | None           = None
@@ -89,7 +97,7 @@ class ResponsesCreateRequest(BaseModel):
 
 
 __all__ = [
-    "MessageItem", "ImageConfig", "VideoConfig",
+    "MessageItem", "ImageConfig", "VideoConfig", "StreamOptions",
     "ChatCompletionRequest", "ImageGenerationRequest", "ImageEditRequest",
     "ResponsesCreateRequest",
 ]
@@ -10,7 +10,7 @@ import hashlib
 import html
 import time
 import uuid
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, AsyncGenerator, Awaitable, Callable
 from urllib.parse import urlparse
@@ -27,10 +27,13 @@ from app.platform.errors import (
 )
 from app.platform.logging.logger import logger
 from app.platform.runtime.clock import now_s
+from app.platform.runtime.progress import DEFAULT_KEEPALIVE_S, KEEPALIVE, ProgressChannel
+from app.platform.state import get_state_store, put_state
 from app.platform.storage import save_local_video
 from app.control.account.enums import FeedbackKind
 from app.control.model import registry as model_registry
 from app.control.model.registry import resolve as resolve_model
+from app.control.proxy.models import ProxyFeedback, ProxyFeedbackKind
 from app.dataplane.proxy import get_proxy_runtime
 from app.dataplane.proxy.adapters.headers import build_http_headers
 from app.dataplane.proxy.adapters.session import ResettableSession, build_session_kwargs
@@ -38,14 +41,16 @@ from app.dataplane.reverse.protocol.xai_assets import (
     resolve_asset_reference,
     resolve_download_url,
 )
-from app.dataplane.reverse.protocol.xai_chat import classify_line, raise_for_stream_error
+from app.dataplane.reverse.protocol.xai_chat import raise_for_stream_error
 from app.dataplane.reverse.runtime.endpoint_table import CHAT
+from app.dataplane.reverse.transport._proxy_feedback import response_feedback
 from app.dataplane.reverse.transport.asset_upload import (
     resolve_uploaded_asset_reference,
     upload_from_input,
 )
 from app.dataplane.reverse.transport.assets import download_asset
 from app.dataplane.reverse.transport.media import create_media_post
+from app.dataplane.reverse.transport.sse import iter_frames
 from ._format import (
     make_chat_response,
     make_response_id,
@@ -130,9 +135,14 @@ class _VideoJob:
             payload["remixed_from_video_id"] = self.remixed_from_video_id
         return payload
 
+    @classmethod
+    def from_state(cls, doc: dict[str, Any]) -> "_VideoJob":
+        return cls(**{k: v for k, v in doc.items() if k in cls.__dataclass_fields__})
 
-_VIDEO_JOBS: dict[str, _VideoJob] = {}
-_VIDEO_JOBS_LOCK = asyncio.Lock()
+
+# Jobs live in the shared state store so a poll that lands on another worker
+# (or replica) still finds them.
+_VIDEO_JOB_NAMESPACE = "video_job"
 
 
 def _build_message(prompt: str, preset: str) -> str:
@@ -324,37 +334,54 @@ async def _stream_video_request(
     *,
     referer: str,
     timeout_s: float,
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     proxy = await get_proxy_runtime()
     lease = await proxy.acquire(account_id=token)
-    headers = await build_http_headers(
-        token,
-        content_type="application/json",
-        origin="https://grok.com",
-        referer=referer,
-        lease=lease,
-        url=CHAT,
-        method="POST",
-    )
-    kwargs = build_session_kwargs(lease=lease)
-
-    async with ResettableSession(**kwargs) as session:
-        response = await session.post(
-            CHAT,
-            headers=headers,
-            data=orjson.dumps(payload),
-            timeout=timeout_s,
-            stream=True,
+    proxy_fb: ProxyFeedback | None = None
+    try:
+        headers = await build_http_headers(
+            token,
+            content_type="application/json",
+            origin="https://grok.com",
+            referer=referer,
+            lease=lease,
+            url=CHAT,
+            method="POST",
         )
-        if response.status_code != 200:
-            body = response.content.decode("utf-8", "replace")[:300]
-            raise UpstreamError(
-                f"Video upstream returned {response.status_code}",
-                status=response.status_code,
-                body=body,
-            )
-        async for line in response.aiter_lines():
-            yield line
+        kwargs = build_session_kwargs(lease=lease)
+
+        async with ResettableSession(**kwargs) as session:
+            started = time.monotonic()
+            try:
+                response = await session.post(
+                    CHAT,
+                    headers=headers,
+                    data=orjson.dumps(payload),
+                    timeout=timeout_s,
+                    stream=True,
+                )
+            except Exception:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise
+            proxy_fb = response_feedback(response.status_code, started)
+            if response.status_code != 200:
+                body = response.content.decode("utf-8", "replace")[:300]
+                raise UpstreamError(
+                    f"Video upstream returned {response.status_code}",
+                    status=response.status_code,
+                    body=body,
+                )
+            try:
+                async for frame in iter_frames(response.aiter_content()):
+                    yield frame
+            except Exception:
+                proxy_fb = ProxyFeedback(kind=ProxyFeedbackKind.TRANSPORT_ERROR)
+                raise
+    finally:
+        if proxy_fb is None:
+            await proxy.release(lease)
+        else:
+            await proxy.feedback(lease, proxy_fb)
 
 
 def _absolutize_video_url(url: str) -> str:
@@ -491,19 +518,14 @@ async def _collect_video_segment(
     final_asset_id = ""
     final_thumbnail = ""
     video_post_id = ""
-    stream_data_items: list[str] = []
+    stream_data_items: list[bytes] = []
 
-    async for line in _stream_video_request(
+    async for data in _stream_video_request(
         token,
         payload,
         referer=referer,
         timeout_s=timeout_s,
     ):
-        event_type, data = classify_line(line)
-        if event_type == "done":
-            break
-        if event_type != "data" or not data:
-            continue
         stream_data_items.append(data)
         try:
             obj = orjson.loads(data)
@@ -548,12 +570,12 @@ async def _collect_video_segment(
     if not final_url and final_asset_id:
         raise UpstreamError(
             "Video segment returned only assetId without a resolvable URL",
-            body="\n".join(stream_data_items),
+            body=b"\n".join(stream_data_items).decode("utf-8", "replace"),
         )
     if not final_url:
         raise UpstreamError(
             "Video generation returned no final video URL",
-            body="\n".join(stream_data_items),
+            body=b"\n".join(stream_data_items).decode("utf-8", "replace"),
         )
 
     return _VideoArtifact(
@@ -796,28 +818,31 @@ async def _run_video_with_account(
 
 
 async def _put_video_job(job: _VideoJob) -> None:
-    async with _VIDEO_JOBS_LOCK:
-        _VIDEO_JOBS[job.id] = job
+    await put_state(
+        _VIDEO_JOB_NAMESPACE,
+        job.id,
+        asdict(job),
+        expires_at=job.created_at + _VIDEO_JOB_TTL_S,
+    )
 
 
 async def get_video_job(video_id: str) -> _VideoJob | None:
-    async with _VIDEO_JOBS_LOCK:
-        return _VIDEO_JOBS.get(video_id)
-
-
-async def _expire_video_job(video_id: str, ttl_s: int = _VIDEO_JOB_TTL_S) -> None:
-    await asyncio.sleep(ttl_s)
-    async with _VIDEO_JOBS_LOCK:
-        _VIDEO_JOBS.pop(video_id, None)
+    store = await get_state_store()
+    doc = await store.get(_VIDEO_JOB_NAMESPACE, video_id)
+    return _VideoJob.from_state(doc) if doc else None
 
 
 async def _set_job_status(
     job: _VideoJob, *, status: str, progress: int | None = None
 ) -> None:
-    async with _VIDEO_JOBS_LOCK:
-        job.status = status
-        if progress is not None:
-            job.progress = max(0, min(100, progress))
+    if progress is not None:
+        progress = max(0, min(100, progress))
+    if job.status == status and (progress is None or job.progress == progress):
+        return
+    job.status = status
+    if progress is not None:
+        job.progress = progress
+    await _put_video_job(job)
 
 
 def _job_error_payload(message: str) -> dict[str, Any]:
@@ -901,18 +926,21 @@ async def _run_video_job(
                 asyncio.create_task(_fail_sync(token, int(spec.mode_id), fail_exc))
 
         path = _save_video_bytes(raw, job.id)
-        async with _VIDEO_JOBS_LOCK:
-            job.status = "completed"
-            job.progress = 100
-            job.completed_at = int(time.time())
-            job.video_url = artifact.video_url
-            job.content_path = str(path)
-            job.remixed_from_video_id = artifact.remixed_from_video_id
+        job.status = "completed"
+        job.progress = 100
+        job.completed_at = int(time.time())
+        job.video_url = artifact.video_url
+        job.content_path = str(path)
+        job.remixed_from_video_id = artifact.remixed_from_video_id
+        await _put_video_job(job)
     except Exception as exc:
         logger.exception("video job failed: job_id={} error={}", job.id, exc)
-        async with _VIDEO_JOBS_LOCK:
-            job.status = "failed"
-            job.error = _job_error_payload(_exception_message(exc))
+        job.status = "failed"
+        job.error = _job_error_payload(_exception_message(exc))
+        try:
+            await _put_video_job(job)
+        except Exception as store_exc:
+            logger.warning("video job state write failed: job_id={} error={}", job.id, store_exc)
 
 
 async def create_video(
@@ -961,7 +989,6 @@ async def create_video(
             input_references=input_references,
         )
     )
-    asyncio.create_task(_expire_video_job(job.id))
     return job.to_dict()
 
 
@@ -1091,24 +1118,27 @@ async def completions(
     if is_stream:
 
         async def _sse() -> AsyncGenerator[str, None]:
-            queue: asyncio.Queue[int] = asyncio.Queue()
+            channel = ProgressChannel(keepalive_s=DEFAULT_KEEPALIVE_S)
             last_progress = -1
 
             async def _progress(progress: int) -> None:
-                await queue.put(max(0, min(100, progress)))
+                channel.push(max(0, min(100, progress)))
 
             task = asyncio.create_task(_run(progress_cb=_progress))
-            while not task.done() or not queue.empty():
-                try:
-                    progress = await asyncio.wait_for(queue.get(), timeout=0.1)
-                except asyncio.TimeoutError:
-                    continue
-                if progress > last_progress:
-                    last_progress = progress
-                    chunk = make_thinking_chunk(
-                        response_id, model, _progress_reason_delta(progress)
-                    )
-                    yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+            task.add_done_callback(channel.close)
+            try:
+                async for progress in channel:
+                    if progress is KEEPALIVE:
+                        yield ": keepalive\n\n"
+                        continue
+                    if progress > last_progress:
+                        last_progress = progress
+                        chunk = make_thinking_chunk(
+                            response_id, model, _progress_reason_delta(progress)
+                        )
+                        yield f"data: {orjson.dumps(chunk).decode()}\n\n"
+            finally:
+                channel.close()
 
             content = await task
             chunk = make_stream_chunk(response_id, model, content)
@@ -225,6 +225,7 @@ async def get_storage_mode():
 async def runtime_status():
     from app.control.account.runtime import reconcile_refresh_runtime
     from app.dataplane.account import _directory
+    from app.products._coalesce import coalesce_stats
 
     if _directory is None:
         raise AppError(
@@ -241,6 +242,7 @@ async def runtime_status():
                 "size": _directory.size,
                 "revision": _directory.revision,
                 "selection_strategy": strategy_name,
+                "stream_coalesce": coalesce_stats(),
             }
         ),
         media_type="application/json",
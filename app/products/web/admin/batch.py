@@ -18,6 +18,7 @@ from pydantic import BaseModel
 from app.platform.config.snapshot import get_config
 from app.platform.errors import AppError, ErrorKind, UpstreamError, ValidationError
 from app.platform.runtime.batch import run_batch
+from app.platform.runtime.progress import KEEPALIVE
 from app.platform.runtime.task import create_task, expire_task, get_task
 from app.control.account.commands import AccountPatch, ListAccountsQuery
 from app.control.account.state_machine import is_manageable
@@ -292,7 +293,7 @@ async def batch_stream(task_id: str, request: Request):
         )
 
     async def _stream():
-        queue = task.attach()
+        channel = task.attach()
         try:
             yield f"data: {orjson.dumps({'type': 'snapshot', **task.snapshot()}).decode()}\n\n"
 
@@ -301,10 +302,8 @@ async def batch_stream(task_id: str, request: Request):
                 yield f"data: {orjson.dumps(final).decode()}\n\n"
                 return
 
-            while True:
-                try:
-                    event = await asyncio.wait_for(queue.get(), timeout=15)
-                except asyncio.TimeoutError:
+            async for event in channel:
+                if event is KEEPALIVE:
                     yield ": ping\n\n"
                     final = task.final_event()
                     if final:
@@ -316,7 +315,7 @@ async def batch_stream(task_id: str, request: Request):
                 if event.get("type") in ("done", "error", "cancelled"):
                     return
         finally:
-            task.detach(queue)
+            task.detach(channel)
 
     return StreamingResponse(_stream(), media_type="text/event-stream")
 
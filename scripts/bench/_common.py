@@ -0,0 +1,38 @@
+"""Shared helpers for the micro-benchmarks in ``scripts/bench``.
+
+Each benchmark is a standalone script; run it from the repository root,
+e.g. ``python scripts/bench/headers.py``.  Numbers are best-of-N wall-clock
+timings on the current tree, so compare runs on the same machine only.
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from loguru import logger
+
+# Benchmarks measure the hot path, not the log sinks.
+logger.remove()
+
+
+def best_of(fn: Callable[[], object], *, repeat: int = 5) -> float:
+    """Run *fn* *repeat* times and return the fastest run in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def report(label: str, seconds: float, count: int, unit: str) -> None:
+    """Print *seconds* spread over *count* items as ``us/<unit>``."""
+    print(f"  {label:<36} {seconds / count * 1e6:10.2f} us/{unit}")
+
+
+__all__ = ["ROOT", "best_of", "report"]
@@ -0,0 +1,118 @@
+"""Benchmark the byte-level upstream frame splitter against line decoding.
+
+Replays one upstream stream in fixed-size chunks through
+:class:`~app.dataplane.reverse.transport.sse.FrameSplitter` and through the
+previous path: curl_cffi-style ``aiter_lines()`` splitting followed by
+``classify_line`` on every line.  Both must produce the same payloads.
+
+The default stream is a synthetic app-chat answer with SSE noise lines mixed
+in; ``--corpus`` replays a captured raw response body instead.
+
+    python scripts/bench/frames.py [--frames N] [--corpus FILE]
+"""
+
+import argparse
+import random
+
+import orjson
+from _common import best_of, report
+
+from app.dataplane.reverse.protocol.xai_chat import classify_line
+from app.dataplane.reverse.transport.sse import FrameSplitter
+
+
+def _synthetic_stream(frames: int) -> bytes:
+    rnd = random.Random(0)
+    words = ["Hello", " world", "，你好", "\n\n- item", " the", " tide", " 123"]
+    lines = []
+    for i in range(frames):
+        token = {"token": rnd.choice(words), "isThinking": False, "messageTag": "final"}
+        line = orjson.dumps({"result": {"response": token}})
+        if i % 50 == 0:
+            lines.append(b"event: message")
+            lines.append(b"data: " + line)
+            lines.append(b"")
+        else:
+            lines.append(line)
+    lines.append(b"data: [DONE]")
+    return b"\n".join(lines) + b"\n"
+
+
+def _chunks(body: bytes, size: int) -> list[bytes]:
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+def _splitter(chunks: list[bytes]) -> list[bytes]:
+    splitter = FrameSplitter()
+    out: list[bytes] = []
+    for chunk in chunks:
+        out.extend(splitter.feed(chunk))
+        if splitter.done:
+            return out
+    out.extend(splitter.flush())
+    return out
+
+
+def _lines(chunks: list[bytes]) -> list[bytes]:
+    # curl_cffi's aiter_lines(): the pending tail is re-joined with every chunk.
+    out: list[bytes] = []
+    pending = None
+    for chunk in chunks:
+        if pending is not None:
+            chunk = pending + chunk
+        lines = chunk.splitlines()
+        if lines and chunk and lines[-1] and lines[-1][-1] == chunk[-1]:
+            pending = lines.pop()
+        else:
+            pending = None
+        for line in lines:
+            kind, data = classify_line(line)
+            if kind == "done":
+                return out
+            if kind == "data":
+                out.append(data.encode())
+    if pending is not None:
+        kind, data = classify_line(pending)
+        if kind == "data":
+            out.append(data.encode())
+    return out
+
+
+def _compare(label: str, body: bytes, chunk_size: int, frames: int, repeat: int = 5) -> None:
+    chunks = _chunks(body, chunk_size)
+    if _splitter(chunks) != _lines(chunks):
+        raise SystemExit(f"{label}: splitter output differs from aiter_lines + classify_line")
+    print(f"{label}, {len(body)} bytes in {chunk_size}-byte chunks")
+    report("FrameSplitter", best_of(lambda: _splitter(chunks), repeat=repeat), frames, "frame")
+    report(
+        "aiter_lines + classify_line",
+        best_of(lambda: _lines(chunks), repeat=repeat),
+        frames,
+        "frame",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20_000)
+    parser.add_argument("--corpus", help="raw upstream response body to replay")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "rb") as fh:
+            body = fh.read()
+        frames = max(1, len(_splitter([body])))
+        _compare("captured stream", body, 4096, frames)
+        return
+
+    body = _synthetic_stream(args.frames)
+    for size in (4096, 256):
+        _compare(f"{args.frames} token frames", body, size, args.frames)
+
+    # One large frame (a long tool argument or image payload) in small chunks.
+    big = b'{"result": {"response": {"token": "' + b"a" * (2 << 20) + b'"}}}\n'
+    _compare("one 2 MiB frame", big, 1024, 1, repeat=1)
+
+
+if __name__ == "__main__":
+    main()
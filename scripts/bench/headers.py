@@ -0,0 +1,43 @@
+"""Benchmark ``build_http_headers`` with and without its template cache.
+
+The cached path is what every request takes once a (token, profile, origin,
+referer, content type) key has been seen; the uncached path drops the
+templates before each call and so rebuilds the full header set, as every
+call did before templates were cached.  No ``url`` is passed, so the fake
+``x-statsig-id`` is used and nothing goes over the network.
+
+    python scripts/bench/headers.py [--calls N]
+"""
+
+import argparse
+import asyncio
+
+from _common import best_of, report
+
+from app.dataplane.proxy.adapters import headers
+from app.platform.config.snapshot import config
+
+
+async def _build(calls: int, *, cold: bool) -> None:
+    for i in range(calls):
+        if cold:
+            headers.invalidate_header_templates()
+        await headers.build_http_headers(f"token-{i % 8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(config.load())
+    print(f"build_http_headers, {args.calls} calls over 8 tokens")
+    for label, cold in (("template cache", False), ("templates dropped per call", True)):
+        seconds = best_of(lambda cold=cold: loop.run_until_complete(_build(args.calls, cold=cold)))
+        report(label, seconds, args.calls, "call")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
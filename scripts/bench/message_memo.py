@@ -0,0 +1,88 @@
+"""Benchmark memoized message flattening and tool-prompt rendering.
+
+Replays a synthetic 200-turn agent transcript: every turn resends the whole
+history plus one tool call and its result, with the same 20 tools.  Each
+turn runs ``_extract_message`` and ``build_tool_system_prompt`` as a chat
+request does, once with the memos kept across turns and once with them
+cleared before every turn (the unmemoized cost).  Outputs must match.
+
+    python scripts/bench/message_memo.py [--turns N]
+"""
+
+import argparse
+import random
+
+import orjson
+from _common import best_of, report
+
+from app.dataplane.reverse.protocol import tool_prompt
+from app.products.openai import chat
+
+_WORDS = ["alpha", "beta", "gamma", "delta", "file", "read", "write", "patch", "error", "result", "ok"]
+
+
+def _text(rnd: random.Random, words: int) -> str:
+    return " ".join(rnd.choice(_WORDS) for _ in range(words))
+
+
+def _transcript(turns: int) -> tuple[list[dict], list[list[dict]]]:
+    rnd = random.Random(1)
+    tools = [
+        {
+            "type": "function",
+            "function": {
+                "name": f"tool_{i}",
+                "description": _text(rnd, 30),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        f"p{j}": {"type": "string", "description": _text(rnd, 8)} for j in range(6)
+                    },
+                    "required": ["p0"],
+                },
+            },
+        }
+        for i in range(20)
+    ]
+    messages = [
+        {"role": "system", "content": _text(rnd, 400)},
+        {"role": "user", "content": _text(rnd, 80)},
+    ]
+    history = []
+    for t in range(turns):
+        call = {"name": "tool_3", "arguments": orjson.dumps({"p0": _text(rnd, 10)}).decode()}
+        messages.append(
+            {"role": "assistant", "content": None,
+             "tool_calls": [{"id": f"c{t}", "type": "function", "function": call}]}
+        )
+        messages.append({"role": "tool", "tool_call_id": f"c{t}", "content": _text(rnd, rnd.randint(100, 600))})
+        history.append(list(messages))
+    return tools, history
+
+
+def _replay(tools: list[dict], history: list[list[dict]], *, memo: bool) -> list:
+    out = []
+    for messages in history:
+        if not memo:
+            chat._FLATTEN_MEMO.clear()
+            tool_prompt._PROMPT_CACHE.clear()
+        out.append((chat._extract_message(messages), tool_prompt.build_tool_system_prompt(tools, "auto")))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    tools, history = _transcript(args.turns)
+    if _replay(tools, history, memo=True) != _replay(tools, history, memo=False):
+        raise SystemExit("memoized output differs from the unmemoized path")
+    final = len(chat._extract_message(history[-1])[0])
+    print(f"{args.turns}-turn agent transcript, 20 tools, final prompt {final} chars")
+    report("memoized", best_of(lambda: _replay(tools, history, memo=True)), args.turns, "turn")
+    report("memos cleared per turn", best_of(lambda: _replay(tools, history, memo=False)), args.turns, "turn")
+
+
+if __name__ == "__main__":
+    main()
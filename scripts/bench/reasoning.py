@@ -0,0 +1,135 @@
+"""Benchmark ``ReasoningAggregator`` line classification.
+
+Replays reasoning streams (thinking lines and tool-usage events) through a
+fresh aggregator per stream and reports the cost per event:
+
+- warm: repeated lines hit the per-line label caches;
+- cold: the caches are cleared before every pass;
+- unique: every line is distinct, so only the compiled keyword index helps.
+
+The default corpus is 200 synthetic zh/en streams shaped like captured
+ones.  ``--corpus`` replays JSON lines instead, one stream per line, as a
+list of ``["think", {token, tag, rollout, step_id}]`` and
+``["tool", [name, args, rollout, step_id]]`` events.
+
+    python scripts/bench/reasoning.py [--corpus FILE]
+"""
+
+import argparse
+import random
+
+import orjson
+from _common import best_of, report
+
+from app.dataplane.reverse.protocol import xai_chat_reasoning as reasoning
+
+_ZH = [
+    "正在搜索 DeepSeek V4 的最新发布状态与官网公告",
+    "已经确认新版本在4月上线，支持多模态与专家模式",
+    "用户想了解潮汐的成因，需要解释引力和周期",
+    "正在浏览官网页面，核对上下文长度参数",
+    "社区传闻称 V4 Lite 代号海狮正在灰度测试",
+    "半日潮与全日潮的分类主要取决于地理位置",
+    "计划整合搜索结果并比对不同来源",
+    "结果表明发布节奏与此前预期一致",
+    "思考用户的问题并拆解关键点",
+]
+_EN = [
+    "Checking the official release notes for the latest rollout schedule",
+    "The model was launched last week with native multimodal support",
+    "Browsing community posts on X about the gray release of expert mode",
+    "Verifying the context window and parameter count from benchmarks",
+    "It is widely believed the architecture uses MoE with engram memory",
+    "Planning the answer structure around causes and mechanism of tides",
+    "Integrating findings from several sources into a summary",
+    "Spring tides occur when gravity from the sun and moon align",
+]
+_URLS = ["https://deepseek.ai/news", "https://chat.deepseek.com", "https://blog.example.com/v4"]
+
+
+def _stream(seed: int, events: int = 60) -> list:
+    rnd = random.Random(seed)
+    pool = _ZH if seed % 2 else _EN
+    out: list = []
+    for i in range(events):
+        r = rnd.random()
+        step = 1 if i < 6 else rnd.randint(2, 9)
+        text = rnd.choice(pool)
+        if rnd.random() < 0.5:
+            text = f"{text} ({rnd.randint(1, 500)})"
+        if r < 0.1:
+            out.append(["think", {"token": text, "tag": "header", "rollout": "Grok", "step_id": step}])
+        elif r < 0.7:
+            out.append(["think", {"token": "- " + text, "tag": "summary", "rollout": "Grok", "step_id": step}])
+        elif r < 0.8:
+            out.append(["tool", ["web_search", {"query": text}, "Agent 1", step]])
+        elif r < 0.85:
+            out.append(["tool", ["x_keyword_search", {"query": text}, "Agent 2", step]])
+        elif r < 0.9:
+            args = {"url": rnd.choice(_URLS), "instructions": text}
+            out.append(["tool", ["browse_page", args, "Grok", step]])
+        elif r < 0.95:
+            args = {"image_description": rnd.choice(["tide diagram", "高潮 低潮 照片", "a cat"])}
+            out.append(["tool", ["search_images", args, "Grok", step]])
+        else:
+            message = "总结：\n- " + "\n- ".join(rnd.sample(pool, 4)) + "\n最新：2025年4月发布"
+            out.append(["tool", ["chatroom_send", {"message": message}, "Agent 1", step]])
+    return out
+
+
+def _uniquify(corpus: list) -> list:
+    rnd = random.Random(1)
+    out = []
+    for stream in corpus:
+        events = []
+        for kind, ev in stream:
+            if kind == "think":
+                ev = dict(ev, token=f"{ev['token']} #{rnd.random():.9f}")
+            else:
+                name, args, rollout, step = ev
+                args = {
+                    k: f"{v} #{rnd.random():.9f}" if isinstance(v, str) and k != "url" else v
+                    for k, v in args.items()
+                }
+                ev = [name, args, rollout, step]
+            events.append([kind, ev])
+        out.append(events)
+    return out
+
+
+def _replay(corpus: list, *, cold: bool = False) -> None:
+    if cold:
+        for cached in (reasoning._text_labels, reasoning._query_labels, reasoning._normalize_key):
+            cached.cache_clear()
+    for stream in corpus:
+        agg = reasoning.ReasoningAggregator()
+        for kind, ev in stream:
+            if kind == "think":
+                agg.on_thinking(ev["token"], tag=ev["tag"], rollout=ev["rollout"], step_id=ev["step_id"])
+            else:
+                name, args, rollout, step = ev
+                agg.on_tool_usage(name, args, rollout=rollout, step_id=step)
+        agg.finalize()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="JSON lines, one reasoning stream per line")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "rb") as fh:
+            corpus = [orjson.loads(line) for line in fh if line.strip()]
+    else:
+        corpus = [_stream(seed) for seed in range(200)]
+    unique = _uniquify(corpus)
+    events = sum(len(stream) for stream in corpus)
+
+    print(f"ReasoningAggregator over {len(corpus)} streams, {events} events")
+    report("repeated lines, warm cache", best_of(lambda: _replay(corpus), repeat=7), events, "event")
+    report("repeated lines, cold cache", best_of(lambda: _replay(corpus, cold=True), repeat=7), events, "event")
+    report("every line unique", best_of(lambda: _replay(unique, cold=True), repeat=7), events, "event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark the bytes-native SSE emitters against dict-per-token frames.
+
+For every delta the old emitters built the full chunk dict, serialised it
+with ``orjson.dumps(...).decode()`` into an f-string, and the ASGI server
+encoded that back to bytes.  The new ones render a per-stream
+:class:`~app.products._sse.FrameTemplate` straight to bytes.  Both must
+produce the same frames.
+
+    python scripts/bench/sse.py [--deltas N]
+"""
+
+import argparse
+import random
+
+import orjson
+from _common import best_of, report
+
+from app.products._sse import SLOT, FrameTemplate
+from app.products.anthropic import messages
+from app.products.openai._format import make_stream_chunk
+
+_RESPONSE_ID = "chatcmpl-0123456789abcdef"
+_MODEL = "grok-4"
+
+
+def _old_chat(deltas: list[str]) -> list[bytes]:
+    return [
+        f"data: {orjson.dumps(make_stream_chunk(_RESPONSE_ID, _MODEL, text)).decode()}\n\n".encode()
+        for text in deltas
+    ]
+
+
+def _new_chat(deltas: list[str]) -> list[bytes]:
+    render = FrameTemplate(make_stream_chunk(_RESPONSE_ID, _MODEL, SLOT)).render
+    return [render(text) for text in deltas]
+
+
+def _old_anthropic(deltas: list[str]) -> list[bytes]:
+    out = []
+    for text in deltas:
+        data = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}}
+        out.append(f"event: content_block_delta\ndata: {orjson.dumps(data).decode()}\n\n".encode())
+    return out
+
+
+def _new_anthropic(deltas: list[str]) -> list[bytes]:
+    return [messages._delta_frame("text_delta", 0, text) for text in deltas]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deltas", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    pool = ["Hello", " world", "，你好", "\n\n- item", ' "quoted"', "\\path", " tab\there"]
+    deltas = [rnd.choice(pool) for _ in range(args.deltas)]
+
+    # ``created`` is per chunk in the old emitter; compare with it pinned.
+    sample = deltas[:1000]
+    if [orjson.loads(f[6:]) | {"created": 0} for f in _old_chat(sample)] != [
+        orjson.loads(f[6:]) | {"created": 0} for f in _new_chat(sample)
+    ]:
+        raise SystemExit("chat frames differ")
+    if _old_anthropic(sample) != _new_anthropic(sample):
+        raise SystemExit("anthropic frames differ")
+
+    print(f"{args.deltas} streamed deltas")
+    report("chat, FrameTemplate", best_of(lambda: _new_chat(deltas), repeat=3), args.deltas, "frame")
+    report("chat, dict + dumps + encode", best_of(lambda: _old_chat(deltas), repeat=3), args.deltas, "frame")
+    report("anthropic, FrameTemplate", best_of(lambda: _new_anthropic(deltas), repeat=3), args.deltas, "frame")
+    report(
+        "anthropic, dict + dumps + encode",
+        best_of(lambda: _old_anthropic(deltas), repeat=3),
+        args.deltas,
+        "frame",
+    )
+
+
+if __name__ == "__main__":
+    main()
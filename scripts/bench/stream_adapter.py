@@ -0,0 +1,113 @@
+"""Benchmark ``StreamAdapter.feed`` with and without its plain-token fast path.
+
+Replays an app-chat frame corpus through ``feed`` (fast path for plain
+``final`` answer tokens) and through ``orjson.loads`` + ``_feed_full`` (the
+full decoder every frame used to take).  Both must emit the same events and
+leave the same text/thinking buffers and annotations.
+
+The default corpus is synthetic and mixes thinking, citation, search-card,
+tool-usage and empty frames into mostly plain tokens; ``--corpus`` replays a
+captured stream (one JSON payload per line) instead.
+
+    python scripts/bench/stream_adapter.py [--frames N] [--corpus FILE]
+"""
+
+import argparse
+import dataclasses
+import random
+
+import orjson
+from _common import best_of, report
+
+from app.dataplane.reverse.protocol.xai_chat import StreamAdapter
+
+
+def _frame(**response) -> bytes:
+    return orjson.dumps({"result": {"response": response}})
+
+
+def _synthetic_corpus(frames: int) -> list[bytes]:
+    rnd = random.Random(3)
+    card = orjson.dumps(
+        {"id": "c1", "type": "render_inline_citation", "url": "https://example.com/a", "title": "A"}
+    ).decode()
+    citation = (
+        'See <grok:render card_id="c1" card_type="citation_card" type="render_inline_citation">'
+        '<argument name="citation_id">1</argument></grok:render> ok'
+    )
+    corpus = [
+        _frame(cardAttachment={"jsonData": card}, messageTag="final"),
+        _frame(
+            webSearchResults={"results": [{"url": "https://example.com/a", "title": "A"}]},
+            messageTag="tool_usage_card",
+            toolUsageCardId="t1",
+        ),
+    ]
+    for _ in range(frames):
+        r = rnd.random()
+        if r < 0.15:
+            token = rnd.choice(["Think", " more", "- step\n"])
+            corpus.append(_frame(token=token, isThinking=True, messageTag="header", rolloutId="Grok"))
+        elif r < 0.17:
+            corpus.append(_frame(token=citation, isThinking=False, messageTag="final"))
+        elif r < 0.18:
+            corpus.append(_frame(token="", isThinking=False, messageTag="final"))
+        elif r < 0.19:
+            corpus.append(_frame(token="x", isThinking=False, messageTag="final", toolUsageCardId="t"))
+        else:
+            token = rnd.choice(["Hello", " world", "，你好", "\n\n- item"])
+            corpus.append(
+                _frame(token=token, isThinking=False, isSoftStop=False, responseId="r",
+                       messageTag="final", messageStepId=2)
+            )
+    corpus.append(_frame(isSoftStop=True, responseId="r"))
+    return corpus
+
+
+def _feed(corpus: list[bytes]) -> tuple[StreamAdapter, list]:
+    adapter = StreamAdapter()
+    events = []
+    for data in corpus:
+        events.extend(adapter.feed(data))
+    return adapter, events
+
+
+def _feed_full(corpus: list[bytes]) -> tuple[StreamAdapter, list]:
+    adapter = StreamAdapter()
+    events = []
+    for data in corpus:
+        events.extend(adapter._feed_full(orjson.loads(data)))
+    return adapter, events
+
+
+def _state(run: tuple[StreamAdapter, list]) -> tuple:
+    adapter, events = run
+    return (
+        [dataclasses.astuple(e) for e in events],
+        adapter.text_buf,
+        adapter.thinking_buf,
+        adapter.annotations_list(),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20_000)
+    parser.add_argument("--corpus", help="captured stream, one JSON payload per line")
+    args = parser.parse_args()
+
+    if args.corpus:
+        with open(args.corpus, "rb") as fh:
+            corpus = [line.strip() for line in fh if line.strip()]
+    else:
+        corpus = _synthetic_corpus(args.frames)
+
+    if _state(_feed(corpus)) != _state(_feed_full(corpus)):
+        raise SystemExit("fast path output differs from the full decoder")
+    print(f"StreamAdapter over {len(corpus)} frames (identical output)")
+    report("feed (fast path)", best_of(lambda: _feed(corpus)), len(corpus), "frame")
+    report("orjson.loads + _feed_full", best_of(lambda: _feed_full(corpus)), len(corpus), "frame")
+
+
+if __name__ == "__main__":
+    main()
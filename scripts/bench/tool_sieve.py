@@ -0,0 +1,59 @@
+"""Benchmark ``ToolSieve`` on multi-megabyte tool-call arguments.
+
+Streams a ``<tool_calls>`` block whose single argument is N MiB long in
+small chunks, as upstream delivers it, and reports the time per MiB.  A
+linear sieve keeps that figure flat as the argument grows; the old
+re-search-the-whole-buffer sieve grew with the block size.
+
+    python scripts/bench/tool_sieve.py [--chunk N] [--sizes 1,4,8]
+"""
+
+import argparse
+
+from _common import best_of
+
+from app.products.openai._tool_sieve import ToolSieve
+
+_TOOLS = ["write_file"]
+
+
+def _block(mib: int) -> str:
+    arg = "a" * (mib << 20)
+    return (
+        "Writing it now. <tool_calls><tool_call><tool_name>write_file</tool_name>"
+        '<parameters>{"path": "out.txt", "content": "' + arg + '"}</parameters>'
+        "</tool_call></tool_calls>"
+    )
+
+
+def _run(chunks: list[str], stream_args: bool) -> None:
+    sieve = ToolSieve(_TOOLS, stream_args=stream_args)
+    for chunk in chunks:
+        _, calls = sieve.feed(chunk)
+        if stream_args:
+            sieve.drain_deltas()
+        if calls is not None:
+            if len(calls) != 1:
+                raise SystemExit(f"expected one tool call, got {len(calls)}")
+            return
+    raise SystemExit("tool call block was not closed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk", type=int, default=64, help="characters per streamed chunk")
+    parser.add_argument("--sizes", default="1,4,8", help="argument sizes in MiB")
+    args = parser.parse_args()
+
+    print(f"ToolSieve, argument streamed in {args.chunk}-char chunks")
+    for mib in (int(s) for s in args.sizes.split(",")):
+        text = _block(mib)
+        chunks = [text[i : i + args.chunk] for i in range(0, len(text), args.chunk)]
+        for stream_args in (False, True):
+            seconds = best_of(lambda c=chunks, s=stream_args: _run(c, s), repeat=3)
+            label = f"{mib} MiB" + (", streamed arguments" if stream_args else "")
+            print(f"  {label:<36} {seconds * 1000:10.1f} ms  ({seconds / mib * 1000:.1f} ms/MiB)")
+
+
+if __name__ == "__main__":
+    main()
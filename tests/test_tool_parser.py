@@ -0,0 +1,97 @@
+"""The streaming and batch tool-call parsers must agree on the same block.
+
+Run with ``python -m unittest discover tests``.
+"""
+
+import json
+import random
+import unittest
+
+from app.dataplane.reverse.protocol.tool_parser import (
+    StreamingToolCallParser,
+    parse_tool_calls,
+)
+
+TOOLS = ["search", "fetch"]
+
+_CALL = "<tool_call><tool_name>{name}</tool_name><parameters>{params}</parameters></tool_call>"
+
+CASES = [
+    # well-formed
+    "<tool_calls>" + _CALL.format(name="search", params='{"q": "x"}') + "</tool_calls>",
+    "<tool_calls>\n" + _CALL.format(name="search", params=' {"a": [1, 2]} ')
+    + "\n" + _CALL.format(name="fetch", params="{}") + "\n</tool_calls>",
+    # complete call, block never closed
+    "<tool_calls>" + _CALL.format(name="search", params='{"q": "x"}'),
+    "<tool_calls>" + _CALL.format(name="search", params='{"q": "x"}') + "</tool_ca",
+    # truncated / unclosed calls
+    '<tool_calls><tool_call><tool_name>search</tool_name><parameters>{"q": "tr',
+    '<tool_calls><tool_call><tool_name>search</tool_name><parameters>{"q": "x"}</parameters>',
+    '<tool_calls><tool_call><tool_name>search</tool_name><parameters>{"q": 1}</parameters></tool_calls>',
+    # implicit close by a new <tool_call>
+    '<tool_calls><tool_call><tool_name>search</tool_name><parameters>{"q": 1}</parameters>'
+    + _CALL.format(name="fetch", params='{"u": 2}') + "</tool_calls>",
+    # unclosed <parameters> inside a closed call
+    '<tool_calls><tool_call><tool_name>search</tool_name><parameters>{"q": 1}</tool_call></tool_calls>',
+    # invalid, missing and empty arguments
+    "<tool_calls>" + _CALL.format(name="search", params='{"q": ') + "</tool_calls>",
+    "<tool_calls><tool_call><tool_name>search</tool_name></tool_call></tool_calls>",
+    "<tool_calls>" + _CALL.format(name="search", params="  ") + "</tool_calls>",
+    # raw control characters inside strings
+    "<tool_calls>" + _CALL.format(name="search", params='{"t": "a\nb\tc\x01"}') + "</tool_calls>",
+    "<tool_calls>" + _CALL.format(name="search", params='{"s": "q \\" b \\\\"}') + "</tool_calls>",
+    # name after parameters, unknown and empty names
+    "<tool_calls><tool_call><parameters>{}</parameters><tool_name>fetch</tool_name></tool_call></tool_calls>",
+    "<tool_calls>" + _CALL.format(name="nope", params="{}") + _CALL.format(name="", params="{}") + "</tool_calls>",
+    # tag text inside argument strings
+    "<tool_calls>" + _CALL.format(name="search", params='{"x": "<tool_name>n</tool_name>"}') + "</tool_calls>",
+    # calls after the block are not part of it
+    "<tool_calls>" + _CALL.format(name="search", params="{}") + "</tool_calls>"
+    + _CALL.format(name="fetch", params="{}"),
+]
+
+
+def _normalise(calls):
+    return [(c.name, json.loads(c.arguments)) for c in calls]
+
+
+def _stream(text, tools, rng):
+    parser = StreamingToolCallParser(tools)
+    pos = 0
+    while pos < len(text):
+        step = rng.randint(1, 8)
+        parser.feed(text[pos : pos + step])
+        pos += step
+    parser.finish()
+    return parser, parser.drain()
+
+
+class StreamingMatchesBatchTest(unittest.TestCase):
+    def test_same_calls(self):
+        rng = random.Random(0)
+        for text in CASES:
+            for tools in (None, TOOLS):
+                expected = _normalise(parse_tool_calls(text, tools).calls)
+                for _ in range(50):
+                    parser, _ = _stream(text, tools, rng)
+                    with self.subTest(text=text, tools=tools):
+                        self.assertEqual(_normalise(parser.calls), expected)
+
+    def test_streamed_arguments_match_final(self):
+        rng = random.Random(1)
+        for text in CASES:
+            _, events = _stream(text, TOOLS, rng)
+            by_index = {}
+            for event in events:
+                by_index.setdefault(event.index, []).append(event)
+            for seq in by_index.values():
+                with self.subTest(text=text):
+                    self.assertEqual(seq[0].kind, "start")
+                    self.assertIn(seq[-1].kind, ("end", "drop"))
+                    if seq[-1].kind == "end":
+                        streamed = "".join(e.arguments for e in seq if e.kind == "args")
+                        self.assertEqual(json.loads(streamed), json.loads(seq[-1].arguments))
+
+
+if __name__ == "__main__":
+    unittest.main()